@@ -1,15 +1,14 @@
-import streamlit as st
-from streamlit_card import card
-from streamlit_lottie import st_lottie
-import json
 import pandas as pd
 import plotly.express as px
+import streamlit as st
+from streamlit_lottie import st_lottie
+
+from utils.recursos import carregar_lottie
 
 st.set_page_config(page_title="Cálculos Jurídicos - Por Pedro Potz", page_icon="⚖️", layout="wide")
 
-# Carregar animação Lottie
-with open("cat1.json") as f:
-    lottie_json = json.load(f)
+# Carregar animação Lottie (lida e convertida uma única vez por processo)
+lottie_json = carregar_lottie("cat1.json")
 
 # Sidebar GLOBAL
 with st.sidebar:
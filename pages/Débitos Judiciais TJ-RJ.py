@@ -1,14 +1,21 @@
-import streamlit as st
-from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
-import json
-from streamlit_lottie import st_lottie
-from streamlit_card import card
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
 import numpy as np
+import pandas as pd
+import streamlit as st
+from datetime import date, timedelta
+
+from utils.abatimentos import linha_do_tempo_tjrj
+from utils.calculo_tjrj import (
+    DATA_VIGENCIA_TAXA_LEGAL, INDICES_CORRECAO, JUROS_12, JUROS_CODIGO_CIVIL, SEM_CORRECAO, SERIES_CORRECAO, TAXA_LEGAL,
+    TIPOS_JUROS, TIPOS_OBRIGACAO
+)
+from utils.desempenho import Medidor, exibir_painel
+from utils.etapas import GRAFO_TJRJ
+from utils.exportacao import (MIME_XLSX, ao_clicar, gerar_graficos, gerar_resumo, gerar_xlsx,
+                              memoria_calculo_tjrj)
+from utils.graficos import montar_fig_sensibilidade_tjrj, montar_figuras_tjrj
+from utils.historico import exibir_historico, normalizar_processo, obter_historico
+from utils.indices import ARQUIVOS_SERIES, carregar_taxa_legal, ultimo_mes_serie
+from utils.sensibilidade import MAXIMO_PONTOS_EIXO, cenarios_tjrj
 
 st.set_page_config(page_title="Cálculo de Débitos Judiciais", page_icon="⚖️", layout="wide")
 
@@ -17,7 +24,8 @@ VALORES_MOCK = {
     "data_inicial": date(2020, 1, 15),
     "data_final": date(2024, 12, 31),
     "valor": 50000.00,
-    "tipo_juros": "Juros Simples 12% a.a.",
+    "indice_correcao": SEM_CORRECAO,
+    "tipo_juros": JUROS_12,
     "data_juros": date(2020, 1, 15),
     "honorarios": 20.0,
     "aplicar_523": True
@@ -34,11 +42,21 @@ with st.sidebar:
     st.markdown("---")
     st.header("Pedro Potz")
     st.markdown("Advogado Programador")
+    st.markdown("---")
+    painel_desempenho = st.toggle("🛠️ Painel de desempenho",
+                                  help="Tempo e memória de cada etapa (medir a memória deixa a página mais lenta)")
+    area_desempenho = st.container()
+
+# 🔸 Medição das etapas desta execução (exibida no painel lateral)
+medidor = Medidor("tjrj", alocacao=painel_desempenho)
 
 st.subheader("📝 Preencha os dados abaixo:")
 
 # 🔸 Formulário COM VALORES PRÉ-PREENCHIDOS
 with st.form("form_calculo"):
+    numero_processo = st.text_input("Número do Processo (CNJ)", placeholder="0000000-00.0000.8.19.0000",
+                                    help="Opcional: o cálculo fica registrado no histórico deste processo.")
+
     col1, col2 = st.columns(2)
     with col1:
         data_inicial = st.date_input("Data Inicial*", value=VALORES_MOCK["data_inicial"], format="DD/MM/YYYY")
@@ -47,23 +65,24 @@ with st.form("form_calculo"):
 
     valor = st.number_input("Valor Base*", value=VALORES_MOCK["valor"], min_value=0.0, step=0.01)
 
+    indice_correcao = st.selectbox(
+        "Índice de Correção Monetária*",
+        INDICES_CORRECAO,
+        index=INDICES_CORRECAO.index(VALORES_MOCK["indice_correcao"]),
+        help="A correção incide da Data Inicial até a Data Final; os juros incidem sobre o valor atualizado."
+    )
+
     tipo_juros = st.selectbox(
         "Tipo de Juros*",
-        (
-            "Sem juros (somente correção monetária)",
-            "Juros Simples 6% a.a.",
-            "Juros Simples 12% a.a.",
-            "Juros do Código Civil (6% ou 12% a.a.)",
-            "Taxa legal (Lei 14.905/24) — Em desenvolvimento"
-        ),
+        TIPOS_JUROS,
         index=2
     )
 
     tipo_obrigacao = None
-    if tipo_juros == "Juros do Código Civil (6% ou 12% a.a.)":
+    if tipo_juros == JUROS_CODIGO_CIVIL:
         tipo_obrigacao = st.radio(
             "Tipo da obrigação:",
-            ("Contratual (12% a.a.)", "Extracontratual (6% a.a.)")
+            TIPOS_OBRIGACAO
         )
 
     data_juros = st.date_input("Data Inicial de Incidência dos Juros*", value=VALORES_MOCK["data_juros"],
@@ -74,12 +93,24 @@ with st.form("form_calculo"):
     aplicar_523 = st.checkbox("Aplicar Art. 523 §1º CPC (10% Multa + 10% Honorários)",
                               value=VALORES_MOCK["aplicar_523"])
 
+    with st.expander("💸 Abatimentos (depósitos, levantamentos, penhoras)"):
+        eventos = st.data_editor(
+            pd.DataFrame({"data": pd.Series(dtype="datetime64[ns]"), "descricao": pd.Series(dtype=str),
+                          "valor": pd.Series(dtype=float)}),
+            num_rows="dynamic", use_container_width=True,
+            column_config={
+                "data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+                "descricao": st.column_config.TextColumn("Descrição"),
+                "valor": st.column_config.NumberColumn("Valor (R$)", min_value=0.0, format="%.2f"),
+            },
+        )
+
     submitted = st.form_submit_button("Calcular")
 
 
 # 🔸 FUNÇÃO para gerar gráficos (usado tanto para mock quanto para cálculo real)
 def gerar_graficos_e_metricas(valor, valor_juros, valor_corrigido, valor_honorarios, multa_523, honorarios_523, total,
-                              meses, taxa_mensal, aplicar_523, is_mock=False):
+                              meses, taxa_mensal, aplicar_523, cenario, is_mock=False, correcao_monetaria=0.0):
     titulo = "📈 Demonstração - Análise Jurídico-Financeira" if is_mock else "📈 Análise Jurídico-Financeira Profissional"
 
     st.markdown("---")
@@ -98,6 +129,10 @@ def gerar_graficos_e_metricas(valor, valor_juros, valor_corrigido, valor_honorar
         componentes.append("Valor Base")
         valores.append(valor)
         cores.append("#1f77b4")
+    if correcao_monetaria > 0:
+        componentes.append("Correção Monetária")
+        valores.append(correcao_monetaria)
+        cores.append("#17becf")
     if valor_juros > 0:
         componentes.append("Juros")
         valores.append(valor_juros)
@@ -115,80 +150,177 @@ def gerar_graficos_e_metricas(valor, valor_juros, valor_corrigido, valor_honorar
         valores.append(honorarios_523)
         cores.append("#9467bd")
 
-    # Layout em 3 colunas para os gráficos
+    with medidor.etapa("figuras"):
+        fig_pizza, fig_evolucao = montar_figuras_tjrj(
+            tuple(componentes), tuple(valores), tuple(cores), valor, meses, taxa_mensal
+        )
+
+    with medidor.etapa("graficos"):
+        # Layout em 2 colunas para os gráficos
+        col1, col2 = st.columns(2)
+
+        with col1:
+            if fig_pizza is not None:
+                st.plotly_chart(fig_pizza, use_container_width=True)
+
+        with col2:
+            if fig_evolucao is not None:
+                st.plotly_chart(fig_evolucao, use_container_width=True)
+            else:
+                st.info("Evolução temporal disponível apenas para cálculos com juros.")
+
+    with medidor.etapa("cenarios"):
+        fig_cenarios = exibir_cenarios(valor, aplicar_523, taxa_mensal * 12, **cenario)
+
+    with medidor.etapa("metricas"):
+        st.markdown("---")
+        st.subheader("🎯 Métricas Jurídico-Financeiras")
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            if valor > 0:
+                percentual_juros = (valor_juros / valor) * 100
+                st.metric("Impacto dos Juros", f"{percentual_juros:.1f}%", f"R$ {valor_juros:,.2f}")
+        with col2:
+            if valor > 0:
+                percentual_total = ((total - valor) / valor) * 100
+                st.metric("Acréscimo Total", f"{percentual_total:.1f}%", f"R$ {total - valor:,.2f}")
+        with col3:
+            if meses > 0:
+                valor_mensal = valor_juros / meses
+                st.metric("Juros Mensais", f"R$ {valor_mensal:,.2f}", f"{meses} meses")
+        with col4:
+            if aplicar_523:
+                impacto_523 = multa_523 + honorarios_523
+                st.metric("Impacto Art. 523", f"R$ {impacto_523:,.2f}", "20% adicional")
+
+    with medidor.etapa("relatorio"):
+        st.markdown("---")
+        st.subheader("📋 Relatório Detalhado")
+        if total > 0:
+            dados_relatorio = {
+                "Componente": componentes,
+                "Valor (R$)": [f"R$ {v:,.2f}" for v in valores],
+                "Percentual (%)": [f"{(v / total) * 100:.1f}%" for v in valores]
+            }
+            st.dataframe(dados_relatorio, use_container_width=True)
+
+    figuras = {"composicao": fig_pizza, "evolucao": fig_evolucao, "cenarios": fig_cenarios}
+    return {nome: figura for nome, figura in figuras.items() if figura is not None}
+
+
+def faixas_padrao(data_juros, data_final):
+    """Faixas iniciais da grade de cenários: 0% a 24% a.a. e dois anos em torno do termo inicial e da data final."""
+    dois_anos = timedelta(days=2 * 365)
+    return ((0.0, 0.24, 25), (data_juros - dois_anos, min(data_juros + dois_anos, data_final), 49),
+            (max(data_final - dois_anos, data_juros), data_final + dois_anos, 49))
+
+
+def posicao_da_taxa(taxas, taxa_anual):
+    """Posição na grade da taxa mais próxima da taxa do caso."""
+    return int(np.argmin(np.abs(taxas - (taxa_anual or 0.0))))
+
+
+# 🔸 Cenários de negociação: taxa × termo inicial × data final em uma única grade NumPy. Como fragmento,
+# mexer nas faixas refaz só esta seção, sem recalcular o restante da página
+@st.fragment
+def exibir_cenarios(valor, aplicar_523, taxa_anual, data_inicial, data_juros, data_final, indice_correcao,
+                    honorarios):
+    st.markdown("---")
+    st.subheader("🧮 Cenários de Negociação")
+    faixa_taxa, faixa_termo, faixa_final = faixas_padrao(data_juros, data_final)
+
+    with st.expander("⚙️ Faixas da grade de cenários"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            taxa_minima = st.number_input("Taxa mínima (% a.a.)", min_value=0.0, max_value=100.0,
+                                          value=faixa_taxa[0] * 100, step=0.5)
+            taxa_maxima = st.number_input("Taxa máxima (% a.a.)", min_value=0.0, max_value=100.0,
+                                          value=faixa_taxa[1] * 100, step=0.5)
+            n_taxas = st.number_input("Quantidade de taxas", min_value=1, max_value=MAXIMO_PONTOS_EIXO,
+                                      value=faixa_taxa[2])
+        with col2:
+            termos = st.date_input("Termo inicial dos juros (de – até)", value=faixa_termo[:2], format="DD/MM/YYYY")
+            n_termos = st.number_input("Quantidade de termos iniciais", min_value=1, max_value=MAXIMO_PONTOS_EIXO,
+                                       value=faixa_termo[2])
+        with col3:
+            finais = st.date_input("Data final (de – até)", value=faixa_final[:2], format="DD/MM/YYYY")
+            n_finais = st.number_input("Quantidade de datas finais", min_value=1, max_value=MAXIMO_PONTOS_EIXO,
+                                       value=faixa_final[2])
+
+    if len(termos) != 2 or len(finais) != 2:
+        st.info("Selecione o início e o fim de cada intervalo de datas.")
+        return None
+
+    faixa_taxa = (min(taxa_minima, taxa_maxima) / 100, max(taxa_minima, taxa_maxima) / 100, n_taxas)
+    faixa_termo, faixa_final = (*termos, n_termos), (*finais, n_finais)
+    grade = cenarios_tjrj(valor, data_inicial, indice_correcao, honorarios, aplicar_523, faixa_taxa, faixa_termo,
+                          faixa_final)
+    taxas = grade["taxas"]
+    posicao = st.select_slider("Taxa exibida no mapa", options=range(len(taxas)),
+                               value=posicao_da_taxa(taxas, taxa_anual), format_func=lambda i: f"{taxas[i]:.2%} a.a.")
+    fig_cenarios = montar_fig_sensibilidade_tjrj(valor, data_inicial, indice_correcao, honorarios, aplicar_523,
+                                                 faixa_taxa, faixa_termo, faixa_final, posicao)
+    st.plotly_chart(fig_cenarios, use_container_width=True)
+
     col1, col2, col3 = st.columns(3)
+    col1.metric("Cenários calculados", f"{grade['total'].size:,}")
+    col2.metric("Menor total", f"R$ {np.nanmin(grade['total']):,.2f}")
+    col3.metric("Maior total", f"R$ {np.nanmax(grade['total']):,.2f}")
+    return fig_cenarios
 
-    with col1:
-        if componentes:
-            fig_pizza = px.pie(
-                values=valores, names=componentes, title="Composição do Débito Judicial",
-                color_discrete_sequence=cores, hole=0.4
-            )
-            fig_pizza.update_layout(height=400, showlegend=True, font=dict(size=10), title_font_size=14)
-            st.plotly_chart(fig_pizza, use_container_width=True)
 
-    with col2:
-        if meses > 0 and taxa_mensal and taxa_mensal > 0:
-            meses_lista = list(range(0, meses + 1))
-            valores_evolucao = [valor * (1 + taxa_mensal * m) for m in meses_lista]
-
-            fig_evolucao = go.Figure(go.Scatter(
-                x=meses_lista, y=valores_evolucao, mode='lines+markers', name='Evolução do Débito',
-                line=dict(color='#1f77b4', width=3), marker=dict(size=6)
-            ))
-            fig_evolucao.update_layout(
-                title="Evolução Temporal do Débito", xaxis_title="Meses", yaxis_title="Valor (R$)",
-                height=400, showlegend=False, font=dict(size=10), title_font_size=14
-            )
-            st.plotly_chart(fig_evolucao, use_container_width=True)
-        else:
-            st.info("Evolução temporal disponível apenas para cálculos com juros.")
-
-    with col3:
-        taxas_comparativas = {"Sem Juros": 0, "6% a.a.": 0.06, "12% a.a.": 0.12, "Selic (Est.)": 0.10}
-        valores_comparativos = [valor * (1 + (taxa / 12 * meses)) for taxa in taxas_comparativas.values()]
-
-        fig_comparativo = px.bar(
-            x=list(taxas_comparativas.keys()), y=valores_comparativos, title="Comparativo de Taxas",
-            color=valores_comparativos, color_continuous_scale="Blues"
-        )
-        fig_comparativo.update_layout(
-            height=400, showlegend=False, font=dict(size=10), title_font_size=14,
-            xaxis_title="Taxa de Juros", yaxis_title="Valor Total (R$)"
-        )
-        st.plotly_chart(fig_comparativo, use_container_width=True)
+# 🔸 FUNÇÃO para exibir a linha do tempo dos abatimentos (imputação: juros primeiro, depois o capital)
+def exibir_abatimentos(valor, data_inicial, data_juros, data_final, eventos, tipo_juros, tipo_obrigacao,
+                       indice_correcao, honorarios, aplicar_523):
+    with medidor.etapa("abatimentos"):
+        tabela, saldo = linha_do_tempo_tjrj(valor, data_inicial, data_juros, data_final, eventos, tipo_juros,
+                                            tipo_obrigacao, indice_correcao, honorarios, aplicar_523)
 
     st.markdown("---")
-    st.subheader("🎯 Métricas Jurídico-Financeiras")
+    st.header("💸 Abatimentos e Saldo Remanescente")
+    st.caption("Cada pagamento é imputado primeiro nos juros vencidos e depois no capital (art. 354 do CC); "
+               "entre os eventos, o saldo é corrigido e os juros continuam a correr sobre o capital restante.")
+
     col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Abatido", f"R$ {saldo['total_pago']:,.2f}")
+    col2.metric("Imputado nos Juros", f"R$ {saldo['juros_imputados']:,.2f}")
+    col3.metric("Imputado no Capital", f"R$ {saldo['principal_imputado']:,.2f}")
+    col4.metric("Saldo Remanescente", f"R$ {saldo['saldo_final']:,.2f}")
+    if saldo["total_excedente"] > 0:
+        st.warning(f"⚠️ Os abatimentos superam o débito em R$ {saldo['total_excedente']:,.2f}.")
+
+    st.dataframe(
+        tabela.rename(columns={
+            "data": "Data", "descricao": "Evento", "pagamento": "Pagamento", "correcao_monetaria": "Correção",
+            "juros_periodo": "Juros do Período", "imputado_juros": "Imputado nos Juros",
+            "imputado_principal": "Imputado no Capital", "excedente": "Excedente", "principal": "Capital",
+            "juros_pendentes": "Juros Pendentes", "saldo": "Saldo",
+        }),
+        use_container_width=True, hide_index=True,
+        column_config={"Data": st.column_config.DateColumn(format="DD/MM/YYYY")},
+    )
+    st.success(f"💵 **Total com encargos sobre o saldo remanescente:** R$ {saldo['total']:,.2f}")
+    return saldo
+
+
+# 🔸 Cálculo incremental: cada etapa (período, correção, juros, valores, encargos) é memoizada pelas suas entradas,
+# então alterar só os honorários ou o Art. 523 refaz apenas a etapa de encargos
+def calcular(valor, data_juros, data_final, tipo_juros, tipo_obrigacao=None, honorarios=0.0, aplicar_523=False,
+             indice_correcao=SEM_CORRECAO, data_inicial=None):
+    return GRAFO_TJRJ.calcular(
+        medidor, valor=valor, data_juros=data_juros, data_final=data_final, tipo_juros=tipo_juros,
+        tipo_obrigacao=tipo_obrigacao, honorarios=honorarios, aplicar_523=aplicar_523,
+        indice_correcao=indice_correcao, data_inicial=data_juros if data_inicial is None else data_inicial
+    )
 
-    with col1:
-        if valor > 0:
-            percentual_juros = (valor_juros / valor) * 100
-            st.metric("Impacto dos Juros", f"{percentual_juros:.1f}%", f"R$ {valor_juros:,.2f}")
-    with col2:
-        if valor > 0:
-            percentual_total = ((total - valor) / valor) * 100
-            st.metric("Acréscimo Total", f"{percentual_total:.1f}%", f"R$ {total - valor:,.2f}")
-    with col3:
-        if meses > 0:
-            valor_mensal = valor_juros / meses
-            st.metric("Juros Mensais", f"R$ {valor_mensal:,.2f}", f"{meses} meses")
-    with col4:
-        if aplicar_523:
-            impacto_523 = multa_523 + honorarios_523
-            st.metric("Impacto Art. 523", f"R$ {impacto_523:,.2f}", "20% adicional")
 
-    st.markdown("---")
-    st.subheader("📋 Relatório Detalhado")
-    if total > 0:
-        dados_relatorio = {
-            "Componente": componentes,
-            "Valor (R$)": [f"R$ {v:,.2f}" for v in valores],
-            "Percentual (%)": [f"{(v / total) * 100:.1f}%" for v in valores]
-        }
-        df_relatorio = pd.DataFrame(dados_relatorio)
-        st.dataframe(df_relatorio, use_container_width=True)
+# 🔸 FUNÇÃO para validar o número do processo (opcional) no formato CNJ
+def numero_do_processo(texto):
+    try:
+        return normalizar_processo(texto), None
+    except ValueError as erro:
+        return None, str(erro)
 
 
 # 🔸 FUNÇÃO para gerar a demonstração inicial
@@ -197,21 +329,27 @@ def gerar_mock_inicial():
     data_juros_mock = VALORES_MOCK["data_juros"]
     data_final_mock = VALORES_MOCK["data_final"]
 
-    diff_mock = relativedelta(data_final_mock, data_juros_mock)
-    meses_mock = diff_mock.years * 12 + diff_mock.months
-    taxa_mensal_mock = 0.12 / 12
-
-    valor_juros_mock = valor_mock * (taxa_mensal_mock * meses_mock)
-    valor_corrigido_mock = valor_mock + valor_juros_mock
-    valor_honorarios_mock = valor_corrigido_mock * (VALORES_MOCK["honorarios"] / 100)
-    multa_523_mock = valor_corrigido_mock * 0.10 if VALORES_MOCK["aplicar_523"] else 0
-    honorarios_523_mock = valor_corrigido_mock * 0.10 if VALORES_MOCK["aplicar_523"] else 0
-    total_mock = valor_corrigido_mock + valor_honorarios_mock + multa_523_mock + honorarios_523_mock
+    resultado_mock = calcular(
+        valor_mock, data_juros_mock, data_final_mock, VALORES_MOCK["tipo_juros"],
+        honorarios=VALORES_MOCK["honorarios"], aplicar_523=VALORES_MOCK["aplicar_523"],
+        indice_correcao=VALORES_MOCK["indice_correcao"], data_inicial=VALORES_MOCK["data_inicial"]
+    )
+    meses_mock = resultado_mock["meses"]
+    taxa_mensal_mock = resultado_mock["taxa_mensal"]
+    correcao_monetaria_mock = resultado_mock["correcao_monetaria"]
+    valor_juros_mock = resultado_mock["valor_juros"]
+    valor_corrigido_mock = resultado_mock["valor_corrigido"]
+    valor_honorarios_mock = resultado_mock["valor_honorarios"]
+    multa_523_mock = resultado_mock["multa_523"]
+    honorarios_523_mock = resultado_mock["honorarios_523"]
+    total_mock = resultado_mock["total"]
 
     st.subheader("📊 Exemplo de Resultado")
     st.write(f"💰 **Valor Base:** R$ {valor_mock:,.2f}")
+    if correcao_monetaria_mock:
+        st.write(f"📊 **Correção Monetária ({VALORES_MOCK['indice_correcao']}):** R$ {correcao_monetaria_mock:,.2f}")
     st.write(f"📈 **Juros:** R$ {valor_juros_mock:,.2f}")
-    st.write(f"🔧 **Valor Corrigido (Base + Juros):** R$ {valor_corrigido_mock:,.2f}")
+    st.write(f"🔧 **Valor Corrigido (Base + Correção + Juros):** R$ {valor_corrigido_mock:,.2f}")
     st.write(f"⚖️ **Honorários ({VALORES_MOCK['honorarios']}%):** R$ {valor_honorarios_mock:,.2f}")
     if VALORES_MOCK["aplicar_523"]:
         st.write(f"🚨 **Multa (Art. 523 §1º):** R$ {multa_523_mock:,.2f}")
@@ -221,66 +359,148 @@ def gerar_mock_inicial():
     gerar_graficos_e_metricas(
         valor_mock, valor_juros_mock, valor_corrigido_mock, valor_honorarios_mock,
         multa_523_mock, honorarios_523_mock, total_mock, meses_mock, taxa_mensal_mock,
-        VALORES_MOCK["aplicar_523"], is_mock=True
+        VALORES_MOCK["aplicar_523"],
+        dict(data_inicial=VALORES_MOCK["data_inicial"], data_juros=data_juros_mock, data_final=data_final_mock,
+             indice_correcao=VALORES_MOCK["indice_correcao"], honorarios=VALORES_MOCK["honorarios"]),
+        is_mock=True, correcao_monetaria=correcao_monetaria_mock
     )
 
 # --- LÓGICA PRINCIPAL DA PÁGINA ---
 
 if submitted:
-    if data_final < data_inicial:
+    processo, erro_processo = numero_do_processo(numero_processo)
+    if erro_processo:
+        st.error(f"❌ {erro_processo}")
+    elif data_final < data_inicial:
         st.error("❌ A Data Final não pode ser anterior à Data Inicial.")
     else:
-        diff = relativedelta(data_final, data_juros)
-        meses = max(0, diff.years * 12 + diff.months)
+        # Mesmas entradas e mesma versão das tabelas de índices: o resultado vem do histórico, sem recalcular
+        with medidor.etapa("historico"):
+            resultado, reaproveitado = obter_historico().calcular("tjrj", calcular, dict(
+                valor=valor, data_juros=data_juros, data_final=data_final, tipo_juros=tipo_juros,
+                tipo_obrigacao=tipo_obrigacao, honorarios=honorarios, aplicar_523=aplicar_523,
+                indice_correcao=indice_correcao, data_inicial=data_inicial
+            ), processo)
+        if reaproveitado:
+            st.caption("♻️ Resultado recuperado do histórico (mesmas entradas e mesmas tabelas de índices).")
+        meses = resultado["meses"]
 
         st.info(f"Período considerado para juros: {meses} meses.")
 
-        taxa_mensal = 0
-        if tipo_juros == "Juros Simples 6% a.a.":
-            taxa_mensal = 0.06 / 12
-        elif tipo_juros == "Juros Simples 12% a.a.":
-            taxa_mensal = 0.12 / 12
-        elif tipo_juros == "Juros do Código Civil (6% ou 12% a.a.)":
-            taxa_mensal = 0.12 / 12 if tipo_obrigacao == "Contratual (12% a.a.)" else 0.06 / 12
-        elif tipo_juros == "Taxa legal (Lei 14.905/24) — Em desenvolvimento":
-            st.warning("⚠️ Cálculo da Taxa Legal (Lei 14.905/24) está em desenvolvimento.")
-            taxa_mensal = None
-
-        if taxa_mensal is not None:
-            valor_juros = valor * (taxa_mensal * meses)
-            valor_corrigido = valor + valor_juros
-            valor_honorarios = valor_corrigido * (honorarios / 100)
-            multa_523 = valor_corrigido * 0.10 if aplicar_523 else 0
-            honorarios_523 = valor_corrigido * 0.10 if aplicar_523 else 0
-            total = valor_corrigido + valor_honorarios + multa_523 + honorarios_523
-
-            st.subheader("📊 Resultado do Cálculo")
-            st.write(f"💰 **Valor Base:** R$ {valor:,.2f}")
-            st.write(f"📈 **Juros:** R$ {valor_juros:,.2f}")
-            st.write(f"🔧 **Valor Corrigido (Base + Juros):** R$ {valor_corrigido:,.2f}")
-            st.write(f"⚖️ **Honorários ({honorarios}%):** R$ {valor_honorarios:,.2f}")
-            if aplicar_523:
-                st.write(f"🚨 **Multa (Art. 523 §1º):** R$ {multa_523:,.2f}")
-                st.write(f"🚨 **Honorários 523 (Art. 523 §1º):** R$ {honorarios_523:,.2f}")
-            st.success(f"💵 **Total Final:** R$ {total:,.2f}")
-
-            gerar_graficos_e_metricas(
-                valor, valor_juros, valor_corrigido, valor_honorarios,
-                multa_523, honorarios_523, total, meses, taxa_mensal,
-                aplicar_523, is_mock=False
-            )
+        taxa_mensal = resultado["taxa_mensal"]
+        if tipo_juros == TAXA_LEGAL:
+            st.info(f"Taxa Legal: 1% ao mês antes de {DATA_VIGENCIA_TAXA_LEGAL:%d/%m/%Y} e, a partir daí, "
+                    f"a taxa legal de cada mês (Selic − IPCA, nunca negativa). Juros acumulados: "
+                    f"{resultado['fator_juros']:.2%} (média de {taxa_mensal:.4%} ao mês).")
+            ultimo_mes = carregar_taxa_legal().mes_final
+            if np.datetime64(data_final, "M") > ultimo_mes:
+                st.warning(f"⚠️ A série da taxa legal vai até {ultimo_mes.astype(date):%m/%Y}; os meses "
+                           "seguintes não acrescentam juros. Atualize `data/taxa_legal.csv`.")
+        if indice_correcao != SEM_CORRECAO:
+            serie = SERIES_CORRECAO[indice_correcao]
+            ultimo_mes_indice = ultimo_mes_serie(serie)
+            if np.datetime64(data_final, "M") > ultimo_mes_indice:
+                st.warning(f"⚠️ A série do índice {indice_correcao} vai até {ultimo_mes_indice.astype(date):%m/%Y}; a "
+                           f"correção monetária para nesse mês. Atualize `data/{ARQUIVOS_SERIES[serie][0]}`.")
+
+        correcao_monetaria = resultado["correcao_monetaria"]
+        valor_juros = resultado["valor_juros"]
+        valor_corrigido = resultado["valor_corrigido"]
+        valor_honorarios = resultado["valor_honorarios"]
+        multa_523 = resultado["multa_523"]
+        honorarios_523 = resultado["honorarios_523"]
+        total = resultado["total"]
+
+        st.subheader("📊 Resultado do Cálculo")
+        st.write(f"💰 **Valor Base:** R$ {valor:,.2f}")
+        if indice_correcao != SEM_CORRECAO:
+            st.write(f"📊 **Correção Monetária ({indice_correcao}):** R$ {correcao_monetaria:,.2f} "
+                     f"(fator {resultado['fator_correcao']:.6f})")
+        st.write(f"📈 **Juros:** R$ {valor_juros:,.2f}")
+        st.write(f"🔧 **Valor Corrigido (Base + Correção + Juros):** R$ {valor_corrigido:,.2f}")
+        st.write(f"⚖️ **Honorários ({honorarios}%):** R$ {valor_honorarios:,.2f}")
+        if aplicar_523:
+            st.write(f"🚨 **Multa (Art. 523 §1º):** R$ {multa_523:,.2f}")
+            st.write(f"🚨 **Honorários 523 (Art. 523 §1º):** R$ {honorarios_523:,.2f}")
+        st.success(f"💵 **Total Final:** R$ {total:,.2f}")
+
+        figuras = gerar_graficos_e_metricas(
+            valor, valor_juros, valor_corrigido, valor_honorarios,
+            multa_523, honorarios_523, total, meses, taxa_mensal,
+            aplicar_523,
+            dict(data_inicial=data_inicial, data_juros=data_juros, data_final=data_final,
+                 indice_correcao=indice_correcao, honorarios=honorarios),
+            is_mock=False, correcao_monetaria=correcao_monetaria
+        )
+
+        saldo = None
+        if eventos["data"].notna().any():
+            saldo = exibir_abatimentos(valor, data_inicial, data_juros, data_final, eventos, tipo_juros,
+                                       tipo_obrigacao, indice_correcao, honorarios, aplicar_523)
+
+        # 🔸 Exportação: os arquivos só são gerados quando o botão é clicado
+        with medidor.etapa("exportacao"):
+            resumo_texto = "\n".join(linha for linha in (
+                "**CÁLCULO DE DÉBITO JUDICIAL - TJ-RJ**",
+                "",
+                f"**Valor Base:** R$ {valor:,.2f}",
+                f"**Período:** {data_inicial.strftime('%d/%m/%Y')} a {data_final.strftime('%d/%m/%Y')}",
+                f"**Juros:** {tipo_juros} — {meses} meses",
+                "",
+                f"- Correção monetária ({indice_correcao}): R$ {correcao_monetaria:,.2f}"
+                if indice_correcao != SEM_CORRECAO else None,
+                f"- Juros: R$ {valor_juros:,.2f}",
+                f"- Valor corrigido: R$ {valor_corrigido:,.2f}",
+                f"- Honorários ({honorarios}%): R$ {valor_honorarios:,.2f}",
+                f"- Multa (Art. 523 §1º): R$ {multa_523:,.2f}" if aplicar_523 else None,
+                f"- Honorários 523 (Art. 523 §1º): R$ {honorarios_523:,.2f}" if aplicar_523 else None,
+                f"- **TOTAL: R$ {total:,.2f}**",
+                "" if saldo else None,
+                f"- Abatimentos: R$ {saldo['total_pago']:,.2f} (juros: R$ {saldo['juros_imputados']:,.2f}; "
+                f"capital: R$ {saldo['principal_imputado']:,.2f})" if saldo else None,
+                f"- **Saldo remanescente com encargos: R$ {saldo['total']:,.2f}**" if saldo else None,
+            ) if linha is not None)
+            planilha = ao_clicar(lambda: gerar_xlsx(memoria_calculo_tjrj(
+                valor, data_juros, data_final, tipo_juros, tipo_obrigacao, honorarios, aplicar_523, indice_correcao,
+                data_inicial
+            )))
+            graficos = ao_clicar(gerar_graficos, figuras)
+            resumo = ao_clicar(gerar_resumo, resumo_texto)
+
+        st.subheader("📥 Exportar Resultados")
+        col_d1, col_d2, col_d3 = st.columns(3)
+        with col_d1:
+            st.download_button("📊 Baixar Gráficos", graficos,
+                               file_name="graficos_tjrj.zip", mime="application/zip", on_click="ignore",
+                               help="Exportar visualizações em PNG (HTML interativo sem o kaleido)")
+        with col_d2:
+            st.download_button("📋 Baixar Resumo", resumo, file_name="resumo_tjrj.md",
+                               mime="text/markdown", on_click="ignore", help="Exportar resumo executivo")
+        with col_d3:
+            st.download_button("🔢 Baixar Planilha", planilha,
+                               file_name="memoria_calculo_tjrj.xlsx", mime=MIME_XLSX, on_click="ignore",
+                               help="Exportar memória de cálculo mês a mês")
 else:
     # Mostra a demonstração inicial se o formulário ainda não foi enviado
     gerar_mock_inicial()
 
 # --- SEÇÕES QUE APARECEM SEMPRE ---
 
+# 🔸 Histórico de cálculos (SQLite local)
+exibir_historico(st.expander("🗂️ Histórico de Cálculos"), "tjrj")
+
+if painel_desempenho:
+    exibir_painel(area_desempenho, medidor)
+
 st.markdown("---")
 st.info("""
         💡 **Observações Técnicas:**
         - O cálculo de juros é realizado de forma simples (não composta).
-        - A ferramenta ainda não aplica índices de correção monetária (ex: IPCA, INPC), apenas os juros selecionados.
-        - Honorários são calculados sobre o valor corrigido (principal + juros).
+        - A correção monetária (INPC ou tabela do TJ-RJ) incide da Data Inicial até a Data Final, pela razão entre os números-índice dos respectivos meses.
+        - Os juros incidem sobre o valor atualizado monetariamente.
+        - Taxa Legal (Lei 14.905/24): 1% ao mês antes de 30/08/2024 e, a partir daí, a taxa legal mensal (Selic menos IPCA, nunca negativa), somada por mês inteiro (o mês incompleto não rende juros).
+        - Honorários são calculados sobre o valor corrigido (principal + correção + juros).
+        - Abatimentos são imputados primeiro nos juros vencidos e depois no capital (art. 354 do CC); os encargos do saldo remanescente incidem sobre o saldo após o último abatimento.
         - A multa e os honorários do Art. 523, §1º do CPC incidem sobre o valor corrigido em caso de inadimplemento na fase de cumprimento de sentença.
         """)
 
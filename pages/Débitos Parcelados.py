@@ -0,0 +1,206 @@
+import streamlit as st
+from datetime import date
+
+from utils.calculo_fazenda import DATA_CORTE_IPCA_SELIC
+from utils.calculo_tjrj import (INDICES_CORRECAO, JUROS_CODIGO_CIVIL, SEM_CORRECAO, SERIES_CORRECAO, TIPOS_JUROS,
+                                TIPOS_OBRIGACAO)
+from utils.desempenho import Medidor, exibir_painel
+from utils.exportacao import ao_clicar, gerar_csv
+from utils.graficos import montar_fig_parcelas
+from utils.indices import ARQUIVOS_SERIES, ultimo_mes_serie
+from utils.parcelas import calcular_parcelas, gerar_parcelas, ler_parcelas, totais
+
+st.set_page_config(page_title="Débitos Parcelados", page_icon="🧾", layout="wide")
+
+st.title("🧾 Débitos Parcelados — Atualização Parcela a Parcela")
+
+# Sidebar GLOBAL
+with st.sidebar:
+    st.image("https://avatars.githubusercontent.com/u/205710427?v=4", caption="Advogado que programa é unicórnio!",
+             use_container_width=True)
+    st.markdown("---")
+    st.link_button("Visite meu novo site!", "https://pedrop.vercel.app/")
+    st.markdown("---")
+    st.header("Pedro Potz")
+    st.markdown("Advogado Programador")
+    st.markdown("---")
+    painel_desempenho = st.toggle("🛠️ Painel de desempenho",
+                                  help="Tempo e memória de cada etapa (medir a memória deixa a página mais lenta)")
+    area_desempenho = st.container()
+
+# 🔸 Medição das etapas desta execução (exibida no painel lateral)
+medidor = Medidor("parcelas", alocacao=painel_desempenho)
+
+NOMES_CALCULADORAS = {
+    "tjrj": "⚖️ Débitos Judiciais TJ-RJ",
+    "fazenda": "🏛️ Fazenda Pública",
+}
+
+MODOS_ENTRADA = ("Gerar parcelas mensais", "Colar tabela", "Enviar arquivo CSV")
+
+# Nome exibido de cada coluna da tabela de resultados
+COLUNAS = {
+    "tjrj": {
+        "vencimento": "Vencimento", "valor": "Valor Original", "meses": "Meses de Juros",
+        "correcao_monetaria": "Correção Monetária", "valor_juros": "Juros", "valor_honorarios": "Honorários",
+        "multa_523": "Multa Art. 523", "honorarios_523": "Hon. Art. 523", "total": "Total",
+    },
+    "fazenda": {
+        "vencimento": "Vencimento", "valor": "Valor Original", "valor_corrigido_ipcae": "Corrigido IPCA-e",
+        "valor_juros_ate_corte": "Juros até 12/2021", "juros_selic_sobre_principal": "Selic (Resultado 1)",
+        "total_resultado1": "Total (Resultado 1)", "total_resultado2": "Total (Resultado 2)",
+    },
+}
+
+st.info("""
+Para pensões alimentícias, diferenças salariais, benefícios e demais obrigações periódicas: cada parcela é
+corrigida e recebe juros **desde o seu próprio vencimento**, e o débito é a soma das parcelas. Todas as parcelas
+são calculadas de uma só vez, com as mesmas regras das calculadoras individuais.
+""")
+
+calculadora = st.radio("Calculadora*", tuple(NOMES_CALCULADORAS), format_func=NOMES_CALCULADORAS.get,
+                       horizontal=True)
+modo = st.radio("Parcelas*", MODOS_ENTRADA, horizontal=True)
+
+with st.form("form_parcelas"):
+    # 🔹 Tabela de parcelas
+    if modo == MODOS_ENTRADA[0]:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            primeiro_vencimento = st.date_input("Primeiro Vencimento*", value=date(2020, 1, 10), format="DD/MM/YYYY")
+        with col2:
+            ultimo_vencimento = st.date_input("Último Vencimento*", value=date(2023, 12, 10), format="DD/MM/YYYY")
+        with col3:
+            valor_mensal = st.number_input("Valor Mensal*", min_value=0.0, step=0.01, value=1500.0)
+    elif modo == MODOS_ENTRADA[1]:
+        texto_parcelas = st.text_area(
+            "Vencimento e valor de cada parcela*", height=200,
+            placeholder="10/01/2020;1.500,00\n10/02/2020;1.500,00\n10/03/2020;1.650,00",
+            help="Uma parcela por linha. Colunas separadas por ';' ou tabulação (cópia de planilha)."
+        )
+    else:
+        arquivo_parcelas = st.file_uploader("Arquivo de parcelas (vencimento e valor)*", type=["csv", "txt"])
+
+    # 🔹 Parâmetros do cálculo
+    if calculadora == "tjrj":
+        col1, col2 = st.columns(2)
+        with col1:
+            data_final = st.date_input("Data Final*", value=date(2025, 6, 30), format="DD/MM/YYYY")
+            indice_correcao = st.selectbox("Índice de Correção Monetária*", INDICES_CORRECAO,
+                                           index=INDICES_CORRECAO.index("INPC"))
+            tipo_juros = st.selectbox("Tipo de Juros*", TIPOS_JUROS, index=2)
+            tipo_obrigacao = None
+            if tipo_juros == JUROS_CODIGO_CIVIL:
+                tipo_obrigacao = st.radio("Tipo da obrigação:", TIPOS_OBRIGACAO)
+        with col2:
+            honorarios = st.number_input("Honorários (%)", min_value=0.0, step=0.1, value=10.0)
+            aplicar_523 = st.checkbox("Aplicar Art. 523 §1º CPC (10% Multa + 10% Honorários)")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            data_final_cor_mon = st.date_input("Data Final de Incidência da Correção Monetária*",
+                                               value=date(2025, 6, 30), format="DD/MM/YYYY")
+            data_final_juros = st.date_input("Data Final de Incidência dos Juros*", value=DATA_CORTE_IPCA_SELIC,
+                                             format="DD/MM/YYYY")
+        with col2:
+            honorarios_percentual = st.number_input("Honorários (%)", min_value=0.0, step=0.1, value=10.0)
+
+    submitted = st.form_submit_button("Calcular")
+
+
+# 🔸 FUNÇÃO para obter a tabela de parcelas conforme o modo de entrada
+def obter_parcelas():
+    if modo == MODOS_ENTRADA[0]:
+        if ultimo_vencimento < primeiro_vencimento:
+            raise ValueError("O último vencimento deve ser posterior ao primeiro.")
+        return gerar_parcelas(primeiro_vencimento, ultimo_vencimento, valor_mensal)
+    if modo == MODOS_ENTRADA[1]:
+        if not texto_parcelas.strip():
+            raise ValueError("Cole a tabela de parcelas (vencimento e valor).")
+        return ler_parcelas(texto_parcelas)
+    if arquivo_parcelas is None:
+        raise ValueError("Selecione o arquivo de parcelas.")
+    return ler_parcelas(arquivo_parcelas)
+
+
+# 🔸 FUNÇÃO para descartar (com aviso) as parcelas que vencem depois da data final do cálculo
+def parcelas_vencidas(parcelas, data_limite):
+    vencidas = parcelas["vencimento"].dt.date <= data_limite
+    if not vencidas.any():
+        raise ValueError("Nenhuma parcela vencida até a data final do cálculo.")
+    if not vencidas.all():
+        st.warning(f"⚠️ {int((~vencidas).sum())} parcela(s) com vencimento posterior a "
+                   f"{data_limite.strftime('%d/%m/%Y')} não entram no cálculo.")
+    return parcelas[vencidas]
+
+
+if submitted:
+    if calculadora == "tjrj":
+        data_limite = data_final
+        parametros = dict(data_final=data_final, tipo_juros=tipo_juros, tipo_obrigacao=tipo_obrigacao,
+                          honorarios=honorarios, aplicar_523=aplicar_523, indice_correcao=indice_correcao)
+        coluna_total = "total"
+    else:
+        data_limite = data_final_cor_mon
+        parametros = dict(data_final_cor_mon=data_final_cor_mon, data_final_juros=data_final_juros,
+                          honorarios_percentual=honorarios_percentual)
+        coluna_total = "total_resultado1"
+
+    try:
+        with medidor.etapa("parcelas"):
+            parcelas = parcelas_vencidas(obter_parcelas(), data_limite)
+    except ValueError as erro:
+        st.error(f"❌ {erro}")
+        parcelas = None
+
+if submitted and parcelas is not None:
+    with medidor.etapa("calculo"):
+        tabela = calcular_parcelas(parcelas, calculadora, **parametros)
+        soma = totais(tabela, calculadora)
+
+    st.success(f"✅ {len(tabela):,} parcelas calculadas.")
+    if calculadora == "tjrj" and indice_correcao != SEM_CORRECAO:
+        serie = SERIES_CORRECAO[indice_correcao]
+        ultimo_mes_indice = ultimo_mes_serie(serie).astype(date)
+        if (data_final.year, data_final.month) > (ultimo_mes_indice.year, ultimo_mes_indice.month):
+            st.warning(f"⚠️ A série do índice {indice_correcao} vai até {ultimo_mes_indice:%m/%Y}; a correção "
+                       f"monetária para nesse mês. Atualize `data/{ARQUIVOS_SERIES[serie][0]}`.")
+
+    # 🔹 Métricas do débito
+    with medidor.etapa("metricas"):
+        col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+        with col_m1:
+            st.metric("Parcelas", f"{len(tabela):,}")
+        with col_m2:
+            st.metric("Soma das Parcelas", f"R$ {soma['valor']:,.2f}")
+        with col_m3:
+            st.metric("Atualização e Encargos", f"R$ {soma[coluna_total] - soma['valor']:,.2f}")
+        with col_m4:
+            st.metric("Total do Débito", f"R$ {soma[coluna_total]:,.2f}")
+        if calculadora == "fazenda":
+            st.caption(f"Resultado 2 (Selic sobre o consolidado): R$ {soma['total_resultado2']:,.2f}")
+
+    # 🔹 Gráfico e tabela por parcela
+    with medidor.etapa("graficos"):
+        fig_parcelas = montar_fig_parcelas(tuple(tabela["vencimento"].dt.date), tuple(tabela["valor"]),
+                                           tuple(tabela[coluna_total]))
+        st.plotly_chart(fig_parcelas, use_container_width=True)
+
+    with medidor.etapa("tabela"):
+        exibicao = tabela[list(COLUNAS[calculadora])].rename(columns=COLUNAS[calculadora])
+        st.dataframe(exibicao, use_container_width=True, hide_index=True,
+                     column_config={"Vencimento": st.column_config.DateColumn(format="DD/MM/YYYY")})
+        st.download_button("📥 Baixar Parcelas (CSV)", ao_clicar(gerar_csv, [exibicao]),
+                           file_name=f"parcelas_{calculadora}.csv", mime="text/csv", on_click="ignore")
+
+if painel_desempenho:
+    exibir_painel(area_desempenho, medidor)
+
+st.markdown("---")
+st.markdown("""
+        <div style='text-align: center; color: #666; font-size: 12px;'>
+        Cálculo realizado por ferramenta desenvolvida por Pedro Potz<br>
+        Advogado especializado em soluções jurídico-tecnológicas<br>
+        🦄 <em>Advogado que programa é unicórnio!</em>
+        </div>
+        """, unsafe_allow_html=True)
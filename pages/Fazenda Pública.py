@@ -1,11 +1,19 @@
 import streamlit as st
-from datetime import datetime
-from streamlit_card import card
-from dateutil.relativedelta import relativedelta
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+from datetime import date, datetime, timedelta
+
+from utils.calculo_fazenda import DATA_CORTE_IPCA_SELIC
+from utils.centavos import formatar_reais, para_centavos
+from utils.datas import ANO_COMERCIAL, dias_corridos, fracao_de_ano
+from utils.desempenho import Medidor, exibir_painel
+from utils.etapas import GRAFO_FAZENDA
+from utils.evolucao import DIARIA, MENSAL
+from utils.exportacao import (MIME_XLSX, ao_clicar, gerar_csv, gerar_graficos, gerar_resumo,
+                              gerar_xlsx, memoria_calculo_fazenda)
+from utils.graficos import (montar_fig_comparacao_fazenda, montar_fig_evolucao_fazenda, montar_fig_pizza_fazenda,
+                             montar_fig_preview_fazenda)
+from utils.historico import exibir_historico, normalizar_processo, obter_historico
+from utils.indices import carregar_selic
+from utils.projecao import calibrar_modelo, inicio_da_projecao, projetar_selic
 
 st.set_page_config(page_title="Cálculo de Débitos Judiciais - Fazenda Pública", page_icon="🏛️")
 
@@ -22,6 +30,13 @@ with st.sidebar:
     st.header("Pedro Potz")
     st.markdown("Advogado Programador")
     st.link_button(" Visite meu novo site", "http://pedrop.vercel.app")
+    st.markdown("---")
+    painel_desempenho = st.toggle("🛠️ Painel de desempenho",
+                                  help="Tempo e memória de cada etapa (medir a memória deixa a página mais lenta)")
+    area_desempenho = st.container()
+
+# 🔸 Medição das etapas desta execução (exibida no painel lateral)
+medidor = Medidor("fazenda", alocacao=painel_desempenho)
 
 # --- Observações da calculadora ---
 st.info("""
@@ -37,6 +52,13 @@ Os honorários serão calculados sobre o valor corrigido somado aos juros.
 with st.form("form_calculo_fazenda"):
     st.write("Cálculo de débitos a partir de 01/07/1994 até a data atual.")
 
+    col_p1, col_p2 = st.columns(2)
+    with col_p1:
+        numero_processo = st.text_input("Número do Processo (CNJ)", placeholder="0000000-00.0000.8.19.0000",
+                                        help="Opcional: o cálculo fica registrado no histórico deste processo.")
+    with col_p2:
+        ente = st.text_input("Ente Devedor", placeholder="Ex.: Estado do Rio de Janeiro")
+
     col1, col2 = st.columns(2)
     with col1:
         data_inicial_cor_mon = st.date_input("Data Inicial de Incidência da Correção Monetária*",
@@ -65,138 +87,150 @@ with st.form("form_calculo_fazenda"):
 
     honorarios_percentual = st.number_input("Honorários (%)", min_value=0.0, step=0.1, value=10.0)
 
+    granularidade = st.radio("Granularidade do gráfico de evolução", (MENSAL, DIARIA), horizontal=True)
+
+    projetar = st.checkbox("📅 Projetar até a data prevista de pagamento (precatório)",
+                           help="Simula caminhos futuros da Selic (Monte Carlo) calibrados na série histórica")
+    col5, col6 = st.columns(2)
+    with col5:
+        data_pagamento = st.date_input("Data Prevista de Pagamento", value=date.today() + timedelta(days=2 * 365),
+                                       format="DD/MM/YYYY")
+    with col6:
+        caminhos = st.number_input("Simulações da Selic", min_value=1_000, max_value=200_000, value=20_000,
+                                   step=1_000)
+    with st.expander("⚙️ Modelo da Selic (reversão à média)"):
+        modelo_padrao = calibrar_modelo()
+        selic_media = st.number_input("Selic média de longo prazo (% a.a.)", min_value=0.0, max_value=50.0,
+                                      value=round(modelo_padrao["media"] * 100, 2), step=0.25)
+        reversao = st.number_input("Velocidade de reversão à média (por mês)", min_value=0.0, max_value=1.0,
+                                   value=round(modelo_padrao["reversao"], 3), step=0.01, format="%.3f")
+        volatilidade = st.number_input("Volatilidade (p.p. ao mês)", min_value=0.0, max_value=10.0,
+                                       value=round(modelo_padrao["volatilidade"] * 100, 3), step=0.05, format="%.3f")
+
     submitted = st.form_submit_button("Calcular")
 
+
+# 🔸 Valores exibidos no padrão brasileiro (R$ 1.234,56), arredondados ao centavo
+def reais(valor):
+    return formatar_reais(para_centavos(valor))
+
+
+# 🔸 Cálculo incremental: IPCA-e, juros, Selic, valores e honorários são etapas memoizadas pelas suas entradas,
+# então alterar só os honorários não refaz os segmentos de IPCA-e e Selic
+def calcular(valor, data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros, data_final_juros,
+             honorarios_percentual):
+    return GRAFO_FAZENDA.calcular(
+        medidor, valor=valor, data_inicial_cor_mon=data_inicial_cor_mon, data_final_cor_mon=data_final_cor_mon,
+        data_inicial_juros=data_inicial_juros, data_final_juros=data_final_juros,
+        honorarios_percentual=honorarios_percentual
+    )
+
+
+# 🔸 FUNÇÃO para validar o número do processo (opcional) no formato CNJ
+def numero_do_processo(texto):
+    try:
+        return normalizar_processo(texto), None
+    except ValueError as erro:
+        return None, str(erro)
+
+
 # 🔸 Processamento
 if submitted:
-    if data_final_cor_mon < data_inicial_cor_mon:
+    processo, erro_processo = numero_do_processo(numero_processo)
+    if erro_processo:
+        st.error(f"❌ {erro_processo}")
+    elif data_final_cor_mon < data_inicial_cor_mon:
         st.error("❌ A Data Final de Correção Monetária não pode ser anterior à Data Inicial.")
     elif data_final_juros < data_inicial_juros:
         st.error("❌ A Data Final de Juros não pode ser anterior à Data Inicial.")
     else:
         # --- Lógica de Cálculo da Fazenda Pública ---
-        # Definir a data de corte para a mudança de índice
-        data_corte_ipca_selic = datetime(2021, 11, 30).date()
-
-        # --- Cálculo da Correção Monetária (IPCA-e até 30/11/2021) ---
-        valor_corrigido_ipcae = valor  # Valor inicial para correção
-
-        # Simulação de correção IPCA-e (Para um cálculo real, você precisaria de uma tabela de índices)
-        # Por simplicidade, vamos aplicar uma correção baseada no tempo, mas para um cálculo preciso
-        # seria necessário um dataframe de índices IPCA-e.
-        if data_inicial_cor_mon <= data_corte_ipca_selic:
-            # Período IPCA-e
-            inicio_ipcae = data_inicial_cor_mon
-            fim_ipcae = min(data_final_cor_mon, data_corte_ipca_selic)
-
-            # Cálculo de meses para IPCA-e
-            diff_ipcae = relativedelta(fim_ipcae, inicio_ipcae)
-            meses_ipcae = diff_ipcae.years * 12 + diff_ipcae.months
-            meses_ipcae = max(meses_ipcae, 0)
-
-            # Exemplo de fator de correção hipotético para IPCA-e (apenas para demonstração)
-            # Em um cenário real, você buscaria os índices mensais do IPCA-e
-            fator_correcao_ipcae = (1 + (0.005 * meses_ipcae))  # 0.5% ao mês, apenas um exemplo
-            valor_corrigido_ipcae = valor * fator_correcao_ipcae
-        else:
-            valor_corrigido_ipcae = valor  # Se a data inicial for posterior ao corte, não aplica IPCA-e
-
-        # --- Cálculo dos Juros (limitados a 30/11/2021) ---
-        valor_juros_ate_corte = 0
-        if data_inicial_juros <= data_corte_ipca_selic:
-            # Período de juros até o corte
-            inicio_juros = data_inicial_juros
-            fim_juros = min(data_final_juros, data_corte_ipca_selic)
-
-            diff_juros = relativedelta(fim_juros, inicio_juros)
-            meses_juros = diff_juros.years * 12 + diff_juros.months
-            meses_juros = max(meses_juros, 0)
-
-            # Taxa de juros para Fazenda Pública (geralmente 0.5% ao mês antes da Selic)
-            taxa_juros_mensal = 0.005  # 0,5% ao mês
-            valor_juros_ate_corte = valor * (taxa_juros_mensal * meses_juros)
-
-        # --- Cálculo a partir de 01/12/2021 (Selic) ---
-        valor_principal_corrigido_selic = 0
-        valor_consolidado_selic = 0
-        juros_selic_sobre_principal = 0
-        juros_selic_sobre_consolidado = 0
-
-        if data_final_cor_mon > data_corte_ipca_selic:
-            # A Selic incide sobre o valor principal corrigido (até a data do corte)
-            # e sobre o valor do débito consolidado (principal corrigido + juros até o corte)
-
-            # Data de início da Selic
-            inicio_selic = max(data_inicial_cor_mon, data_corte_ipca_selic + relativedelta(days=1))
-            fim_selic = data_final_cor_mon  # A Selic vai até a data final de correção monetária
-
-            diff_selic = relativedelta(fim_selic, inicio_selic)
-            dias_selic = (fim_selic - inicio_selic).days
-            # Para cálculo da Selic, precisamos da taxa diária. Simulação de taxa Selic anual (ex: 10% a.a.)
-            # Para um cálculo real, você precisaria de uma API ou tabela de índices Selic diários/mensais.
-            taxa_selic_anual_exemplo = 0.10
-            taxa_selic_diaria_exemplo = (1 + taxa_selic_anual_exemplo) ** (1 / 365) - 1
-
-            # --- Resultado 1: Selic sobre Principal Corrigido (até o corte) ---
-            # O valor base para a Selic é o valor corrigido pelo IPCA-e até 30/11/2021
-            # Se a data inicial da correção for depois de 30/11/2021, a Selic incide sobre o valor original.
-            base_para_selic_principal = valor_corrigido_ipcae if data_inicial_cor_mon <= data_corte_ipca_selic else valor
-            juros_selic_sobre_principal = base_para_selic_principal * (
-                        (1 + taxa_selic_diaria_exemplo) ** dias_selic - 1)
-            valor_principal_corrigido_selic = base_para_selic_principal + juros_selic_sobre_principal
-
-            # --- Resultado 2: Selic sobre Débito Consolidado (Principal Corrigido + Juros até o corte) ---
-            base_para_selic_consolidado = (
-                        valor_corrigido_ipcae + valor_juros_ate_corte) if data_inicial_cor_mon <= data_corte_ipca_selic else (
-                        valor + valor_juros_ate_corte)
-            juros_selic_sobre_consolidado = base_para_selic_consolidado * (
-                        (1 + taxa_selic_diaria_exemplo) ** dias_selic - 1)
-            valor_consolidado_selic = base_para_selic_consolidado + juros_selic_sobre_consolidado
-
-        # --- Cálculo dos Honorários ---
-        # Os honorários são calculados sobre o valor corrigido somado aos juros.
-        # Para a Fazenda Pública, com dois resultados, vamos calcular honorários para cada um.
-        honorarios_resultado1 = (valor_principal_corrigido_selic) * (honorarios_percentual / 100)
-        honorarios_resultado2 = (valor_consolidado_selic) * (honorarios_percentual / 100)
-
-        # --- Totais Finais ---
-        total_resultado1 = valor_principal_corrigido_selic + honorarios_resultado1
-        total_resultado2 = valor_consolidado_selic + honorarios_resultado2
+        data_corte_ipca_selic = DATA_CORTE_IPCA_SELIC
+
+        # Mesmas entradas e mesma versão das tabelas de índices: o resultado vem do histórico, sem recalcular
+        with medidor.etapa("historico"):
+            resultado, reaproveitado = obter_historico().calcular("fazenda", calcular, dict(
+                valor=valor, data_inicial_cor_mon=data_inicial_cor_mon, data_final_cor_mon=data_final_cor_mon,
+                data_inicial_juros=data_inicial_juros, data_final_juros=data_final_juros,
+                honorarios_percentual=honorarios_percentual
+            ), processo, ente, campo_total="total_resultado1")
+        if reaproveitado:
+            st.caption("♻️ Resultado recuperado do histórico (mesmas entradas e mesmas tabelas de índices).")
+        valor_corrigido_ipcae = resultado["valor_corrigido_ipcae"]
+        valor_juros_ate_corte = resultado["valor_juros_ate_corte"]
+        juros_selic_sobre_principal = resultado["juros_selic_sobre_principal"]
+        valor_principal_corrigido_selic = resultado["valor_principal_corrigido_selic"]
+        juros_selic_sobre_consolidado = resultado["juros_selic_sobre_consolidado"]
+        valor_consolidado_selic = resultado["valor_consolidado_selic"]
+        honorarios_resultado1 = resultado["honorarios_resultado1"]
+        honorarios_resultado2 = resultado["honorarios_resultado2"]
+        total_resultado1 = resultado["total_resultado1"]
+        total_resultado2 = resultado["total_resultado2"]
 
         # 🧾 Saída formatada
-        st.subheader("📊 Resultado do Cálculo")
-        st.write(f"💰 **Valor Base:** R$ {valor:,.2f}")
-        st.write(
-            f"📅 **Período de Correção Monetária (IPCA-e):** {data_inicial_cor_mon.strftime('%d/%m/%Y')} a {min(data_final_cor_mon, data_corte_ipca_selic).strftime('%d/%m/%Y')}")
-        st.write(
-            f"📅 **Período de Juros (até 30/11/2021):** {data_inicial_juros.strftime('%d/%m/%Y')} a {min(data_final_juros, data_corte_ipca_selic).strftime('%d/%m/%Y')}")
-        st.write(
-            f"📅 **Período de Selic (a partir de 01/12/2021):** {max(data_inicial_cor_mon, data_corte_ipca_selic + relativedelta(days=1)).strftime('%d/%m/%Y')} a {data_final_cor_mon.strftime('%d/%m/%Y')}")
-
-        st.markdown("---")
-        st.markdown("### **Resultado 1: Selic sobre o Principal Corrigido (IPCA-e)**")
-        st.write(f"📈 **Valor Corrigido (IPCA-e até 30/11/2021):** R$ {valor_corrigido_ipcae:,.2f}")
-        st.write(f"📈 **Juros SELIC sobre Principal Corrigido:** R$ {juros_selic_sobre_principal:,.2f}")
-        st.write(f"🔧 **Valor Principal Corrigido com SELIC:** R$ {valor_principal_corrigido_selic:,.2f}")
-        st.write(f"⚖️ **Honorários ({honorarios_percentual}%):** R$ {honorarios_resultado1:,.2f}")
-        st.success(
-            f"💵 **Total Final (Resultado 1):** R$ {total_resultado1:,.2f}".replace(",", "X").replace(".", ",").replace(
-                "X", "."))
-
-        st.markdown("---")
-        st.markdown(
-            "### **Resultado 2: Selic sobre o Débito Consolidado (Principal Corrigido + Juros até 30/11/2021)**")
-        st.write(f"📈 **Valor Juros (até 30/11/2021):** R$ {valor_juros_ate_corte:,.2f}")
-        st.write(f"📈 **Juros SELIC sobre Débito Consolidado:** R$ {juros_selic_sobre_consolidado:,.2f}")
-        st.write(f"🔧 **Valor Consolidado com SELIC:** R$ {valor_consolidado_selic:,.2f}")
-        st.write(f"⚖️ **Honorários ({honorarios_percentual}%):** R$ {honorarios_resultado2:,.2f}")
-        st.success(
-            f"💵 **Total Final (Resultado 2):** R$ {total_resultado2:,.2f}".replace(",", "X").replace(".", ",").replace(
-                "X", "."))
-
-        st.markdown("---")
-        st.warning(
-            "⚠️ **Atenção:** Os cálculos de correção monetária (IPCA-e) e juros (Selic) são simulados para fins de demonstração. Em uma aplicação real, você precisaria integrar bases de dados de índices oficiais para garantir a precisão dos cálculos.")
+        with medidor.etapa("resultados"):
+            st.subheader("📊 Resultado do Cálculo")
+            st.write(f"💰 **Valor Base:** {reais(valor)}")
+            st.write(
+                f"📅 **Período de Correção Monetária (IPCA-e):** {data_inicial_cor_mon.strftime('%d/%m/%Y')} a {min(data_final_cor_mon, data_corte_ipca_selic).strftime('%d/%m/%Y')}")
+            st.write(
+                f"📅 **Período de Juros (até 30/11/2021):** {data_inicial_juros.strftime('%d/%m/%Y')} a {min(data_final_juros, data_corte_ipca_selic).strftime('%d/%m/%Y')}")
+            st.write(
+                f"📅 **Período de Selic (a partir de 01/12/2021):** {max(data_inicial_cor_mon, data_corte_ipca_selic + timedelta(days=1)).strftime('%d/%m/%Y')} a {data_final_cor_mon.strftime('%d/%m/%Y')}")
+
+            st.markdown("---")
+            st.markdown("### **Resultado 1: Selic sobre o Principal Corrigido (IPCA-e)**")
+            st.write(f"📈 **Valor Corrigido (IPCA-e até 30/11/2021):** {reais(valor_corrigido_ipcae)}")
+            st.write(f"📈 **Juros SELIC sobre Principal Corrigido:** {reais(juros_selic_sobre_principal)}")
+            st.write(f"🔧 **Valor Principal Corrigido com SELIC:** {reais(valor_principal_corrigido_selic)}")
+            st.write(f"⚖️ **Honorários ({honorarios_percentual}%):** {reais(honorarios_resultado1)}")
+            st.success(f"💵 **Total Final (Resultado 1):** {reais(total_resultado1)}")
+
+            st.markdown("---")
+            st.markdown(
+                "### **Resultado 2: Selic sobre o Débito Consolidado (Principal Corrigido + Juros até 30/11/2021)**")
+            st.write(f"📈 **Valor Juros (até 30/11/2021):** {reais(valor_juros_ate_corte)}")
+            st.write(f"📈 **Juros SELIC sobre Débito Consolidado:** {reais(juros_selic_sobre_consolidado)}")
+            st.write(f"🔧 **Valor Consolidado com SELIC:** {reais(valor_consolidado_selic)}")
+            st.write(f"⚖️ **Honorários ({honorarios_percentual}%):** {reais(honorarios_resultado2)}")
+            st.success(f"💵 **Total Final (Resultado 2):** {reais(total_resultado2)}")
+
+            st.markdown("---")
+            st.warning(
+                "⚠️ **Atenção:** A correção monetária (IPCA-e) e a Selic (acumulada por dias úteis) utilizam as tabelas locais de índices. Confira os índices com as bases oficiais antes de utilizar o cálculo.")
+            ultima_data_selic = carregar_selic().data_final.item()
+            if data_final_cor_mon > ultima_data_selic:
+                st.warning(
+                    f"⚠️ A tabela local da Selic vai até {ultima_data_selic.strftime('%d/%m/%Y')}; após essa data não há incidência de Selic no cálculo.")
+
+        # 🔹 Projeção até o pagamento: a Selic futura é simulada e os totais são multiplicados pelo fator de cada caminho
+        projecao = None
+        if projetar:
+            inicio_projecao = inicio_da_projecao(data_final_cor_mon)
+            if data_final_cor_mon <= data_corte_ipca_selic:
+                st.warning("⚠️ A projeção parte do regime da Selic: a Data Final de Correção Monetária deve ser "
+                           "posterior a 30/11/2021.")
+            elif data_pagamento <= inicio_projecao:
+                st.warning(f"⚠️ A Data Prevista de Pagamento deve ser posterior a "
+                           f"{inicio_projecao.strftime('%d/%m/%Y')}, início da projeção.")
+            else:
+                projecao = dict(inicio=inicio_projecao, fim=data_pagamento, caminhos=caminhos,
+                                media=selic_media / 100, reversao=reversao, volatilidade=volatilidade / 100)
+                with medidor.etapa("projecao"):
+                    resultado_projecao = projetar_selic(**projecao)
+                fatores_pagamento = resultado_projecao["fatores"][:, -1]
+
+                st.markdown("---")
+                st.markdown(f"### **🔮 Projeção até {data_pagamento.strftime('%d/%m/%Y')} ({caminhos:,} simulações)**")
+                st.dataframe({
+                    "Percentil": [f"P{p}" for p in resultado_projecao["percentis"]],
+                    "Selic acumulada": [f"{f - 1:.2%}" for f in fatores_pagamento],
+                    "Total Resultado 1": [reais(total_resultado1 * f) for f in fatores_pagamento],
+                    "Total Resultado 2": [reais(total_resultado2 * f) for f in fatores_pagamento],
+                }, hide_index=True, use_container_width=True)
+                st.caption(f"Selic projetada a partir de {inicio_projecao.strftime('%d/%m/%Y')}: média de longo prazo "
+                           f"{selic_media:.2f}% a.a., reversão {reversao:.3f} ao mês, volatilidade "
+                           f"{volatilidade:.3f} p.p. ao mês. Projeção estatística, sem valor de previsão oficial.")
 
         # 📊 SEÇÃO DE VISUALIZAÇÕES AVANÇADAS
         st.markdown("---")
@@ -206,223 +240,183 @@ if submitted:
         # 🔹 Gráfico 1: Evolução do Valor no Tempo
         st.subheader("🚀 Evolução do Débito ao Longo do Tempo")
 
-        # Criando dados históricos para visualização
-        datas_historicas = pd.date_range(start=data_inicial_cor_mon, end=data_final_cor_mon, freq='MS')
-        valores_historicos = []
-
-        for data in datas_historicas:
-            # Simulação de crescimento progressivo
-            meses_decorridos = (data.date() - data_inicial_cor_mon).days // 30
-            if data.date() <= data_corte_ipca_selic:
-                # Período IPCA-e
-                valor_temp = valor * (1 + (0.005 * meses_decorridos))
-            else:
-                # Período Selic
-                dias_selic = (data.date() - data_corte_ipca_selic).days
-                valor_temp = valor_corrigido_ipcae * (1 + (0.00027 * dias_selic))
-            valores_historicos.append(valor_temp)
-
-        df_historico = pd.DataFrame({
-            'Data': datas_historicas,
-            'Valor_Corrigido': valores_historicos,
-            'Regime': ['IPCA-e' if d.date() <= data_corte_ipca_selic else 'SELIC' for d in datas_historicas]
-        })
-
-        fig_evolucao = px.line(df_historico, x='Data', y='Valor_Corrigido',
-                               color='Regime',
-                               title='Evolução do Débito: IPCA-e vs SELIC',
-                               labels={'Valor_Corrigido': 'Valor (R$)', 'Data': 'Período'},
-                               color_discrete_map={'IPCA-e': '#FF6B6B', 'SELIC': '#4ECDC4'})
-
-        fig_evolucao.update_layout(
-            template='plotly_white',
-            height=500,
-            showlegend=True,
-            hovermode='x unified'
-        )
-
-        fig_evolucao.update_traces(line=dict(width=3))
-        st.plotly_chart(fig_evolucao, use_container_width=True)
+        with medidor.etapa("grafico_evolucao"):
+            fig_evolucao = montar_fig_evolucao_fazenda(valor, data_inicial_cor_mon, data_final_cor_mon, granularidade,
+                                                       projecao)
+            st.plotly_chart(fig_evolucao, use_container_width=True)
 
         # 🔹 Gráfico 2: Comparação dos Resultados
         st.subheader("⚖️ Comparação: Dois Métodos de Cálculo")
 
-        categorias = ['Valor Base', 'Correção IPCA-e', 'Juros SELIC', 'Honorários', 'Total Final']
-
-        # Dados para Resultado 1
-        valores_resultado1 = [
-            valor,
-            valor_corrigido_ipcae - valor,
-            juros_selic_sobre_principal,
-            honorarios_resultado1,
-            total_resultado1
-        ]
-
-        # Dados para Resultado 2
-        valores_resultado2 = [
-            valor,
-            valor_corrigido_ipcae - valor + valor_juros_ate_corte,
-            juros_selic_sobre_consolidado,
-            honorarios_resultado2,
-            total_resultado2
-        ]
-
-        fig_comparacao = go.Figure()
-
-        fig_comparacao.add_trace(go.Bar(
-            name='Resultado 1: SELIC sobre Principal',
-            x=categorias,
-            y=valores_resultado1,
-            marker_color='#FF6B6B',
-            text=[f'R$ {v:,.0f}' for v in valores_resultado1],
-            textposition='auto',
-        ))
-
-        fig_comparacao.add_trace(go.Bar(
-            name='Resultado 2: SELIC sobre Consolidado',
-            x=categorias,
-            y=valores_resultado2,
-            marker_color='#4ECDC4',
-            text=[f'R$ {v:,.0f}' for v in valores_resultado2],
-            textposition='auto',
-        ))
-
-        fig_comparacao.update_layout(
-            title='Comparação Detalhada dos Métodos de Cálculo',
-            xaxis_title='Componentes do Cálculo',
-            yaxis_title='Valor (R$)',
-            barmode='group',
-            template='plotly_white',
-            height=500
-        )
-
-        st.plotly_chart(fig_comparacao, use_container_width=True)
+        with medidor.etapa("grafico_comparacao"):
+            categorias = ['Valor Base', 'Correção IPCA-e', 'Juros SELIC', 'Honorários', 'Total Final']
 
-        # 🔹 Gráfico 3: Impacto dos Juros
-        st.subheader("💰 Impacto dos Juros: Visualização do Crescimento")
+            # Dados para Resultado 1
+            valores_resultado1 = [
+                valor,
+                valor_corrigido_ipcae - valor,
+                juros_selic_sobre_principal,
+                honorarios_resultado1,
+                total_resultado1
+            ]
 
-        # Criando gráfico de pizza para mostrar composição
-        labels_pizza = ['Valor Original', 'Correção Monetária', 'Juros SELIC', 'Honorários']
-
-        # Usando Resultado 1 para o gráfico de pizza
-        valores_pizza = [
-            valor,
-            valor_corrigido_ipcae - valor,
-            juros_selic_sobre_principal,
-            honorarios_resultado1
-        ]
-
-        fig_pizza = go.Figure(data=[go.Pie(
-            labels=labels_pizza,
-            values=valores_pizza,
-            hole=0.4,
-            marker_colors=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
-        )])
-
-        fig_pizza.update_layout(
-            title=f'Composição do Débito Total: R$ {total_resultado1:,.2f}',
-            template='plotly_white',
-            height=500
-        )
-
-        st.plotly_chart(fig_pizza, use_container_width=True)
+            # Dados para Resultado 2
+            valores_resultado2 = [
+                valor,
+                valor_corrigido_ipcae - valor + valor_juros_ate_corte,
+                juros_selic_sobre_consolidado,
+                honorarios_resultado2,
+                total_resultado2
+            ]
 
-        # 🔹 Métricas Destacadas
-        st.subheader("📊 Métricas de Impacto")
-
-        col_m1, col_m2, col_m3, col_m4 = st.columns(4)
-
-        with col_m1:
-            crescimento_total = ((total_resultado1 - valor) / valor) * 100
-            st.metric(
-                label="Crescimento Total",
-                value=f"{crescimento_total:.1f}%",
-                delta=f"R$ {total_resultado1 - valor:,.2f}"
-            )
-
-        with col_m2:
-            impacto_juros = (juros_selic_sobre_principal / total_resultado1) * 100
-            st.metric(
-                label="Impacto dos Juros",
-                value=f"{impacto_juros:.1f}%",
-                delta=f"R$ {juros_selic_sobre_principal:,.2f}"
-            )
-
-        with col_m3:
-            diferenca_metodos = total_resultado2 - total_resultado1
-            st.metric(
-                label="Diferença entre Métodos",
-                value=f"R$ {diferenca_metodos:,.2f}",
-                delta=f"{(diferenca_metodos / total_resultado1) * 100:.1f}%"
-            )
-
-        with col_m4:
-            tempo_total = (data_final_cor_mon - data_inicial_cor_mon).days
-            st.metric(
-                label="Período Total",
-                value=f"{tempo_total} dias",
-                delta=f"{tempo_total / 365:.1f} anos"
-            )
+            fig_comparacao = montar_fig_comparacao_fazenda(categorias, valores_resultado1, valores_resultado2)
 
-        # 🔹 Insights Automáticos
-        st.subheader("🎯 Insights Jurídicos Automáticos")
+            st.plotly_chart(fig_comparacao, use_container_width=True)
 
-        insights = []
-        if crescimento_total > 100:
-            insights.append(
-                f"🔥 **Alto Impacto:** O débito cresceu {crescimento_total:.1f}%, mais que dobrando o valor original!")
+        # 🔹 Gráfico 3: Impacto dos Juros
+        st.subheader("💰 Impacto dos Juros: Visualização do Crescimento")
 
-        if diferenca_metodos > 0:
-            insights.append(
-                f"⚖️ **Estratégia:** O Método 2 resulta em R$ {diferenca_metodos:,.2f} a mais. Considere a argumentação processual adequada.")
+        # Criando gráfico de pizza para mostrar composição
+        with medidor.etapa("grafico_pizza"):
+            labels_pizza = ['Valor Original', 'Correção Monetária', 'Juros SELIC', 'Honorários']
 
-        if impacto_juros > 30:
-            insights.append(
-                f"📈 **Juros Significativos:** {impacto_juros:.1f}% do valor final são juros. Fundamental demonstrar a mora.")
+            # Usando Resultado 1 para o gráfico de pizza
+            valores_pizza = [
+                valor,
+                valor_corrigido_ipcae - valor,
+                juros_selic_sobre_principal,
+                honorarios_resultado1
+            ]
 
-        if tempo_total > 1825:  # Mais de 5 anos
-            insights.append(
-                f"⏰ **Prescrição:** Período de {tempo_total / 365:.1f} anos. Verificar eventual prescrição intercorrente.")
+            fig_pizza = montar_fig_pizza_fazenda(labels_pizza, valores_pizza, total_resultado1)
 
-        for insight in insights:
-            st.info(insight)
+            st.plotly_chart(fig_pizza, use_container_width=True)
 
-        # 🔹 Resumo Executivo
-        st.subheader("📋 Resumo Executivo para Petição")
+        # 🔹 Métricas Destacadas
+        with medidor.etapa("metricas"):
+            st.subheader("📊 Métricas de Impacto")
+
+            col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+
+            with col_m1:
+                crescimento_total = ((total_resultado1 - valor) / valor) * 100
+                st.metric(
+                    label="Crescimento Total",
+                    value=f"{crescimento_total:.1f}%",
+                    delta=reais(total_resultado1 - valor)
+                )
+
+            with col_m2:
+                impacto_juros = (juros_selic_sobre_principal / total_resultado1) * 100
+                st.metric(
+                    label="Impacto dos Juros",
+                    value=f"{impacto_juros:.1f}%",
+                    delta=reais(juros_selic_sobre_principal)
+                )
+
+            with col_m3:
+                diferenca_metodos = total_resultado2 - total_resultado1
+                st.metric(
+                    label="Diferença entre Métodos",
+                    value=reais(diferenca_metodos),
+                    delta=f"{(diferenca_metodos / total_resultado1) * 100:.1f}%"
+                )
+
+            with col_m4:
+                tempo_total = int(dias_corridos(data_inicial_cor_mon, data_final_cor_mon))
+                anos_totais = float(fracao_de_ano(data_inicial_cor_mon, data_final_cor_mon, ANO_COMERCIAL))
+                st.metric(
+                    label="Período Total",
+                    value=f"{tempo_total} dias",
+                    delta=f"{anos_totais:.1f} anos"
+                )
+
+        # 🔹 Insights Automáticos
+        with medidor.etapa("insights"):
+            st.subheader("🎯 Insights Jurídicos Automáticos")
 
-        resumo_texto = f"""
-        **CÁLCULO DE DÉBITO JUDICIAL - FAZENDA PÚBLICA**
+            insights = []
+            if crescimento_total > 100:
+                insights.append(
+                    f"🔥 **Alto Impacto:** O débito cresceu {crescimento_total:.1f}%, mais que dobrando o valor original!")
 
-        **Valor Base:** R$ {valor:,.2f}
-        **Período:** {data_inicial_cor_mon.strftime('%d/%m/%Y')} a {data_final_cor_mon.strftime('%d/%m/%Y')}
+            if diferenca_metodos > 0:
+                insights.append(
+                    f"⚖️ **Estratégia:** O Método 2 resulta em {reais(diferenca_metodos)} a mais. Considere a argumentação processual adequada.")
 
-        **RESULTADO 1 - SELIC sobre Principal Corrigido:**
-        - Valor corrigido (IPCA-e): R$ {valor_corrigido_ipcae:,.2f}
-        - Juros SELIC: R$ {juros_selic_sobre_principal:,.2f}
-        - Honorários ({honorarios_percentual}%): R$ {honorarios_resultado1:,.2f}
-        - **TOTAL: R$ {total_resultado1:,.2f}**
+            if impacto_juros > 30:
+                insights.append(
+                    f"📈 **Juros Significativos:** {impacto_juros:.1f}% do valor final são juros. Fundamental demonstrar a mora.")
 
-        **RESULTADO 2 - SELIC sobre Débito Consolidado:**
-        - Valor consolidado: R$ {valor_consolidado_selic:,.2f}
-        - Honorários ({honorarios_percentual}%): R$ {honorarios_resultado2:,.2f}
-        - **TOTAL: R$ {total_resultado2:,.2f}**
+            if anos_totais > 5:
+                insights.append(
+                    f"⏰ **Prescrição:** Período de {anos_totais:.1f} anos. Verificar eventual prescrição intercorrente.")
 
-        **Diferença entre métodos:** R$ {diferenca_metodos:,.2f}
-        **Crescimento total:** {crescimento_total:.1f}%
-        """
+            for insight in insights:
+                st.info(insight)
 
-        st.code(resumo_texto, language=None)
+        # 🔹 Resumo Executivo
+        with medidor.etapa("resumo"):
+            st.subheader("📋 Resumo Executivo para Petição")
+
+            resumo_texto = f"""
+            **CÁLCULO DE DÉBITO JUDICIAL - FAZENDA PÚBLICA**
+
+            **Valor Base:** {reais(valor)}
+            **Período:** {data_inicial_cor_mon.strftime('%d/%m/%Y')} a {data_final_cor_mon.strftime('%d/%m/%Y')}
+
+            **RESULTADO 1 - SELIC sobre Principal Corrigido:**
+            - Valor corrigido (IPCA-e): {reais(valor_corrigido_ipcae)}
+            - Juros SELIC: {reais(juros_selic_sobre_principal)}
+            - Honorários ({honorarios_percentual}%): {reais(honorarios_resultado1)}
+            - **TOTAL: {reais(total_resultado1)}**
+
+            **RESULTADO 2 - SELIC sobre Débito Consolidado:**
+            - Valor consolidado: {reais(valor_consolidado_selic)}
+            - Honorários ({honorarios_percentual}%): {reais(honorarios_resultado2)}
+            - **TOTAL: {reais(total_resultado2)}**
+
+            **Diferença entre métodos:** {reais(diferenca_metodos)}
+            **Crescimento total:** {crescimento_total:.1f}%
+            """
+            if projecao is not None:
+                mediana = resultado_projecao["percentis"].index(50)
+                resumo_texto += f"""
+            **PROJEÇÃO ATÉ {data_pagamento.strftime('%d/%m/%Y')} (mediana e faixa P5–P95):**
+            - Resultado 1: {reais(total_resultado1 * fatores_pagamento[mediana])} ({reais(total_resultado1 * fatores_pagamento[0])} a {reais(total_resultado1 * fatores_pagamento[-1])})
+            - Resultado 2: {reais(total_resultado2 * fatores_pagamento[mediana])} ({reais(total_resultado2 * fatores_pagamento[0])} a {reais(total_resultado2 * fatores_pagamento[-1])})
+            """
+
+            st.code(resumo_texto, language=None)
+
+        # 🔹 Exportação: os arquivos só são gerados quando o botão é clicado
+        with medidor.etapa("exportacao"):
+            # Na granularidade diária a planilha sai em CSV, mais leve para dezenas de milhares de linhas
+            if granularidade == DIARIA:
+                gerar_planilha, nome_planilha, mime_planilha = gerar_csv, "memoria_calculo_fazenda.csv", "text/csv"
+            else:
+                gerar_planilha, nome_planilha, mime_planilha = gerar_xlsx, "memoria_calculo_fazenda.xlsx", MIME_XLSX
+            planilha = ao_clicar(lambda gerar=gerar_planilha: gerar(memoria_calculo_fazenda(
+                valor, data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros, data_final_juros,
+                honorarios_percentual, granularidade
+            )))
+            graficos = ao_clicar(gerar_graficos, {
+                "evolucao": fig_evolucao, "comparacao": fig_comparacao, "composicao": fig_pizza,
+            })
+            resumo = ao_clicar(gerar_resumo, resumo_texto)
 
-        # 🔹 Botão de Download (simulado)
         st.subheader("📥 Exportar Resultados")
         col_d1, col_d2, col_d3 = st.columns(3)
 
         with col_d1:
-            st.button("📊 Baixar Gráficos", help="Exportar visualizações em PDF")
+            st.download_button("📊 Baixar Gráficos", graficos, file_name="graficos_fazenda.zip", mime="application/zip",
+                               on_click="ignore", help="Exportar visualizações em PNG (HTML interativo sem o kaleido)")
         with col_d2:
-            st.button("📋 Baixar Resumo", help="Exportar resumo executivo")
+            st.download_button("📋 Baixar Resumo", resumo, file_name="resumo_fazenda.md",
+                               mime="text/markdown", on_click="ignore", help="Exportar resumo executivo")
         with col_d3:
-            st.button("🔢 Baixar Planilha", help="Exportar cálculos detalhados")
+            st.download_button("🔢 Baixar Planilha", planilha, file_name=nome_planilha,
+                               mime=mime_planilha, on_click="ignore", help="Exportar memória de cálculo detalhada")
 
         st.success("✨ **Desenvolvido com Python + Streamlit** - Tecnologia que faz a diferença!")
 
@@ -445,29 +439,9 @@ else:
     st.markdown("## 🎯 **Preview: Tecnologia por Trás da Calculadora**")
     st.markdown("*Visualizações que você verá após calcular:*")
 
-    # Exemplo de gráfico
-    mock_data = {
-        'Mês': ['Jan/2020', 'Jul/2020', 'Jan/2021', 'Jul/2021', 'Jan/2022', 'Jul/2022', 'Jan/2023', 'Jul/2023'],
-        'Valor': [50000, 52500, 55000, 57500, 62000, 65000, 68500, 72000],
-        'Regime': ['IPCA-e', 'IPCA-e', 'IPCA-e', 'IPCA-e', 'SELIC', 'SELIC', 'SELIC', 'SELIC']
-    }
-
-    df_mock = pd.DataFrame(mock_data)
-
-    fig_preview = px.line(df_mock, x='Mês', y='Valor',
-                          color='Regime',
-                          title='Exemplo: Evolução do Débito ao Longo do Tempo',
-                          labels={'Valor': 'Valor (R$)', 'Mês': 'Período'},
-                          color_discrete_map={'IPCA-e': '#FF6B6B', 'SELIC': '#4ECDC4'})
-
-    fig_preview.update_layout(
-        template='plotly_white',
-        height=400,
-        showlegend=True
-    )
-
-    fig_preview.update_traces(line=dict(width=4))
-    st.plotly_chart(fig_preview, use_container_width=True)
+    with medidor.etapa("grafico_preview"):
+        fig_preview = montar_fig_preview_fazenda()
+        st.plotly_chart(fig_preview, use_container_width=True)
 
     st.markdown("### 🚀 **Diferenciais da Calculadora:**")
     col_diff1, col_diff2, col_diff3 = st.columns(3)
@@ -482,4 +456,10 @@ else:
         st.info("⚖️ **Comparação de Métodos**\nVisualização dos dois cálculos lado a lado")
 
     st.success(
-        "🦄 **Advogado que programa é unicórnio!- Pedro Potz** Esta calculadora vai além do básico - é tecnologia aplicada ao Direito!")
\ No newline at end of file
+        "🦄 **Advogado que programa é unicórnio!- Pedro Potz** Esta calculadora vai além do básico - é tecnologia aplicada ao Direito!")
+
+# 🔸 Histórico de cálculos (SQLite local)
+exibir_historico(st.expander("🗂️ Histórico de Cálculos"), "fazenda")
+
+if painel_desempenho:
+    exibir_painel(area_desempenho, medidor)
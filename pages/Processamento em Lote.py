@@ -0,0 +1,85 @@
+import streamlit as st
+import tempfile
+from pathlib import Path
+
+from utils.lote import CALCULADORAS, TAMANHO_LOTE_PADRAO, processar_arquivo
+
+st.set_page_config(page_title="Processamento em Lote", page_icon="🗂️", layout="wide")
+
+st.title("🗂️ Processamento em Lote — Carteira de Processos")
+
+# Sidebar GLOBAL
+with st.sidebar:
+    st.image("https://avatars.githubusercontent.com/u/205710427?v=4", caption="Advogado que programa é unicórnio!",
+             use_container_width=True)
+    st.markdown("---")
+    st.link_button("Visite meu novo site!", "https://pedrop.vercel.app/")
+    st.markdown("---")
+    st.header("Pedro Potz")
+    st.markdown("Advogado Programador")
+
+NOMES_CALCULADORAS = {
+    "tjrj": "⚖️ Débitos Judiciais TJ-RJ",
+    "fazenda": "🏛️ Fazenda Pública",
+}
+
+st.info("""
+Envie um arquivo **CSV** ou **Parquet** com um processo por linha. O arquivo é lido em blocos, cada bloco é
+calculado de uma só vez e gravado no arquivo de resultados antes do próximo ser lido — a memória utilizada não
+depende do tamanho da carteira.
+
+Datas podem estar nos formatos AAAA-MM-DD ou DD/MM/AAAA. Para a linha de comando, use
+`python -m utils.lote carteira.csv resultados.csv --calculadora tjrj`.
+""")
+
+with st.form("form_lote"):
+    calculadora = st.radio("Calculadora*", tuple(NOMES_CALCULADORAS), format_func=NOMES_CALCULADORAS.get,
+                           horizontal=True)
+    arquivo = st.file_uploader("Arquivo da carteira*", type=["csv", "parquet"])
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        separador = st.selectbox("Separador do CSV", (",", ";"))
+    with col2:
+        formato_saida = st.selectbox("Formato do resultado", ("csv", "parquet"))
+    with col3:
+        tamanho_lote = st.number_input("Linhas por bloco", min_value=1_000, value=TAMANHO_LOTE_PADRAO, step=1_000)
+
+    submitted = st.form_submit_button("Processar")
+
+_, obrigatorias, opcionais = CALCULADORAS[calculadora]
+with st.expander("📋 Colunas esperadas"):
+    st.markdown("**Obrigatórias:** " + ", ".join(f"`{c}`" for c in obrigatorias))
+    st.markdown("**Opcionais:** " + ", ".join(f"`{c}`" for c in opcionais))
+
+if submitted:
+    if arquivo is None:
+        st.error("❌ Selecione um arquivo CSV ou Parquet.")
+    else:
+        # 🔸 Um diretório temporário por sessão: o resultado anterior é apagado ao processar outra carteira e o
+        # diretório é removido quando a sessão termina
+        if "diretorio_lote" in st.session_state:
+            st.session_state.diretorio_lote.cleanup()
+        st.session_state.diretorio_lote = tempfile.TemporaryDirectory(prefix="lote_")
+        saida = Path(st.session_state.diretorio_lote.name) / f"resultados_{calculadora}.{formato_saida}"
+        status = st.empty()
+        try:
+            total = processar_arquivo(
+                arquivo, saida, calculadora, int(tamanho_lote), separador=separador,
+                progresso=lambda n: status.write(f"⏳ {n:,} processos calculados...")
+            )
+        except ValueError as erro:
+            st.error(f"❌ {erro}")
+        else:
+            status.success(f"✅ {total:,} processos calculados.")
+            # O arquivo só é lido quando o botão é clicado
+            st.download_button("📥 Baixar Resultados", saida.read_bytes, file_name=saida.name, on_click="ignore")
+
+st.markdown("---")
+st.markdown("""
+        <div style='text-align: center; color: #666; font-size: 12px;'>
+        Cálculo realizado por ferramenta desenvolvida por Pedro Potz<br>
+        Advogado especializado em soluções jurídico-tecnológicas<br>
+        🦄 <em>Advogado que programa é unicórnio!</em>
+        </div>
+        """, unsafe_allow_html=True)
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.abatimentos import abatimentos_tjrj, linha_do_tempo_tjrj, matriz_de_eventos
+from utils.calculo_tjrj import JUROS_12, SEM_CORRECAO, TAXA_LEGAL, calcular_debito_tjrj
+
+SEM_EVENTOS = pd.DataFrame({"data": pd.Series(dtype="datetime64[ns]"), "valor": pd.Series(dtype=float)})
+
+
+@pytest.mark.parametrize("tipo_juros, indice_correcao, data_inicial", [
+    (JUROS_12, SEM_CORRECAO, "2020-03-15"),
+    (JUROS_12, "INPC", "2020-03-15"),
+    (TAXA_LEGAL, "Tabela TJ-RJ (fator de correção)", "2020-03-15"),
+    (JUROS_12, "INPC", "2021-01-10"),  # juros vencidos antes da data inicial
+])
+def test_sem_eventos_coincide_com_o_calculo_principal(tipo_juros, indice_correcao, data_inicial):
+    _, resumo = linha_do_tempo_tjrj(10_000.0, data_inicial, "2020-03-15", "2025-06-30", SEM_EVENTOS, tipo_juros,
+                                    indice_correcao=indice_correcao)
+    esperado = calcular_debito_tjrj(10_000.0, "2020-03-15", "2025-06-30", tipo_juros,
+                                    indice_correcao=indice_correcao, data_inicial=data_inicial)
+    assert resumo["saldo_final"] == pytest.approx(esperado["valor_corrigido"])
+    assert resumo["total_pago"] == resumo["total_excedente"] == 0.0
+
+
+def test_pagamento_imputado_primeiro_nos_juros():
+    # 12 meses a 1% sobre 10.000: 1.200 de juros vencidos na data do pagamento
+    eventos = pd.DataFrame({"data": ["2021-01-10"], "valor": [1_500.0]})
+    tabela, resumo = linha_do_tempo_tjrj(10_000.0, "2020-01-10", "2020-01-10", "2021-01-10", eventos, JUROS_12)
+    pagamento = tabela.iloc[0]
+    assert pagamento["imputado_juros"] == pytest.approx(1_200.0)
+    assert pagamento["imputado_principal"] == pytest.approx(300.0)
+    assert pagamento["juros_pendentes"] == pytest.approx(0.0)
+    assert pagamento["principal"] == pytest.approx(9_700.0)
+    assert resumo["saldo_final"] == pytest.approx(9_700.0)
+
+
+def test_pagamento_menor_que_os_juros_nao_abate_capital():
+    eventos = pd.DataFrame({"data": ["2021-01-10"], "valor": [500.0]})
+    tabela, _ = linha_do_tempo_tjrj(10_000.0, "2020-01-10", "2020-01-10", "2021-01-10", eventos, JUROS_12)
+    assert tabela.iloc[0]["imputado_principal"] == 0.0
+    assert tabela.iloc[0]["juros_pendentes"] == pytest.approx(700.0)
+    assert tabela.iloc[0]["principal"] == pytest.approx(10_000.0)
+
+
+def test_pagamento_acima_do_saldo_vai_para_o_excedente():
+    eventos = pd.DataFrame({"data": ["2021-01-10"], "valor": [12_000.0]})
+    tabela, resumo = linha_do_tempo_tjrj(10_000.0, "2020-01-10", "2020-01-10", "2021-06-10", eventos, JUROS_12)
+    assert tabela.iloc[0]["excedente"] == pytest.approx(800.0)
+    assert resumo["total_excedente"] == pytest.approx(800.0)
+    assert resumo["saldo_final"] == pytest.approx(0.0)
+    # Quitado o débito, não correm mais juros até a data final
+    assert tabela.iloc[-1]["juros_periodo"] == pytest.approx(0.0)
+
+
+def test_matriz_de_eventos_ordena_por_processo_e_data():
+    datas_finais = ["2024-12-31", "2024-06-30", "2024-12-31"]
+    processos = [2, 0, 1, 0, 2, 0, 1]
+    datas = ["2024-03-01", "2024-05-01", "2024-08-01", "2024-01-01", "2024-02-01", "2024-03-01", "2024-02-01"]
+    valores = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    matriz_datas, matriz_valores = matriz_de_eventos(processos, datas, valores, datas_finais)
+
+    # O processo 1 termina em 30/06/2024: o evento de agosto é desconsiderado
+    esperado_datas = np.array([
+        ["2024-01-01", "2024-03-01", "2024-05-01", "2024-12-31"],
+        ["2024-02-01", "2024-06-30", "2024-06-30", "2024-06-30"],
+        ["2024-02-01", "2024-03-01", "2024-12-31", "2024-12-31"],
+    ], dtype="datetime64[D]")
+    np.testing.assert_array_equal(matriz_datas, esperado_datas)
+    np.testing.assert_array_equal(matriz_valores, [[4.0, 6.0, 2.0, 0.0], [7.0, 0.0, 0.0, 0.0],
+                                                   [5.0, 1.0, 0.0, 0.0]])
+
+
+def test_carteira_coincide_com_processos_calculados_um_a_um():
+    eventos = [(1, "2022-05-10", 800.0), (0, "2023-02-01", 3_000.0), (1, "2021-09-10", 500.0),
+               (0, "2021-07-01", 1_000.0)]
+    processos, datas, valores = zip(*eventos)
+    carteira = abatimentos_tjrj([10_000.0, 5_000.0], "2020-01-10", "2020-01-10", "2024-12-31", processos, datas,
+                                valores, JUROS_12, indice_correcao="INPC")
+    for processo in range(2):
+        do_processo = pd.DataFrame([(d, v) for p, d, v in eventos if p == processo], columns=["data", "valor"])
+        _, resumo = linha_do_tempo_tjrj([10_000.0, 5_000.0][processo], "2020-01-10", "2020-01-10", "2024-12-31",
+                                        do_processo, JUROS_12, indice_correcao="INPC")
+        assert carteira["saldo_final"][processo] == pytest.approx(resumo["saldo_final"])
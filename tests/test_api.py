@@ -0,0 +1,93 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from utils.api import criar_servidor
+from utils.calculo_tjrj import JUROS_12
+
+PROCESSO = {"valor": 50000, "data_juros": "2020-01-15", "data_final": "2024-12-31", "tipo_juros": JUROS_12}
+
+
+@pytest.fixture(scope="module")
+def servidor():
+    servidor = criar_servidor(porta=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor.server_address
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _post_bruto(endereco, corpo):
+    """Resposta completa (bytes) a um POST /lote/tjrj, lida até o servidor parar de enviar."""
+    with socket.create_connection(endereco, timeout=5) as conexao:
+        conexao.sendall(b"POST /lote/tjrj HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n"
+                        + f"Content-Length: {len(corpo)}\r\n\r\n".encode() + corpo)
+        conexao.settimeout(0.5)
+        resposta = b""
+        try:
+            while pedaco := conexao.recv(65536):
+                resposta += pedaco
+        except socket.timeout:
+            pass
+    return resposta
+
+
+def test_lote_vazio_envia_o_terminador_uma_vez(servidor):
+    resposta = _post_bruto(servidor, b"[]")
+    cabecalho, corpo = resposta.split(b"\r\n\r\n", 1)
+    assert b"Transfer-Encoding: chunked" in cabecalho
+    assert corpo == b"0\r\n\r\n"
+
+
+def test_conexao_persistente_apos_lote_vazio(servidor):
+    conexao = http.client.HTTPConnection(*servidor, timeout=5)
+    for corpo in ([], [PROCESSO, PROCESSO]):
+        conexao.request("POST", "/lote/tjrj", body=json.dumps(corpo), headers={"Content-Type": "application/json"})
+        linhas = conexao.getresponse().read().decode().splitlines()
+    assert len(linhas) == 2 and json.loads(linhas[0])["total"] > PROCESSO["valor"]
+    conexao.close()
+
+
+def test_data_em_branco_vira_erro_400(servidor):
+    conexao = http.client.HTTPConnection(*servidor, timeout=5)
+    conexao.request("POST", "/calcular/tjrj", body=json.dumps({**PROCESSO, "data_juros": None}))
+    resposta = conexao.getresponse()
+    assert resposta.status == 400
+    assert "data_juros" in json.loads(resposta.read())["erro"]
+    conexao.close()
+
+
+def _post(servidor, rota, corpo):
+    conexao = http.client.HTTPConnection(*servidor, timeout=5)
+    conexao.request("POST", rota, body=json.dumps(corpo), headers={"Content-Type": "application/json"})
+    resposta = conexao.getresponse()
+    status, conteudo = resposta.status, json.loads(resposta.read().decode().splitlines()[0])
+    conexao.close()
+    return status, conteudo
+
+
+@pytest.mark.parametrize("rota, corpo, mensagem", [
+    ("/lote/tjrj", [1, 2], "processo 1 do lote"),
+    ("/lote/tjrj", [PROCESSO, "x"], "processo 2 do lote"),
+    ("/calcular/tjrj", {**PROCESSO, "valor": {"a": 1}}, "'valor'"),
+    ("/calcular/tjrj", {**PROCESSO, "honorarios": [1]}, "'honorarios'"),
+    ("/calcular/tjrj", {**PROCESSO, "tipo_juros": "xyz"}, "'tipo_juros'"),
+    ("/lote/tjrj", [PROCESSO, {**PROCESSO, "indice_correcao": "IPCA"}], "'indice_correcao', linha 2"),
+])
+def test_entrada_invalida_vira_erro_400(servidor, rota, corpo, mensagem):
+    status, conteudo = _post(servidor, rota, corpo)
+    assert status == 400
+    assert mensagem in conteudo["erro"]
+
+
+def test_erro_inesperado_vira_erro_500(servidor, monkeypatch):
+    def falhar(*args, **kwargs):
+        raise RuntimeError("falha interna")
+
+    monkeypatch.setattr("utils.api.calcular_bloco", falhar)
+    status, conteudo = _post(servidor, "/calcular/tjrj", PROCESSO)
+    assert status == 500
+    assert "falha interna" not in conteudo["erro"]
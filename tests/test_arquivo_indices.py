@@ -0,0 +1,56 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from utils import indices
+from utils.arquivo_indices import MANIFESTO, abrir_arquivo, gerar_arquivo
+
+
+@pytest.fixture
+def arquivo_binario(tmp_path):
+    caminho = tmp_path / "indices.bin"
+    gerar_arquivo(caminho)
+    return caminho
+
+
+def test_series_identicas_as_dos_csv(arquivo_binario):
+    series = indices.series_binarias.__wrapped__(arquivo_binario)
+    for nome, serie in indices.ler_todas().items():
+        np.testing.assert_array_equal(series[nome].acumulado, serie.acumulado)
+        assert not series[nome].acumulado.flags.writeable  # view do arquivo mapeado, sem cópia
+
+
+@pytest.mark.parametrize("tamanho", [0, 10, 100, -8])
+def test_arquivo_truncado_volta_para_os_csv(arquivo_binario, tamanho):
+    dados = arquivo_binario.read_bytes()
+    arquivo_binario.write_bytes(dados[:tamanho])
+    with pytest.raises(ValueError):
+        abrir_arquivo(arquivo_binario)
+    assert indices.series_binarias.__wrapped__(arquivo_binario) is None
+
+
+def test_diretorio_corrompido_volta_para_os_csv(arquivo_binario):
+    dados = bytearray(arquivo_binario.read_bytes())
+    dados[20:40] = b"x" * 20
+    arquivo_binario.write_bytes(bytes(dados))
+    assert indices.series_binarias.__wrapped__(arquivo_binario) is None
+
+
+def test_dados_alterados_falham_na_verificacao(arquivo_binario):
+    dados = bytearray(arquivo_binario.read_bytes())
+    dados[-3] ^= 1
+    arquivo_binario.write_bytes(bytes(dados))
+    with pytest.raises(ValueError, match="SHA-256"):
+        abrir_arquivo(arquivo_binario, verificar=True)
+
+
+def test_csv_divergente_do_manifesto(tmp_path):
+    fontes = tmp_path / "dados"
+    shutil.copytree(indices.DIRETORIO_DADOS, fontes, ignore=shutil.ignore_patterns("*.bin"))
+    (fontes / "inpc.csv").write_text((fontes / "inpc.csv").read_text() + '"01/01/2100";"0,1"\n')
+    with pytest.raises(ValueError, match="inpc.csv: hash divergente"):
+        gerar_arquivo(tmp_path / "indices.bin", fontes)
+    (fontes / MANIFESTO).unlink()
+    with pytest.raises(OSError):
+        gerar_arquivo(tmp_path / "indices.bin", fontes)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from utils.calculo_tjrj import (CONTRATUAL, JUROS_12, JUROS_CODIGO_CIVIL, SEM_CORRECAO, TAXA_LEGAL,
+                                TAXA_MENSAL_ANTES_TAXA_LEGAL, calcular_debito_tjrj, calcular_debitos_tjrj,
+                                juros_taxa_legal)
+from utils.indices import carregar_taxa_legal
+
+
+@pytest.fixture(scope="module")
+def taxas():
+    serie = carregar_taxa_legal()
+    return dict(zip(np.arange(serie.mes_inicial, serie.mes_inicial + len(serie)).astype(str), serie.variacoes))
+
+
+@pytest.mark.parametrize("data_final, meses", [
+    ("2024-09-29", []),
+    ("2024-09-30", ["2024-09"]),
+    ("2024-10-05", ["2024-09"]),  # o mês incompleto não conta como mês cheio
+    ("2024-10-29", ["2024-09"]),
+    ("2024-10-30", ["2024-09", "2024-10"]),
+])
+def test_taxa_legal_conta_meses_inteiros(taxas, data_final, meses):
+    assert juros_taxa_legal("2024-08-30", data_final) == pytest.approx(sum(taxas[m] for m in meses), abs=1e-15)
+
+
+def test_taxa_legal_antes_e_depois_da_vigencia(taxas):
+    # 7 meses inteiros de 10/01/2024 a 30/08/2024 a 1% e 4 meses inteiros (set-dez) de taxa legal
+    esperado = 7 * TAXA_MENSAL_ANTES_TAXA_LEGAL + sum(taxas[m] for m in ("2024-09", "2024-10", "2024-11", "2024-12"))
+    assert juros_taxa_legal("2024-01-10", "2024-12-31") == pytest.approx(esperado)
+
+
+def test_taxa_legal_vetorizada_igual_a_escalar():
+    datas_juros = np.array(["2023-05-31", "2024-08-30", "2024-09-15", "2025-02-28"], dtype="datetime64[D]")
+    datas_finais = np.array(["2024-09-01", "2024-12-01", "2025-03-14", "2025-03-31"], dtype="datetime64[D]")
+    np.testing.assert_allclose(juros_taxa_legal(datas_juros, datas_finais),
+                               [juros_taxa_legal(a, b) for a, b in zip(datas_juros, datas_finais)])
+
+
+@pytest.mark.parametrize("data_juros, data_final, meses_1_porcento, meses_taxa_legal", [
+    ("2024-01-10", "2024-09-20", 7, ["2024-09"]),  # o mês de 10/08 a 10/09 atravessa a vigência
+    ("2024-01-31", "2024-12-31", 7, ["2024-09", "2024-10", "2024-11", "2024-12"]),
+    ("2024-07-31", "2024-10-31", 1, ["2024-09", "2024-10"]),  # mês terminado em 31/08 ainda rende 1%
+])
+def test_taxa_legal_com_mes_que_atravessa_a_vigencia(taxas, data_juros, data_final, meses_1_porcento,
+                                                     meses_taxa_legal):
+    resultado = calcular_debito_tjrj(10_000.0, data_juros, data_final, TAXA_LEGAL)
+    assert resultado["meses"] == meses_1_porcento + len(meses_taxa_legal)
+    esperado = meses_1_porcento * TAXA_MENSAL_ANTES_TAXA_LEGAL + sum(taxas[m] for m in meses_taxa_legal)
+    assert juros_taxa_legal(data_juros, data_final) == pytest.approx(esperado)
+    assert resultado["valor_juros"] == pytest.approx(10_000.0 * esperado)
+
+
+@pytest.mark.parametrize("opcoes, mensagem", [
+    ({"tipo_juros": "Juros simples 1% a.m."}, "Tipo de juros"),
+    ({"tipo_juros": JUROS_12.upper()}, "Tipo de juros"),
+    ({"indice_correcao": "IPCA"}, "Índice de correção"),
+    ({"tipo_juros": JUROS_CODIGO_CIVIL}, "Tipo de obrigação"),
+    ({"tipo_juros": JUROS_CODIGO_CIVIL, "tipo_obrigacao": "contratual"}, "Tipo de obrigação"),
+])
+def test_opcao_desconhecida_nao_vira_zero(opcoes, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        calcular_debitos_tjrj(10_000.0, "2020-01-15", "2024-12-31", **{"tipo_juros": JUROS_12, **opcoes})
+
+
+def test_tipo_de_obrigacao_em_branco_fora_do_codigo_civil():
+    tipos = np.array([JUROS_12, JUROS_CODIGO_CIVIL])
+    resultado = calcular_debitos_tjrj(10_000.0, "2020-01-15", "2024-12-31", tipos, np.array(["", CONTRATUAL]),
+                                      indice_correcao=np.array(["INPC", SEM_CORRECAO]))
+    np.testing.assert_allclose(resultado["taxa_mensal"], [0.01, 0.01])
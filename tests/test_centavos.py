@@ -0,0 +1,87 @@
+from decimal import ROUND_HALF_UP, Decimal, localcontext
+
+import numpy as np
+import pytest
+
+from utils.centavos import CASAS_FATOR, dividir, fator_fixo, multiplicar, para_centavos
+
+CENTAVO = Decimal("0.01")
+
+
+def _decimal_para_centavos(texto):
+    return int(Decimal(texto).quantize(CENTAVO, rounding=ROUND_HALF_UP) * 100)
+
+
+def _dividir_decimal(numerador, denominador):
+    with localcontext() as contexto:
+        contexto.prec = 60
+        return int((Decimal(numerador) / Decimal(denominador)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+@pytest.mark.parametrize("texto", [
+    "0.285", "0.005", "0.015", "1.005", "2.675", "-0.005", "-2.675", "-1234.565", "0", "0.004", "-0.004",
+    "1234567.895", "98765432.105", "-98765432.125", "9999999999.99",
+])
+def test_para_centavos_igual_ao_decimal(texto):
+    assert para_centavos(float(texto)) == _decimal_para_centavos(texto)
+
+
+def test_para_centavos_aleatorio_igual_ao_decimal():
+    gerador = np.random.default_rng(15)
+    # Valores com 3 casas (metade termina em 5, empates de meio centavo) até R$ 100 milhões, com sinal
+    milesimos = gerador.integers(-10 ** 11, 10 ** 11, 20_000)
+    milesimos[::2] = milesimos[::2] // 10 * 10 + 5
+    textos = [f"{m / 1000:.3f}" for m in milesimos]
+    esperado = [_decimal_para_centavos(texto) for texto in textos]
+    np.testing.assert_array_equal(para_centavos(np.array(textos, dtype=float)), esperado)
+
+
+@pytest.mark.parametrize("numerador, denominador", [
+    (5, 10), (15, 10), (25, 10), (-5, 10), (-15, 10), (-25, 10), (4, 10), (-4, 10), (1, 3), (-2, 3),
+    (10 ** 17 + 5, 10), (-(10 ** 17) - 5, 10),
+])
+def test_dividir_meio_para_cima_igual_ao_decimal(numerador, denominador):
+    assert dividir(numerador, denominador) == _dividir_decimal(numerador, denominador)
+
+
+def test_dividir_aleatorio_igual_ao_decimal():
+    gerador = np.random.default_rng(16)
+    numeradores = gerador.integers(-10 ** 15, 10 ** 15, 5_000)
+    denominadores = gerador.choice([2, 3, 7, 10, 100, 360, 10 ** 8], 5_000)
+    esperado = [_dividir_decimal(int(n), int(d)) for n, d in zip(numeradores, denominadores)]
+    np.testing.assert_array_equal(dividir(numeradores, denominadores), esperado)
+
+
+def _multiplicar_decimal(centavos, fator):
+    produto = Decimal(int(centavos)) * Decimal(int(fator_fixo(fator))) / Decimal(10 ** CASAS_FATOR)
+    return int(produto.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+@pytest.mark.parametrize("centavos, fator", [
+    (1, 0.5), (3, 0.5), (-1, 0.5), (-3, 0.5), (1, 0.49999999), (-1, 0.50000001),
+    (12_345, 0.1), (-12_345, 0.1), (199, 1.00502513),
+    (7 * 10 ** 14, 1.23456789), (-9 * 10 ** 13, 9.99999999), (10 ** 15, 0.00012345),
+])
+def test_multiplicar_igual_ao_decimal(centavos, fator):
+    assert multiplicar(centavos, fator) == _multiplicar_decimal(centavos, fator)
+
+
+def test_multiplicar_aleatorio_igual_ao_decimal():
+    gerador = np.random.default_rng(17)
+    centavos = gerador.integers(-10 ** 13, 10 ** 13, 5_000)
+    fatores = np.round(gerador.uniform(0, 20, 5_000), CASAS_FATOR)
+    # Empates exatos de meio centavo: c × 0,5 com c ímpar
+    centavos[:500], fatores[:500] = centavos[:500] | 1, 0.5
+    esperado = [_multiplicar_decimal(c, f) for c, f in zip(centavos, fatores)]
+    np.testing.assert_array_equal(multiplicar(centavos, fatores), esperado)
+
+
+@pytest.mark.parametrize("centavos, fator", [
+    (10 ** 16, 0.00012345),  # parte alta do fator pequena, produto da parte baixa estoura
+    (10 ** 16, 1.00009999),
+    (9 * 10 ** 14, 1.23456789),
+    (10 ** 15, 99.99999999),
+])
+def test_multiplicar_recusa_estouro_do_int64(centavos, fator):
+    with pytest.raises(ValueError, match="grande demais"):
+        multiplicar(centavos, fator)
@@ -0,0 +1,43 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from utils.datas import ANO_CIVIL, dias_360, fracao_de_ano, meses_inteiros, meses_pro_rata
+
+relativedelta = pytest.importorskip("dateutil.relativedelta").relativedelta
+
+
+def _pares_aleatorios(quantidade, semente):
+    gerador = np.random.default_rng(semente)
+    inicio = np.datetime64("1890-01-01") + gerador.integers(0, 120_000, quantidade).astype("timedelta64[D]")
+    fim = inicio + gerador.integers(-4_000, 12_000, quantidade).astype("timedelta64[D]")
+    return inicio, fim
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_meses_inteiros_equivale_ao_relativedelta(semente):
+    # Inclui datas fora da faixa tabelada (1900–2199) e intervalos negativos
+    inicio, fim = _pares_aleatorios(5_000, semente)
+    esperado = [relativedelta(b, a).years * 12 + relativedelta(b, a).months
+                for a, b in zip(inicio.astype(object), fim.astype(object))]
+    np.testing.assert_array_equal(meses_inteiros(inicio, fim), esperado)
+
+
+@pytest.mark.parametrize("inicio, fim, meses", [
+    (date(2020, 1, 31), date(2020, 2, 29), 1),
+    (date(2020, 1, 31), date(2020, 2, 28), 0),
+    (date(2024, 1, 15), date(2024, 1, 15), 0),
+    (date(2024, 3, 31), date(2024, 2, 29), -1),
+])
+def test_meses_inteiros_fim_de_mes(inicio, fim, meses):
+    assert meses_inteiros(inicio, fim) == meses
+
+
+def test_contagens_comerciais():
+    assert dias_360(date(2021, 1, 31), date(2021, 3, 1)) == 31
+    assert meses_pro_rata(date(2024, 1, 15), date(2024, 3, 20)) == pytest.approx(65 / 30)
+    assert fracao_de_ano(date(2020, 1, 1), date(2025, 1, 1)) == 5
+    assert fracao_de_ano(date(2020, 1, 1), date(2021, 1, 1), ANO_CIVIL) == pytest.approx(366 / 365)
+    with pytest.raises(ValueError):
+        fracao_de_ano(date(2020, 1, 1), date(2021, 1, 1), "30/365")
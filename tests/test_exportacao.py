@@ -0,0 +1,25 @@
+import io
+import zipfile
+
+import plotly.graph_objects as go
+
+from utils.exportacao import ao_clicar, gerar_graficos, gerar_resumo
+
+
+def test_arquivo_so_e_gerado_no_clique():
+    chamadas = []
+
+    def gerar(texto):
+        chamadas.append(texto)
+        return gerar_resumo(texto)
+
+    baixar = ao_clicar(gerar, "resumo")
+    assert chamadas == []
+    # Cada clique gera um arquivo novo, posicionado no início
+    assert baixar().read() == baixar().read() == b"resumo"
+    assert chamadas == ["resumo", "resumo"]
+
+
+def test_graficos_em_png_ou_html():
+    nomes = zipfile.ZipFile(io.BytesIO(ao_clicar(gerar_graficos, {"barras": go.Figure(go.Bar(y=[1, 2]))})().read()))
+    assert nomes.namelist() in (["barras.png"], ["barras.html"])
@@ -0,0 +1,106 @@
+import pytest
+
+from utils import historico as modulo
+from utils.historico import Historico, normalizar_processo
+
+PROCESSO = "0001234-72.2024.8.19.0001"
+OUTRO_PROCESSO = "0004321-70.2023.8.19.0001"
+
+
+@pytest.fixture
+def historico(tmp_path):
+    return Historico(tmp_path / "historico.sqlite3")
+
+
+@pytest.mark.parametrize("numero", [PROCESSO, "00012347220248190001", " 0001234.72-2024.8.19.0001 "])
+def test_normalizar_processo(numero):
+    assert normalizar_processo(numero) == PROCESSO
+
+
+@pytest.mark.parametrize("numero", [None, "", " - . "])
+def test_processo_vazio(numero):
+    assert normalizar_processo(numero) == ""
+
+
+def test_digito_verificador_invalido():
+    with pytest.raises(ValueError, match="Dígito verificador"):
+        normalizar_processo("0001234-73.2024.8.19.0001")
+
+
+def test_processo_com_digitos_faltando():
+    with pytest.raises(ValueError, match="20 dígitos"):
+        normalizar_processo("0001234-72.2024.8.19.001")
+
+
+def test_outro_processo_e_valido():
+    assert normalizar_processo(OUTRO_PROCESSO) == OUTRO_PROCESSO
+
+
+def _calculadora(chamadas):
+    def calcular(valor, meses):
+        chamadas.append(valor)
+        return {"valor": valor, "total": valor + meses}
+    return calcular
+
+
+def test_mesmas_entradas_reaproveitam_o_resultado(historico):
+    chamadas = []
+    resultado, reaproveitado = historico.calcular("tjrj", _calculadora(chamadas), {"valor": 100.0, "meses": 12})
+    assert (resultado, reaproveitado) == ({"total": 112.0}, False)
+    resultado, reaproveitado = historico.calcular("tjrj", _calculadora(chamadas), {"meses": 12, "valor": 100.0})
+    assert (resultado, reaproveitado) == ({"total": 112.0}, True)
+    assert chamadas == [100.0]
+
+
+def test_outras_entradas_ou_outra_calculadora_recalculam(historico):
+    chamadas = []
+    historico.calcular("tjrj", _calculadora(chamadas), {"valor": 100.0, "meses": 12})
+    assert not historico.calcular("tjrj", _calculadora(chamadas), {"valor": 100.0, "meses": 13})[1]
+    assert not historico.calcular("fazenda", _calculadora(chamadas), {"valor": 100.0, "meses": 12})[1]
+    assert len(chamadas) == 3
+
+
+def test_nova_versao_dos_indices_recalcula(historico, monkeypatch):
+    chamadas = []
+    historico.calcular("tjrj", _calculadora(chamadas), {"valor": 100.0, "meses": 12})
+    monkeypatch.setattr(modulo, "versao_indices", lambda: "outra")
+    assert not historico.calcular("tjrj", _calculadora(chamadas), {"valor": 100.0, "meses": 12})[1]
+    assert len(chamadas) == 2
+
+
+def test_nova_versao_do_motor_recalcula(historico, monkeypatch):
+    chamadas = []
+    historico.calcular("tjrj", _calculadora(chamadas), {"valor": 100.0, "meses": 12})
+    monkeypatch.setattr(modulo, "VERSAO_MOTOR", modulo.VERSAO_MOTOR + 1)
+    assert not historico.calcular("tjrj", _calculadora(chamadas), {"valor": 100.0, "meses": 12})[1]
+    assert len(chamadas) == 2
+
+
+@pytest.fixture
+def registros(historico):
+    calcular = _calculadora([])
+    historico.calcular("tjrj", calcular, {"valor": 100.0, "meses": 1}, PROCESSO, "Estado do RJ")
+    historico.calcular("tjrj", calcular, {"valor": 200.0, "meses": 1}, OUTRO_PROCESSO, "Município do RJ")
+    historico.calcular("fazenda", calcular, {"valor": 300.0, "meses": 1}, PROCESSO, " Estado do RJ ")
+    historico.calcular("tjrj", calcular, {"valor": 400.0, "meses": 1})
+    return historico
+
+
+@pytest.mark.parametrize("filtros, valores", [
+    ({}, [100.0, 200.0, 300.0, 400.0]),
+    ({"calculadora": "tjrj"}, [100.0, 200.0, 400.0]),
+    ({"processo": PROCESSO}, [100.0, 300.0]),
+    ({"ente": "Estado do RJ"}, [100.0, 300.0]),
+    ({"calculadora": "tjrj", "processo": PROCESSO}, [100.0]),
+    ({"calculadora": "fazenda", "ente": "Município do RJ"}, []),
+    ({"processo": "", "ente": None}, [100.0, 200.0, 300.0, 400.0]),  # filtros vazios são ignorados
+])
+def test_filtros_da_consulta(registros, filtros, valores):
+    linhas = registros.consultar(**filtros)
+    assert sorted(linha["entradas"]["valor"] for linha in linhas) == valores
+    for linha in linhas:
+        assert linha["total"] == linha["resultado"]["total"]
+
+
+def test_limite_da_consulta(registros):
+    assert len(registros.consultar(limite=2)) == 2
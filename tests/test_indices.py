@@ -0,0 +1,14 @@
+import numpy as np
+import pytest
+
+from utils.calculo_tjrj import SERIES_CORRECAO, fator_correcao_monetaria
+from utils.indices import ultimo_mes_serie
+
+
+@pytest.mark.parametrize("indice", list(SERIES_CORRECAO))
+def test_correcao_para_no_ultimo_mes_da_serie(indice):
+    ultimo_mes = ultimo_mes_serie(SERIES_CORRECAO[indice])
+    fim_da_serie = (ultimo_mes + 1).astype("datetime64[D]") - 1
+    depois = fim_da_serie + np.arange(1, 400)
+    np.testing.assert_array_equal(fator_correcao_monetaria(indice, "2020-01-15", depois),
+                                  fator_correcao_monetaria(indice, "2020-01-15", fim_da_serie))
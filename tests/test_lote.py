@@ -0,0 +1,106 @@
+import pandas as pd
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+import pytest
+
+from utils.calculo_tjrj import CONTRATUAL, JUROS_CODIGO_CIVIL, JUROS_12
+from utils.lote import argumentos_do_bloco, calcular_bloco, processar_arquivo, processar_em_paralelo
+
+
+def _carteira_tjrj(linhas):
+    carteira = pd.DataFrame({
+        "processo": [f"{n:07d}" for n in range(linhas)],
+        "valor": 10_000.0,
+        "data_juros": "2020-01-15",
+        "data_final": "31/12/2024",
+        "tipo_juros": JUROS_12,
+        "tipo_obrigacao": "",
+    })
+    # Só o último bloco tem tipo_obrigacao preenchido
+    carteira.loc[linhas - 2:, ["tipo_juros", "tipo_obrigacao"]] = [JUROS_CODIGO_CIVIL, CONTRATUAL]
+    return carteira
+
+
+@pytest.mark.parametrize("formato", ["csv", "parquet"])
+def test_coluna_de_texto_vazia_no_primeiro_bloco(tmp_path, formato):
+    entrada = tmp_path / "carteira.csv"
+    _carteira_tjrj(6).to_csv(entrada, index=False)
+    saida = tmp_path / f"resultados.{formato}"
+
+    assert processar_arquivo(entrada, saida, "tjrj", tamanho_lote=2) == 6
+
+    tabela = pq.read_table(saida) if formato == "parquet" else pcsv.read_csv(saida)
+    resultado = tabela.to_pandas()
+    assert resultado["tipo_obrigacao"].fillna("").tolist() == ["", "", "", "", CONTRATUAL, CONTRATUAL]
+    if formato == "parquet":
+        assert resultado["processo"].tolist()[:2] == ["0000000", "0000001"]
+        assert str(tabela.schema.field("data_juros").type) == "date32[day]"
+
+
+def test_paralelo_com_coluna_vazia_no_primeiro_bloco(tmp_path):
+    entrada = tmp_path / "carteira.csv"
+    _carteira_tjrj(6).to_csv(entrada, index=False)
+    saida = tmp_path / "resultados.parquet"
+
+    assert processar_em_paralelo(entrada, saida, "tjrj", processos=2, tamanho_lote=2) == 6
+    assert pq.read_table(saida).num_rows == 6
+    assert not (tmp_path / "resultados.parquet.fragmentos").exists()
+
+
+def test_paralelo_nao_reaproveita_fragmentos_de_carteira_editada(tmp_path):
+    carteira = _carteira_tjrj(6)
+    carteira.loc[5, "data_juros"] = None
+    entrada = tmp_path / "carteira.csv"
+    carteira.to_csv(entrada, index=False)
+    saida = tmp_path / "resultados.parquet"
+    with pytest.raises(ValueError, match="linha 6 "):
+        processar_em_paralelo(entrada, saida, "tjrj", processos=1, tamanho_lote=2)
+    assert (tmp_path / "resultados.parquet.fragmentos").exists()
+
+    # Mesmo caminho, conteúdo corrigido: os fragmentos da execução interrompida não servem
+    _carteira_tjrj(6).to_csv(entrada, index=False)
+    with pytest.raises(ValueError, match="outra execução"):
+        processar_em_paralelo(entrada, saida, "tjrj", processos=1, tamanho_lote=2)
+
+
+@pytest.mark.parametrize("coluna", ["data_juros", "data_final"])
+def test_data_em_branco_indica_a_linha(tmp_path, coluna):
+    carteira = _carteira_tjrj(6)
+    carteira.loc[4, coluna] = None
+    entrada = tmp_path / "carteira.csv"
+    carteira.to_csv(entrada, index=False)
+
+    with pytest.raises(ValueError, match=f"'{coluna}', linha 5 "):
+        processar_arquivo(entrada, tmp_path / "resultados.csv", "tjrj", tamanho_lote=2)
+
+
+def test_data_invalida_indica_a_linha():
+    bloco = _carteira_tjrj(3)
+    bloco.loc[1, "data_juros"] = "31/02/2020"
+    with pytest.raises(ValueError, match="'data_juros', linha 2 "):
+        argumentos_do_bloco(bloco, "tjrj")
+
+
+@pytest.mark.parametrize("coluna, valor, linha", [
+    ("tipo_juros", "Juros simples 1% a.m.", 3),
+    ("tipo_juros", None, 2),
+    ("indice_correcao", "IPCA", 1),
+    ("tipo_obrigacao", "", 5),  # juros do Código Civil exigem o tipo da obrigação
+    ("tipo_obrigacao", "contratual", 6),
+])
+def test_opcao_invalida_indica_a_linha(tmp_path, coluna, valor, linha):
+    carteira = _carteira_tjrj(6).assign(indice_correcao="INPC")
+    carteira.loc[linha - 1, coluna] = valor
+    entrada = tmp_path / "carteira.csv"
+    carteira.to_csv(entrada, index=False)
+
+    with pytest.raises(ValueError, match=f"'{coluna}', linha {linha} "):
+        processar_arquivo(entrada, tmp_path / "resultados.csv", "tjrj", tamanho_lote=2)
+
+
+def test_data_inicial_em_branco_usa_data_juros():
+    bloco = _carteira_tjrj(2).assign(data_inicial=["2019-06-01", None], indice_correcao="INPC")
+    resultado = calcular_bloco(bloco, "tjrj")
+    sem_coluna = calcular_bloco(bloco.drop(columns="data_inicial"), "tjrj")
+    assert resultado["total"].iloc[1] == sem_coluna["total"].iloc[1]
+    assert resultado["total"].iloc[0] > sem_coluna["total"].iloc[0]
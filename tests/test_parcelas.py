@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from utils.parcelas import _numeros, ler_parcelas
+
+
+@pytest.mark.parametrize("texto, valor", [
+    ("1.500", 1500.0),
+    ("12.345.678", 12_345_678.0),
+    ("1.234,56", 1234.56),
+    ("R$ 1.500,00", 1500.0),
+    ("1500,5", 1500.5),
+    ("1.5", 1.5),
+    ("1.50", 1.5),
+    ("0.500", 0.5),
+    ("1500.00", 1500.0),
+    ("-1.500", -1500.0),
+])
+def test_numeros(texto, valor):
+    assert _numeros(pd.Series([texto]))[0] == pytest.approx(valor)
+
+
+@pytest.mark.parametrize("texto", ["1,234.56", "1.23,4", "1.2345,00"])
+def test_numeros_fora_do_formato_brasileiro(texto):
+    with pytest.raises(ValueError):
+        _numeros(pd.Series([texto]))
+
+
+@pytest.mark.parametrize("cabecalho", ["", "Vencimento;Valor\n", "data de vencimento;valor (R$)\n"])
+def test_cabecalho_opcional(cabecalho):
+    parcelas = ler_parcelas(cabecalho + "10/01/2020;1.500\n2020-02-10;1.650,00")
+    assert parcelas["valor"].tolist() == [1500.0, 1650.0]
+    assert str(parcelas["vencimento"].iloc[0].date()) == "2020-01-10"
+
+
+def test_primeira_parcela_com_data_invalida_nao_e_cabecalho():
+    with pytest.raises(ValueError, match="parcela 1"):
+        ler_parcelas("31/02/2020;1.500,00\n10/03/2020;1.500,00")
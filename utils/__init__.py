@@ -0,0 +1 @@
+"""Funções auxiliares para cálculos e processamento das calculadoras jurídicas."""
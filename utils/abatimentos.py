@@ -0,0 +1,157 @@
+"""Abatimentos (depósitos, levantamentos, penhoras) no débito cível, em ordem cronológica.
+
+Entre dois eventos o saldo é atualizado pelos fatores acumulados desde o início
+(correção do índice e juros simples, os mesmos do cálculo principal), calculados
+de uma só vez para todas as datas; cada evento só divide um fator pelo anterior,
+sem percorrer de novo a linha do tempo. O pagamento é imputado primeiro nos
+juros vencidos e depois no capital (art. 354 do CC).
+
+Os eventos de uma carteira inteira são organizados em uma matriz
+``(processos, pontos)``, e a imputação anda coluna a coluna com operações
+vetorizadas sobre todos os processos. Sem pagamentos, o saldo final coincide
+com o valor corrigido de ``calcular_debitos_tjrj``.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.calculo_tjrj import SEM_CORRECAO, encargos_tjrj, fator_correcao_monetaria, juros_tjrj, meses_de_juros
+from utils.datas import para_datetime64
+
+# Componentes de cada ponto da linha do tempo (matrizes ``(processos, pontos)``)
+COMPONENTES = ("correcao_monetaria", "juros_periodo", "imputado_juros", "imputado_principal", "excedente",
+               "principal", "juros_pendentes", "saldo")
+
+
+def matriz_de_eventos(processos, datas, valores, datas_finais):
+    """Eventos de vários processos (em qualquer ordem) em matrizes ``(processos, pontos)`` ordenadas por data.
+
+    ``processos`` são as posições (0 a n − 1) em ``datas_finais``. Cada linha termina na data final do
+    processo; as posições que sobram repetem a data final com valor zero. Eventos posteriores à data
+    final são desconsiderados.
+    """
+    datas_finais = para_datetime64(datas_finais)
+    processos, datas = np.asarray(processos, dtype=np.int64), para_datetime64(datas)
+    valores = np.asarray(valores, dtype=np.float64)
+    dentro = datas <= datas_finais[processos]
+    processos, datas, valores = processos[dentro], datas[dentro], valores[dentro]
+
+    # Uma só ordenação por (processo, data): a data em dias ocupa os 32 bits inferiores da chave
+    dias = datas.astype(np.int64)
+    ordem = np.argsort((processos << 32) + (dias - dias.min(initial=0)), kind="stable")
+    processos, datas, valores = processos[ordem], datas[ordem], valores[ordem]
+    contagem = np.bincount(processos, minlength=len(datas_finais))
+    primeiro = np.cumsum(contagem) - contagem
+    posicao = np.arange(len(processos)) - primeiro[processos]
+
+    pontos = int(contagem.max(initial=0)) + 1
+    matriz_datas = np.repeat(datas_finais[:, None], pontos, axis=1)
+    matriz_valores = np.zeros((len(datas_finais), pontos))
+    matriz_datas[processos, posicao] = datas
+    matriz_valores[processos, posicao] = valores
+    return matriz_datas, matriz_valores
+
+
+def imputar_pagamentos(valor, correcao, juros, pagamentos, juros_iniciais=0.0):
+    """Saldo de cada processo em cada ponto, com os pagamentos imputados nos juros e depois no capital.
+
+    ``correcao`` e ``juros`` são os fatores acumulados desde o início em cada ponto (``(processos, pontos)``);
+    ``juros_iniciais`` são os juros já vencidos no início (termo dos juros anterior à data inicial).
+    Juros não pagos também são corrigidos. Retorna uma matriz para cada nome de ``COMPONENTES``;
+    ``excedente`` é o que foi pago além do saldo.
+    """
+    processos, pontos = np.shape(pagamentos)
+    principal = np.broadcast_to(np.asarray(valor, dtype=np.float64), (processos,)).copy()
+    juros_anteriores = np.broadcast_to(np.asarray(juros_iniciais, dtype=np.float64), (processos,))
+    juros_pendentes = principal * juros_anteriores
+    correcao_anterior = np.ones(processos)
+    saida = {nome: np.empty((processos, pontos)) for nome in COMPONENTES}
+
+    for ponto in range(pontos):
+        fator = correcao[:, ponto] / correcao_anterior
+        saida["correcao_monetaria"][:, ponto] = (principal + juros_pendentes) * (fator - 1)
+        principal = principal * fator
+        juros_periodo = principal * (juros[:, ponto] - juros_anteriores)
+        juros_pendentes = juros_pendentes * fator + juros_periodo
+
+        pago = pagamentos[:, ponto]
+        imputado_juros = np.minimum(pago, juros_pendentes)
+        imputado_principal = np.minimum(pago - imputado_juros, principal)
+        juros_pendentes = juros_pendentes - imputado_juros
+        principal = principal - imputado_principal
+
+        saida["juros_periodo"][:, ponto] = juros_periodo
+        saida["imputado_juros"][:, ponto] = imputado_juros
+        saida["imputado_principal"][:, ponto] = imputado_principal
+        saida["excedente"][:, ponto] = pago - imputado_juros - imputado_principal
+        saida["principal"][:, ponto] = principal
+        saida["juros_pendentes"][:, ponto] = juros_pendentes
+        saida["saldo"][:, ponto] = principal + juros_pendentes
+        correcao_anterior, juros_anteriores = correcao[:, ponto], juros[:, ponto]
+    return saida
+
+
+def _coluna(valores, processos):
+    return np.broadcast_to(np.asarray(valores), (processos,))[:, None]
+
+
+def abatimentos_tjrj(valor, data_inicial, data_juros, data_final, processos_eventos, datas_eventos, valores_eventos,
+                     tipo_juros, tipo_obrigacao=None, indice_correcao=SEM_CORRECAO, honorarios=0.0,
+                     aplicar_523=False):
+    """Linha do tempo de uma carteira: um processo por posição dos parâmetros e eventos em formato longo.
+
+    ``processos_eventos`` indica a posição do processo de cada evento. Eventos anteriores à data inicial
+    são tratados como pagos nela. Retorna as matrizes ``datas``, ``pagamentos`` e ``COMPONENTES``, e
+    por processo o ``saldo_final``, o ``total_pago``, o ``total_excedente`` e os encargos (honorários e
+    art. 523) sobre o saldo final.
+    """
+    datas_finais = para_datetime64(data_final)
+    processos = max(np.size(valor), np.size(data_inicial), np.size(data_juros), datas_finais.size,
+                    int(np.max(processos_eventos, initial=-1)) + 1)
+    datas_finais = np.broadcast_to(datas_finais, (processos,))
+    inicio, termo_juros = _coluna(para_datetime64(data_inicial), processos), _coluna(para_datetime64(data_juros),
+                                                                                      processos)
+    tipo_juros, tipo_obrigacao = _coluna(tipo_juros, processos), _coluna(tipo_obrigacao, processos)
+
+    datas, pagamentos = matriz_de_eventos(processos_eventos, datas_eventos, valores_eventos, datas_finais)
+    datas = np.maximum(datas, inicio)
+    _, juros = juros_tjrj(tipo_juros, tipo_obrigacao, termo_juros, datas, meses_de_juros(termo_juros, datas))
+    _, juros_iniciais = juros_tjrj(tipo_juros, tipo_obrigacao, termo_juros, inicio,
+                                   meses_de_juros(termo_juros, inicio))
+    correcao = fator_correcao_monetaria(_coluna(indice_correcao, processos), inicio, datas)
+
+    saida = imputar_pagamentos(valor, correcao, juros, pagamentos, juros_iniciais[:, 0])
+    saldo_final = saida["saldo"][:, -1]
+    return {
+        "datas": datas,
+        "pagamentos": pagamentos,
+        **saida,
+        "saldo_final": saldo_final,
+        "total_pago": pagamentos.sum(axis=1),
+        "total_excedente": saida["excedente"].sum(axis=1),
+        **encargos_tjrj(saldo_final, honorarios, aplicar_523),
+    }
+
+
+def linha_do_tempo_tjrj(valor, data_inicial, data_juros, data_final, eventos, tipo_juros, tipo_obrigacao=None,
+                        indice_correcao=SEM_CORRECAO, honorarios=0.0, aplicar_523=False):
+    """Um processo: ``eventos`` é um DataFrame com ``data``, ``valor`` e (opcional) ``descricao``.
+
+    Retorna a tabela com uma linha por evento, mais a data final, e o resumo do saldo (escalares).
+    """
+    eventos = eventos.dropna(subset=["data", "valor"])
+    datas_eventos = para_datetime64(eventos["data"])
+    eventos = eventos[(eventos["valor"] > 0).to_numpy() & (datas_eventos <= para_datetime64(data_final))]
+    eventos = eventos.iloc[np.argsort(para_datetime64(eventos["data"]), kind="stable")]
+    resultado = abatimentos_tjrj(valor, data_inicial, data_juros, data_final, np.zeros(len(eventos), np.int64),
+                                 eventos["data"], eventos["valor"], tipo_juros, tipo_obrigacao, indice_correcao,
+                                 honorarios, aplicar_523)
+
+    descricoes = eventos["descricao"].fillna("").tolist() if "descricao" in eventos else [""] * len(eventos)
+    tabela = pd.DataFrame({"data": resultado["datas"][0], "descricao": descricoes + ["Data final"],
+                           "pagamento": resultado["pagamentos"][0],
+                           **{nome: resultado[nome][0] for nome in COMPONENTES}})
+    resumo = {chave: np.asarray(resultado[chave]).item() for chave in (
+        "saldo_final", "total_pago", "total_excedente", "valor_honorarios", "multa_523", "honorarios_523", "total")}
+    resumo["juros_imputados"] = float(tabela["imputado_juros"].sum())
+    resumo["principal_imputado"] = float(tabela["imputado_principal"].sum())
+    return tabela, resumo
@@ -0,0 +1,226 @@
+"""Serviço HTTP/JSON local com as calculadoras, sem passar pela interface do Streamlit.
+
+Rotas::
+
+    GET  /saude                 -> {"status": "ok"}
+    GET  /metricas              -> contadores de tempo por rota, no formato do Prometheus
+    POST /calcular/<calculadora> -> um processo (objeto JSON) e seu resultado
+    POST /lote/<calculadora>     -> vários processos (lista JSON ou NDJSON), resposta em NDJSON
+
+``<calculadora>`` é ``tjrj`` ou ``fazenda``; os campos são as mesmas colunas do
+processamento em lote (``utils.lote``). A resposta de cada processo traz os campos
+enviados mais os componentes calculados (juros, honorários, multa do art. 523,
+os dois resultados da Fazenda...).
+
+O servidor atende cada conexão em uma thread, mantém as conexões abertas
+(HTTP/1.1) e devolve os lotes em blocos (``Transfer-Encoding: chunked``), à
+medida que são calculados.
+
+Uso::
+
+    python -m utils.api --porta 8502
+"""
+import argparse
+import json
+import tempfile
+import traceback
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from utils.desempenho import Medidor, formato_prometheus
+from utils.lote import CALCULADORAS, calcular_bloco
+
+PORTA_PADRAO = 8502
+TAMANHO_BLOCO_API = 10_000
+LIMITE_MEMORIA_CORPO = 16 * 1024 * 1024  # corpos NDJSON maiores vão para o disco
+
+TIPO_JSON = "application/json; charset=utf-8"
+TIPO_NDJSON = "application/x-ndjson; charset=utf-8"
+
+ERRO_INTERNO = "Erro interno ao calcular; os detalhes foram registrados no log do servidor."
+
+
+def _mensagem(erro):
+    """Mensagem de um erro de entrada (``TypeError`` vem de um campo com tipo errado)."""
+    if isinstance(erro, TypeError):
+        return f"Campo com tipo inválido: {erro}"
+    return str(erro)
+
+
+def calcular_registros(registros, calculadora, inicio=0):
+    """Calcula uma lista de processos (dicionários) e devolve as linhas em JSON, uma por processo.
+
+    ``inicio`` é a posição do primeiro processo no lote (usada nas mensagens de erro).
+    """
+    for posicao, registro in enumerate(registros, start=inicio + 1):
+        if not isinstance(registro, dict):
+            raise ValueError(f"O processo {posicao} do lote deve ser um objeto JSON, não {registro!r}.")
+        for campo, valor in registro.items():
+            if isinstance(valor, (dict, list)):
+                raise ValueError(f"O campo '{campo}' do processo {posicao} deve ser um texto, número ou booleano.")
+    bloco = pd.DataFrame.from_records(registros).set_axis(pd.RangeIndex(inicio, inicio + len(registros)))
+    return calcular_bloco(bloco, calculadora).to_json(orient="records", lines=True, date_format="iso",
+                                                      force_ascii=False)
+
+
+def _blocos_de_registros(registros, tamanho=TAMANHO_BLOCO_API):
+    bloco = []
+    for registro in registros:
+        bloco.append(registro)
+        if len(bloco) == tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # conexões persistentes (keep-alive)
+    server_version = "CalculadoraJudicial/1.0"
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/saude":
+            self._responder(HTTPStatus.OK, {"status": "ok"})
+        elif self.path.rstrip("/") == "/metricas":
+            self._enviar(HTTPStatus.OK, formato_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._responder(HTTPStatus.NOT_FOUND, {"erro": f"Rota não encontrada: {self.path}"})
+
+    def do_POST(self):
+        partes = self.path.strip("/").split("/")
+        if len(partes) != 2 or partes[0] not in ("calcular", "lote") or partes[1] not in CALCULADORAS:
+            self._descartar_corpo()
+            self._responder(HTTPStatus.NOT_FOUND, {"erro": f"Rota não encontrada: {self.path}"})
+            return
+        rota, calculadora = partes
+        with Medidor("api").etapa(f"{rota}_{calculadora}"):
+            self._calcular(rota, calculadora)
+
+    def _calcular(self, rota, calculadora):
+        try:
+            if rota == "calcular":
+                registro = json.loads(self._ler_corpo())
+                if not isinstance(registro, dict):
+                    raise ValueError("O corpo deve ser um objeto JSON com os dados de um processo.")
+                linha = calcular_registros([registro], calculadora)
+                self._enviar(HTTPStatus.OK, linha.strip().encode("utf-8"), TIPO_JSON)
+            else:
+                self._responder_lote(calculadora)
+        except (ValueError, TypeError) as erro:  # JSON inválido, colunas ausentes, campos de tipo errado
+            if rota == "lote":
+                self.close_connection = True  # parte do corpo NDJSON pode não ter sido lida
+            self._responder(HTTPStatus.BAD_REQUEST, {"erro": _mensagem(erro)})
+        except Exception:
+            self.close_connection = True
+            self.log_error("%s", traceback.format_exc())
+            self._responder(HTTPStatus.INTERNAL_SERVER_ERROR, {"erro": ERRO_INTERNO})
+
+    def _responder_lote(self, calculadora):
+        blocos = _blocos_de_registros(self._registros_do_lote())
+        # O primeiro bloco é calculado antes do cabeçalho para que erros de entrada ainda virem 400
+        primeiro = next(blocos, [])
+        linhas = calcular_registros(primeiro, calculadora) if primeiro else ""
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", TIPO_NDJSON)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            if linhas:  # um pedaço vazio encerraria a resposta antes da hora
+                self._enviar_pedaco(linhas.encode("utf-8"))
+            inicio = len(primeiro)
+            for bloco in blocos:
+                self._enviar_pedaco(calcular_registros(bloco, calculadora, inicio).encode("utf-8"))
+                inicio += len(bloco)
+        except Exception as erro:
+            # Cabeçalho já enviado: o erro vira a última linha do NDJSON
+            if not isinstance(erro, (ValueError, TypeError)):
+                self.log_error("%s", traceback.format_exc())
+            mensagem = _mensagem(erro) if isinstance(erro, (ValueError, TypeError)) else ERRO_INTERNO
+            self._enviar_pedaco((json.dumps({"erro": mensagem}, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._enviar_pedaco(b"")
+
+    def _registros_do_lote(self):
+        """Processos do corpo: lista JSON ou, com ``Content-Type: application/x-ndjson``, um por linha."""
+        if "ndjson" in self.headers.get("Content-Type", ""):
+            return self._linhas_ndjson()
+        registros = json.loads(self._ler_corpo())
+        if not isinstance(registros, list):
+            raise ValueError("O corpo deve ser uma lista JSON de processos.")
+        return registros
+
+    def _linhas_ndjson(self):
+        # O corpo é recebido por inteiro antes da resposta (o cliente só lê depois de enviar tudo),
+        # mas vai para um arquivo temporário e é lido linha a linha, sem ficar todo em memória
+        with tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA_CORPO) as corpo:
+            restante = self._tamanho_corpo()
+            while restante > 0:
+                pedaco = self.rfile.read(min(restante, 1024 * 1024))
+                if not pedaco:
+                    break
+                corpo.write(pedaco)
+                restante -= len(pedaco)
+            corpo.seek(0)
+            for linha in corpo:
+                if linha.strip():
+                    yield json.loads(linha)
+
+    def _tamanho_corpo(self):
+        try:
+            return int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise ValueError("Content-Length inválido.") from None
+
+    def _ler_corpo(self):
+        return self.rfile.read(self._tamanho_corpo())
+
+    def _descartar_corpo(self):
+        # Mantém a conexão utilizável para a próxima requisição
+        self._ler_corpo()
+
+    def _responder(self, status, conteudo):
+        self._enviar(status, json.dumps(conteudo, ensure_ascii=False).encode("utf-8"), TIPO_JSON)
+
+    def _enviar(self, status, corpo, tipo):
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        if self.close_connection:
+            self.send_header("Connection", "close")  # o cliente abre outra conexão em vez de reaproveitar esta
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _enviar_pedaco(self, dados):
+        """Envia um pedaço da resposta em blocos; ``b""`` é o terminador e só deve ser enviado uma vez."""
+        self.wfile.write(f"{len(dados):X}\r\n".encode("ascii") + dados + b"\r\n")
+        if not dados:
+            self.wfile.flush()
+
+
+def criar_servidor(host="127.0.0.1", porta=PORTA_PADRAO):
+    """Servidor HTTP multithread com as rotas da API (ainda não iniciado)."""
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorAPI)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON das calculadoras de débitos judiciais.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    args = parser.parse_args(argv)
+
+    servidor = criar_servidor(args.host, args.porta)
+    print(f"API disponível em http://{args.host}:{args.porta} (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
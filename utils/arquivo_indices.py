@@ -0,0 +1,191 @@
+"""Arquivo binário das séries de índices, mapeado em memória (somente leitura) pelos processos do servidor.
+
+Formato (little-endian), versão ``VERSAO_FORMATO``::
+
+    MAGICO (8 bytes) | versão (uint32) | tamanho do diretório (uint32) | diretório (JSON UTF-8)
+    | preenchimento até múltiplo de ALINHAMENTO | dados (float64)
+
+O diretório descreve cada série (classe, início, tamanho e posição das taxas e
+dos fatores acumulados nos dados) e guarda o SHA-256 dos dados e de cada CSV de
+origem. Os arrays são views de um único ``np.memmap``: todos os processos
+compartilham a mesma cópia no cache de páginas do sistema, e a inicialização não
+interpreta os CSV nem recalcula os fatores acumulados.
+
+O arquivo é gerado fora do servidor, a partir dos CSV do SGS conferidos contra o
+manifesto ``SHA256SUMS`` (formato do ``sha256sum``)::
+
+    python -m utils.arquivo_indices
+    python -m utils.arquivo_indices --verificar
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from utils.indices import (ARQUIVO_BINARIO, ARQUIVO_SELIC, ARQUIVO_TAXA_LEGAL, ARQUIVOS_SERIES, DIRETORIO_DADOS,
+                           SerieDiaria, ler_todas)
+
+MAGICO = b"IDXCALC\0"
+VERSAO_FORMATO = 1
+CABECALHO = struct.Struct("<8sII")
+ALINHAMENTO = 64
+MANIFESTO = "SHA256SUMS"
+
+
+def _sha256(dados):
+    return hashlib.sha256(dados).hexdigest()
+
+
+def assinatura_fontes(arquivos):
+    """Nome e tamanho de cada CSV de origem (comparados na abertura para descartar um arquivo desatualizado)."""
+    return {Path(arquivo).name: Path(arquivo).stat().st_size for arquivo in sorted(arquivos)}
+
+
+def ler_manifesto(caminho):
+    """Hash SHA-256 esperado de cada arquivo, no formato do ``sha256sum`` (``hash  nome``)."""
+    esperados = {}
+    for numero, linha in enumerate(Path(caminho).read_text(encoding="utf-8").splitlines(), start=1):
+        if not linha.strip() or linha.startswith("#"):
+            continue
+        partes = linha.split(maxsplit=1)
+        if len(partes) != 2 or len(partes[0]) != 64:
+            raise ValueError(f"{caminho}: linha {numero} fora do formato 'hash  arquivo'")
+        esperados[partes[1].strip().lstrip("*")] = partes[0].lower()
+    return esperados
+
+
+def conferir_fontes(diretorio, manifesto):
+    """Confere cada CSV usado pelas séries contra o manifesto; devolve os hashes calculados.
+
+    Levanta ``ValueError`` listando os arquivos ausentes do manifesto ou com hash divergente.
+    """
+    esperados = ler_manifesto(manifesto)
+    arquivos = sorted({arquivo for arquivo, _ in ARQUIVOS_SERIES.values()} | {ARQUIVO_SELIC, ARQUIVO_TAXA_LEGAL})
+    hashes = {arquivo: _sha256((Path(diretorio) / arquivo).read_bytes()) for arquivo in arquivos}
+    problemas = [f"{arquivo}: ausente do manifesto" if arquivo not in esperados else f"{arquivo}: hash divergente"
+                 for arquivo, atual in hashes.items() if esperados.get(arquivo) != atual]
+    if problemas:
+        raise ValueError("Os CSV não conferem com o manifesto " + str(manifesto) + ":\n" + "\n".join(problemas))
+    return hashes
+
+
+def _alinhar(tamanho):
+    return -(-tamanho // ALINHAMENTO) * ALINHAMENTO
+
+
+def gerar_arquivo(saida=ARQUIVO_BINARIO, diretorio=DIRETORIO_DADOS, manifesto=None):
+    """Gera o arquivo binário a partir dos CSV de ``diretorio`` conferidos contra o ``manifesto``.
+
+    O arquivo é gravado em um temporário e depois substitui o anterior de uma só vez: processos que
+    já o mapearam continuam lendo a versão antiga até reiniciarem. Devolve o diretório gravado.
+    """
+    diretorio = Path(diretorio)
+    manifesto = diretorio / MANIFESTO if manifesto is None else Path(manifesto)
+    hashes = conferir_fontes(diretorio, manifesto)
+    series = ler_todas(diretorio)
+
+    blocos, posicao, descricao = [], 0, {}
+    for nome, serie in series.items():
+        inicio = serie.data_inicial if isinstance(serie, SerieDiaria) else serie.mes_inicial
+        taxas = serie.taxas if isinstance(serie, SerieDiaria) else serie.variacoes
+        descricao[nome] = {"classe": type(serie).__name__, "inicio": str(inicio), "tamanho": len(taxas),
+                           "variacoes": posicao, "acumulado": posicao + taxas.nbytes}
+        blocos += [taxas.astype("<f8"), serie.acumulado.astype("<f8")]
+        posicao += taxas.nbytes + serie.acumulado.nbytes
+    dados = np.concatenate(blocos).tobytes()
+
+    conteudo = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "fontes": assinatura_fontes(diretorio.glob("*.csv")),
+        "sha256_fontes": hashes,
+        "sha256_dados": _sha256(dados),
+        "series": descricao,
+    }
+    texto = json.dumps(conteudo, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    inicio_dados = _alinhar(CABECALHO.size + len(texto))
+
+    saida = Path(saida)
+    with tempfile.NamedTemporaryFile(dir=saida.parent, prefix=f".{saida.name}.", delete=False) as temporario:
+        temporario.write(CABECALHO.pack(MAGICO, VERSAO_FORMATO, len(texto)))
+        temporario.write(texto.ljust(inicio_dados - CABECALHO.size, b" "))
+        temporario.write(dados)
+    os.replace(temporario.name, saida)
+
+    # Releitura: os arrays mapeados devem ser idênticos aos calculados a partir dos CSV
+    gravado = abrir_arquivo(saida, verificar=True)["series"]
+    for nome, serie in series.items():
+        taxas = serie.taxas if isinstance(serie, SerieDiaria) else serie.variacoes
+        _, _, variacoes, acumulado = gravado[nome]
+        if not (np.array_equal(variacoes, taxas) and np.array_equal(acumulado, serie.acumulado)):
+            raise ValueError(f"{saida}: a série {nome} gravada difere da lida dos CSV")
+    return conteudo
+
+
+def abrir_arquivo(caminho=ARQUIVO_BINARIO, verificar=False):
+    """Diretório do arquivo com ``series``: ``{nome: (classe, início, variações, acumulado)}``.
+
+    Os arrays são views somente leitura do arquivo mapeado em memória. Com ``verificar``, o SHA-256
+    dos dados é conferido (lê o arquivo inteiro). Levanta ``ValueError`` se o arquivo for inválido
+    (cabeçalho, diretório ou tamanho dos dados).
+    """
+    with open(caminho, "rb") as arquivo:
+        cabecalho = arquivo.read(CABECALHO.size)
+        if len(cabecalho) < CABECALHO.size:
+            raise ValueError(f"{caminho}: arquivo truncado no cabeçalho")
+        magico, versao, tamanho = CABECALHO.unpack(cabecalho)
+        if magico != MAGICO:
+            raise ValueError(f"{caminho}: não é um arquivo de índices")
+        if versao != VERSAO_FORMATO:
+            raise ValueError(f"{caminho}: formato versão {versao}, esperado {VERSAO_FORMATO}")
+        conteudo = json.loads(arquivo.read(tamanho))  # JSONDecodeError é um ValueError
+    inicio_dados = _alinhar(CABECALHO.size + tamanho)
+    tamanho_dados = sum(serie["tamanho"] * 2 + 1 for serie in conteudo["series"].values()) * 8
+    if Path(caminho).stat().st_size != inicio_dados + tamanho_dados:
+        raise ValueError(f"{caminho}: tamanho do arquivo não confere com o diretório (arquivo truncado?)")
+    dados = np.memmap(caminho, dtype="<f8", mode="r", offset=inicio_dados)
+    if verificar and _sha256(dados) != conteudo["sha256_dados"]:
+        raise ValueError(f"{caminho}: SHA-256 dos dados não confere")
+
+    series = {}
+    for nome, serie in conteudo["series"].items():
+        variacoes = serie["variacoes"] // dados.itemsize
+        acumulado = serie["acumulado"] // dados.itemsize
+        if serie["variacoes"] % 8 or serie["acumulado"] % 8 or acumulado + serie["tamanho"] + 1 > len(dados):
+            raise ValueError(f"{caminho}: posição da série {nome} fora dos dados")
+        series[nome] = (serie["classe"], np.datetime64(serie["inicio"]), dados[variacoes:variacoes + serie["tamanho"]],
+                        dados[acumulado:acumulado + serie["tamanho"] + 1])
+    return {**conteudo, "series": series}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera (ou verifica) o arquivo binário das séries de índices.")
+    parser.add_argument("--fontes", default=DIRETORIO_DADOS, type=Path, help="diretório dos CSV do SGS")
+    parser.add_argument("--manifesto", type=Path, help=f"hashes SHA-256 dos CSV (padrão: <fontes>/{MANIFESTO})")
+    parser.add_argument("--saida", default=ARQUIVO_BINARIO, type=Path, help="arquivo binário gerado")
+    parser.add_argument("--verificar", action="store_true", help="só confere o arquivo existente")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.verificar:
+            conteudo = abrir_arquivo(args.saida, verificar=True)
+        else:
+            gerar_arquivo(args.saida, args.fontes, args.manifesto)
+            conteudo = abrir_arquivo(args.saida)
+    except (OSError, ValueError) as erro:
+        sys.exit(f"Erro: {erro}")
+
+    for nome, (classe, inicio, variacoes, _) in conteudo["series"].items():
+        print(f"{nome:<12} {classe:<18} {inicio} + {len(variacoes):,} valores")
+    print(f"\n{args.saida}: {args.saida.stat().st_size:,} bytes, gerado em {conteudo['gerado_em']}, "
+          f"dados {conteudo['sha256_dados'][:12]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Benchmark reproduzível: cálculos, lotes, figuras e reruns das páginas.
+
+Os resultados são gravados em JSON (com as versões das bibliotecas) para que
+execuções diferentes possam ser comparadas; com ``--comparar`` a variação em
+relação a um JSON anterior é exibida ao final.
+
+Uso::
+
+    python -m utils.benchmark --saida benchmark.json
+    python -m utils.benchmark --tamanhos 1000 100000 --comparar benchmark_anterior.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+from datetime import date, datetime
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+
+from utils.calculo_fazenda import calcular_debito_fazenda
+from utils.calculo_tjrj import JUROS_12, JUROS_CODIGO_CIVIL, TIPOS_OBRIGACAO, calcular_debito_tjrj
+from utils.recursos import DIRETORIO_PROJETO
+
+TAMANHOS_LOTE = (1_000, 100_000, 1_000_000)
+REPETICOES = 5
+PACOTES = ("numpy", "pandas", "pyarrow", "plotly", "streamlit")
+
+PAGINAS = {
+    "pagina_inicial": ("app.py", None),
+    "pagina_tjrj": ("pages/Débitos Judiciais TJ-RJ.py", "Calcular"),
+    "pagina_fazenda": ("pages/Fazenda Pública.py", "Calcular"),
+}
+
+# Grade de cenários de referência (taxas × termos iniciais × datas finais): 50 × 200 × 200
+GRADE_CENARIOS = ((0.0, 0.24, 50), (date(2018, 1, 1), date(2021, 12, 31), 200),
+                  (date(2022, 1, 1), date(2025, 12, 31), 200))
+
+# Carteira de referência para os abatimentos: processos × eventos por processo
+CARTEIRA_ABATIMENTOS = (5_000, 200)
+
+# Caso de referência: valores padrão do formulário de cada página
+CASO_TJRJ = dict(valor=50000.0, data_juros=date(2020, 1, 15), data_final=date(2024, 12, 31), tipo_juros=JUROS_12,
+                 honorarios=20.0, aplicar_523=True)
+CASO_FAZENDA = dict(valor=50000.0, data_inicial_cor_mon=date(2019, 1, 1), data_final_cor_mon=date(2024, 12, 31),
+                    data_inicial_juros=date(2019, 1, 1), data_final_juros=date(2024, 12, 31),
+                    honorarios_percentual=10.0)
+
+
+def medir(funcao, repeticoes=REPETICOES):
+    """Tempo por chamada de ``funcao`` (em segundos): mediana, mínimo e máximo entre ``repeticoes`` rodadas.
+
+    Como no ``timeit``, funções rápidas são chamadas várias vezes por rodada.
+    """
+    temporizador = timeit.Timer(funcao)
+    chamadas, _ = temporizador.autorange()
+    tempos = np.array(temporizador.repeat(repeticoes, chamadas)) / chamadas
+    return {"mediana": float(np.median(tempos)), "minimo": float(tempos.min()), "maximo": float(tempos.max()),
+            "chamadas_por_rodada": chamadas, "rodadas": repeticoes}
+
+
+def medir_uma_vez(funcao, repeticoes=REPETICOES):
+    """Como ``medir``, mas com uma chamada por rodada (para operações longas)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"mediana": float(np.median(tempos)), "minimo": float(min(tempos)), "maximo": float(max(tempos)),
+            "chamadas_por_rodada": 1, "rodadas": repeticoes}
+
+
+def carteira_sintetica(calculadora, tamanho, semente=0):
+    """DataFrame com ``tamanho`` processos aleatórios (reprodutíveis) no formato do processamento em lote."""
+    import pandas as pd
+
+    gerador = np.random.default_rng(semente)
+    inicio = np.datetime64("2000-01-01") + gerador.integers(0, 8000, tamanho).astype("timedelta64[D]")
+    fim = np.minimum(inicio + gerador.integers(30, 6000, tamanho).astype("timedelta64[D]"),
+                     np.datetime64("2025-12-31"))
+    valor = gerador.uniform(1_000, 1_000_000, tamanho).round(2)
+    if calculadora == "fazenda":
+        return pd.DataFrame({"valor": valor, "data_inicial_cor_mon": inicio, "data_final_cor_mon": fim,
+                             "data_inicial_juros": inicio, "data_final_juros": fim, "honorarios_percentual": 10.0})
+    return pd.DataFrame({"valor": valor, "data_juros": inicio, "data_final": fim,
+                         "tipo_juros": gerador.choice([JUROS_12, JUROS_CODIGO_CIVIL], tamanho),
+                         "tipo_obrigacao": gerador.choice(TIPOS_OBRIGACAO, tamanho),
+                         "honorarios": 10.0, "aplicar_523": gerador.random(tamanho) < 0.5,
+                         "indice_correcao": "INPC", "data_inicial": inicio})
+
+
+def eventos_sinteticos(processos, eventos_por_processo, semente=0):
+    """Posição do processo, data e valor de ``eventos_por_processo`` abatimentos aleatórios por processo."""
+    gerador = np.random.default_rng(semente)
+    total = processos * eventos_por_processo
+    datas = np.datetime64("2015-01-01") + gerador.integers(0, 3650, total).astype("timedelta64[D]")
+    return np.repeat(np.arange(processos), eventos_por_processo), datas, gerador.uniform(10, 500, total).round(2)
+
+
+def benchmark_calculos():
+    from utils.abatimentos import abatimentos_tjrj
+    from utils.datas import dias_360, meses_inteiros
+    from utils.indices import ARQUIVO_BINARIO, ler_todas, series_binarias
+    from utils.sensibilidade import cenarios_tjrj
+
+    grade = (CASO_TJRJ["valor"], CASO_TJRJ["data_juros"], "INPC", CASO_TJRJ["honorarios"], True, *GRADE_CENARIOS)
+    eventos = eventos_sinteticos(*CARTEIRA_ABATIMENTOS)
+    datas = carteira_sintetica("tjrj", 1_000_000)[["data_juros", "data_final"]].to_numpy().T
+    return {
+        "calculo_tjrj": medir(lambda: calcular_debito_tjrj(**CASO_TJRJ)),
+        "calculo_fazenda_corte": medir(lambda: calcular_debito_fazenda(**CASO_FAZENDA)),
+        "grade_cenarios_tjrj": medir(lambda: cenarios_tjrj.__wrapped__(*grade)),
+        "abatimentos_tjrj": medir_uma_vez(lambda: abatimentos_tjrj(
+            100_000.0, date(2015, 1, 1), date(2015, 1, 1), date(2025, 6, 30), *eventos,
+            JUROS_12, indice_correcao="INPC"), 3),
+        "meses_inteiros_1_milhao": medir(lambda: meses_inteiros(*datas)),
+        "dias_360_1_milhao": medir(lambda: dias_360(*datas)),
+        "indices_csv": medir(ler_todas),
+        **({"indices_binario": medir(series_binarias.__wrapped__)} if ARQUIVO_BINARIO.exists() else {}),
+    }
+
+
+def benchmark_lotes(tamanhos=TAMANHOS_LOTE):
+    from utils.lote import calcular_bloco
+
+    resultados = {}
+    for calculadora in ("tjrj", "fazenda"):
+        for tamanho in tamanhos:
+            carteira = carteira_sintetica(calculadora, tamanho)
+            medida = medir_uma_vez(lambda: calcular_bloco(carteira, calculadora), 3 if tamanho > 100_000 else 5)
+            medida["processos"] = tamanho
+            medida["processos_por_segundo"] = tamanho / medida["mediana"]
+            resultados[f"lote_{calculadora}_{tamanho}"] = medida
+    return resultados
+
+
+def benchmark_figuras():
+    """Montagem de cada figura sem o cache (``__wrapped__``), como na primeira execução.
+
+    Registra também o tamanho do JSON enviado ao navegador e se ele passa de ``LIMITE_BYTES_FIGURA``.
+    """
+    from utils import graficos
+    from utils.evolucao import DIARIA, MENSAL
+
+    r = calcular_debito_tjrj(**CASO_TJRJ)
+    componentes = ("Valor Base", "Juros", "Honorários", "Multa Art. 523", "Hon. Art. 523")
+    valores = (CASO_TJRJ["valor"], r["valor_juros"], r["valor_honorarios"], r["multa_523"], r["honorarios_523"])
+    cores = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd")
+
+    f = calcular_debito_fazenda(**CASO_FAZENDA)
+    categorias = ("Valor Corrigido IPCA-e", "Juros até Corte", "Juros SELIC", "Total Final")
+    resultado1 = (f["valor_corrigido_ipcae"], 0, f["juros_selic_sobre_principal"], f["total_resultado1"])
+    resultado2 = (f["valor_corrigido_ipcae"], f["valor_juros_ate_corte"], f["juros_selic_sobre_consolidado"],
+                  f["total_resultado2"])
+    periodo = (CASO_FAZENDA["valor"], CASO_FAZENDA["data_inicial_cor_mon"], CASO_FAZENDA["data_final_cor_mon"])
+
+    construtores = {
+        "fig_pizza_tjrj": lambda: graficos.montar_fig_pizza_tjrj.__wrapped__(componentes, valores, cores),
+        "fig_evolucao_tjrj": lambda: graficos.montar_fig_evolucao_tjrj.__wrapped__(
+            CASO_TJRJ["valor"], r["meses"], r["taxa_mensal"]),
+        "fig_sensibilidade_tjrj": lambda: graficos.montar_fig_sensibilidade_tjrj.__wrapped__(
+            CASO_TJRJ["valor"], CASO_TJRJ["data_juros"], "INPC", CASO_TJRJ["honorarios"], True, *GRADE_CENARIOS,
+            12),
+        "fig_evolucao_fazenda_mensal": lambda: graficos.montar_fig_evolucao_fazenda.__wrapped__(*periodo, MENSAL),
+        "fig_evolucao_fazenda_diaria": lambda: graficos.montar_fig_evolucao_fazenda.__wrapped__(*periodo, DIARIA),
+        "fig_comparacao_fazenda": lambda: graficos.montar_fig_comparacao_fazenda.__wrapped__(
+            categorias, resultado1, resultado2),
+        "fig_pizza_fazenda": lambda: graficos.montar_fig_pizza_fazenda.__wrapped__(
+            ("Principal", "Correção IPCA-e", "Juros SELIC", "Honorários"),
+            (CASO_FAZENDA["valor"], f["valor_corrigido_ipcae"] - CASO_FAZENDA["valor"],
+             f["juros_selic_sobre_principal"], f["honorarios_resultado1"]),
+            f["total_resultado1"]),
+        "fig_preview_fazenda": graficos.montar_fig_preview_fazenda.__wrapped__,
+    }
+    construtores["fig_evolucao_fazenda_mensal"]()  # importa o Plotly fora da medição
+    resultados = {}
+    for nome, construtor in construtores.items():
+        tamanho = graficos.tamanho_serializado(construtor())
+        resultados[nome] = {**medir(construtor), "bytes_serializados": tamanho,
+                            "acima_do_limite": tamanho > graficos.LIMITE_BYTES_FIGURA}
+    return resultados
+
+
+def benchmark_paginas(repeticoes=REPETICOES):
+    """Execução completa de cada página pelo ``AppTest``: primeira execução, rerun e envio do formulário."""
+    from streamlit.testing.v1 import AppTest
+
+    resultados = {}
+    for nome, (arquivo, botao) in PAGINAS.items():
+        caminho = str(DIRETORIO_PROJETO / arquivo)
+        inicio = time.perf_counter()
+        app = AppTest.from_file(caminho, default_timeout=120).run()
+        resultados[f"{nome}_primeira_execucao"] = {"mediana": time.perf_counter() - inicio, "rodadas": 1}
+        resultados[f"{nome}_rerun"] = medir_uma_vez(app.run, repeticoes)
+        if botao:
+            def enviar():
+                next(b for b in app.button if botao in str(b.label)).click().run()
+
+            resultados[f"{nome}_envio"] = medir_uma_vez(enviar, repeticoes)
+        if app.exception:
+            raise RuntimeError(f"{arquivo}: {app.exception[0].value}")
+    return resultados
+
+
+def ambiente():
+    versoes = {}
+    for pacote in PACOTES:
+        try:
+            versoes[pacote] = version(pacote)
+        except PackageNotFoundError:
+            versoes[pacote] = None
+    return {"data": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "plataforma": platform.platform(), "processador": platform.processor(), "versoes": versoes}
+
+
+def comparar(atual, anterior):
+    """Linhas ``(nome, mediana anterior, mediana atual, variação %)`` para os itens presentes nos dois JSON."""
+    linhas = []
+    for nome, medida in atual["resultados"].items():
+        if nome in anterior["resultados"]:
+            antes, agora = anterior["resultados"][nome]["mediana"], medida["mediana"]
+            linhas.append((nome, antes, agora, (agora / antes - 1) * 100))
+    return linhas
+
+
+def _formatar_tempo(segundos):
+    if segundos < 1e-3:
+        return f"{segundos * 1e6:.1f} µs"
+    if segundos < 1:
+        return f"{segundos * 1e3:.1f} ms"
+    return f"{segundos:.2f} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das calculadoras, lotes, figuras e páginas.")
+    parser.add_argument("--saida", default="benchmark.json", help="arquivo JSON de resultados")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_LOTE, help="tamanhos dos lotes")
+    parser.add_argument("--sem-paginas", action="store_true", help="não mede as páginas pelo AppTest")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    etapas = [("cálculos", benchmark_calculos), ("lotes", lambda: benchmark_lotes(args.tamanhos)),
+              ("figuras", benchmark_figuras)]
+    if not args.sem_paginas:
+        etapas.append(("páginas", benchmark_paginas))
+
+    resultados = {}
+    for nome, etapa in etapas:
+        print(f"Medindo {nome}...", file=sys.stderr)
+        resultados.update(etapa())
+
+    relatorio = {"ambiente": ambiente(), "resultados": resultados}
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    largura = max(len(nome) for nome in resultados)
+    for nome, medida in resultados.items():
+        extra = f"  ({medida['processos_por_segundo']:,.0f} processos/s)" if "processos_por_segundo" in medida else ""
+        if "bytes_serializados" in medida:
+            aviso = " — acima do limite" if medida["acima_do_limite"] else ""
+            extra = f"  ({medida['bytes_serializados'] / 1024:,.1f} KB{aviso})"
+        print(f"{nome:<{largura}}  {_formatar_tempo(medida['mediana']):>10}{extra}")
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+        print(f"\nComparação com {args.comparar}:")
+        for nome, antes, agora, variacao in comparar(relatorio, anterior):
+            print(f"{nome:<{largura}}  {_formatar_tempo(antes):>10} -> {_formatar_tempo(agora):>10}  {variacao:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Memoização de resultados e figuras, compartilhada entre reruns e sessões do Streamlit.
+
+Os caches ficam registrados por nome neste módulo (importado uma única vez por
+processo), e não na página: o script da página é reexecutado a cada interação,
+mas o cache continua o mesmo.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import wraps
+
+import numpy as np
+
+TAMANHO_MAXIMO_PADRAO = 256
+
+
+class CacheLRU:
+    """Cache com limite de itens (descarta o menos usado) e validade opcional (``ttl`` em segundos)."""
+
+    def __init__(self, tamanho_maximo=TAMANHO_MAXIMO_PADRAO, ttl=None):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave):
+        """Devolve ``(True, valor)`` se a chave estiver no cache e dentro da validade, senão ``(False, None)``."""
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None:
+                valor, expira_em = item
+                if expira_em is None or time.monotonic() < expira_em:
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return True, valor
+                del self._itens[chave]
+            self.falhas += 1
+            return False, None
+
+    def guardar(self, chave, valor):
+        expira_em = time.monotonic() + self.ttl if self.ttl else None
+        with self._trava:
+            self._itens[chave] = (valor, expira_em)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self.acertos = self.falhas = 0
+
+
+_caches = {}
+_trava_registro = threading.Lock()
+
+
+def obter_cache(nome, tamanho_maximo=TAMANHO_MAXIMO_PADRAO, ttl=None):
+    """Cache registrado com ``nome`` (criado na primeira chamada)."""
+    with _trava_registro:
+        if nome not in _caches:
+            _caches[nome] = CacheLRU(tamanho_maximo, ttl)
+        return _caches[nome]
+
+
+def caches():
+    """Todos os caches registrados, por nome."""
+    return dict(_caches)
+
+
+def normalizar(valor):
+    """Converte uma entrada em uma chave estável e hasheável (datas em ISO, escalares NumPy em Python)."""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, np.generic):
+        return normalizar(valor.item())
+    if isinstance(valor, float):
+        # 50000 e 50000.0 vindos de widgets diferentes devem gerar a mesma chave
+        return int(valor) if valor.is_integer() else valor
+    if isinstance(valor, (list, tuple)):
+        return tuple(normalizar(v) for v in valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((k, normalizar(v)) for k, v in valor.items()))
+    return valor
+
+
+def memoizar(nome, tamanho_maximo=TAMANHO_MAXIMO_PADRAO, ttl=None):
+    """Decorador que memoiza a função no cache ``nome``, com chave nas entradas normalizadas."""
+    cache = obter_cache(nome, tamanho_maximo, ttl)
+
+    def decorador(funcao):
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            chave = (normalizar(args), normalizar(kwargs))
+            achou, valor = cache.obter(chave)
+            if not achou:
+                valor = funcao(*args, **kwargs)
+                cache.guardar(chave, valor)
+            return valor
+
+        envolvida.cache = cache
+        return envolvida
+
+    return decorador
@@ -0,0 +1,129 @@
+"""Motor de cálculo de débitos judiciais da Fazenda Pública.
+
+IPCA-e e juros de mora até 30/11/2021 e, a partir de 01/12/2021, Selic sobre o
+principal corrigido (Resultado 1) e sobre o débito consolidado (Resultado 2).
+As funções aceitam escalares ou arrays NumPy (com broadcasting).
+"""
+from datetime import date
+
+import numpy as np
+
+from utils.datas import meses_inteiros, para_datetime64
+from utils.indices import carregar_selic, carregar_serie
+
+# Data de corte para a mudança de índice (EC 113/2021)
+DATA_CORTE_IPCA_SELIC = date(2021, 11, 30)
+
+# Taxa de juros para Fazenda Pública (geralmente 0.5% ao mês antes da Selic)
+TAXA_JUROS_MENSAL = 0.005
+
+
+def fatores_correcao_fazenda(data_inicial_cor_mon, data_final_cor_mon):
+    """Fator do IPCA-e até o corte, com a máscara ``aplica_ipcae`` dos débitos anteriores ao corte."""
+    data_inicial_cor_mon = para_datetime64(data_inicial_cor_mon)
+    data_corte = para_datetime64(DATA_CORTE_IPCA_SELIC)
+    fim_ipcae = np.maximum(np.minimum(para_datetime64(data_final_cor_mon), data_corte), data_inicial_cor_mon)
+    return {
+        "aplica_ipcae": data_inicial_cor_mon <= data_corte,
+        "fator_ipcae": carregar_serie("IPCA-E").fator(data_inicial_cor_mon, fim_ipcae),
+    }
+
+
+def fatores_juros_fazenda(data_inicial_juros, data_final_juros):
+    """Juros de 0,5% ao mês vezes os meses até o corte, com a máscara ``aplica_juros``."""
+    data_inicial_juros = para_datetime64(data_inicial_juros)
+    data_corte = para_datetime64(DATA_CORTE_IPCA_SELIC)
+    meses_juros = np.maximum(
+        meses_inteiros(data_inicial_juros, np.minimum(para_datetime64(data_final_juros), data_corte)), 0)
+    return {
+        "aplica_juros": data_inicial_juros <= data_corte,
+        "fator_juros": TAXA_JUROS_MENSAL * meses_juros,
+    }
+
+
+def fatores_selic_fazenda(data_inicial_cor_mon, data_final_cor_mon):
+    """Selic acumulada a partir de 01/12/2021 (já descontada de 1), com a máscara ``aplica_selic``."""
+    data_final_cor_mon = para_datetime64(data_final_cor_mon)
+    data_corte = para_datetime64(DATA_CORTE_IPCA_SELIC)
+    inicio_selic = np.maximum(para_datetime64(data_inicial_cor_mon), data_corte + 1)
+    return {
+        "aplica_selic": data_final_cor_mon > data_corte,
+        "fator_selic": carregar_selic().fator(inicio_selic, data_final_cor_mon) - 1,
+    }
+
+
+def fatores_fazenda(data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros, data_final_juros):
+    """Fatores de cada débito (independem do valor): IPCA-e até o corte, juros até o corte e Selic após o corte.
+
+    Retorna um dicionário com ``fator_ipcae``, ``fator_juros`` (0,5% ao mês vezes os meses) e
+    ``fator_selic`` (já descontado de 1), cada um com a máscara ``aplica_*`` do período correspondente.
+    """
+    return {
+        **fatores_correcao_fazenda(data_inicial_cor_mon, data_final_cor_mon),
+        **fatores_juros_fazenda(data_inicial_juros, data_final_juros),
+        **fatores_selic_fazenda(data_inicial_cor_mon, data_final_cor_mon),
+    }
+
+
+def valores_fazenda(valor, aplica_ipcae, fator_ipcae, aplica_juros, fator_juros, aplica_selic, fator_selic):
+    """Correção IPCA-e, juros até o corte e Selic sobre o principal (Resultado 1) e o consolidado (Resultado 2)."""
+    valor = np.asarray(valor, dtype=np.float64)
+    valor_corrigido_ipcae = np.where(aplica_ipcae, valor * fator_ipcae, valor)
+    valor_juros_ate_corte = np.where(aplica_juros, valor * fator_juros, 0.0)
+
+    # Resultado 1: Selic sobre o principal corrigido (ou sobre o valor original, se posterior ao corte)
+    base_para_selic_principal = valor_corrigido_ipcae
+    juros_selic_sobre_principal = np.where(aplica_selic, base_para_selic_principal * fator_selic, 0.0)
+    valor_principal_corrigido_selic = np.where(aplica_selic, base_para_selic_principal + juros_selic_sobre_principal,
+                                               0.0)
+
+    # Resultado 2: Selic sobre o débito consolidado (principal corrigido + juros até o corte)
+    base_para_selic_consolidado = valor_corrigido_ipcae + valor_juros_ate_corte
+    juros_selic_sobre_consolidado = np.where(aplica_selic, base_para_selic_consolidado * fator_selic, 0.0)
+    valor_consolidado_selic = np.where(aplica_selic, base_para_selic_consolidado + juros_selic_sobre_consolidado, 0.0)
+
+    return {
+        "valor_corrigido_ipcae": valor_corrigido_ipcae,
+        "valor_juros_ate_corte": valor_juros_ate_corte,
+        "juros_selic_sobre_principal": juros_selic_sobre_principal,
+        "valor_principal_corrigido_selic": valor_principal_corrigido_selic,
+        "juros_selic_sobre_consolidado": juros_selic_sobre_consolidado,
+        "valor_consolidado_selic": valor_consolidado_selic,
+    }
+
+
+def honorarios_fazenda(valor_principal_corrigido_selic, valor_consolidado_selic, honorarios_percentual=0.0):
+    """Honorários sobre o valor corrigido somado aos juros, um para cada resultado, e os totais."""
+    honorarios_percentual = np.asarray(honorarios_percentual, dtype=np.float64)
+    honorarios_resultado1 = valor_principal_corrigido_selic * (honorarios_percentual / 100)
+    honorarios_resultado2 = valor_consolidado_selic * (honorarios_percentual / 100)
+    return {
+        "honorarios_resultado1": honorarios_resultado1,
+        "honorarios_resultado2": honorarios_resultado2,
+        "total_resultado1": valor_principal_corrigido_selic + honorarios_resultado1,
+        "total_resultado2": valor_consolidado_selic + honorarios_resultado2,
+    }
+
+
+def calcular_debitos_fazenda(valor, data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros, data_final_juros,
+                             honorarios_percentual=0.0):
+    """Calcula os dois resultados da Fazenda Pública para um ou vários débitos de uma vez.
+
+    Retorna um dicionário de arrays com a correção IPCA-e, os juros até o corte,
+    a Selic sobre o principal e sobre o consolidado, os honorários e os totais.
+    """
+    f = fatores_fazenda(data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros, data_final_juros)
+    valores = valores_fazenda(valor, **f)
+    return {
+        **valores,
+        **honorarios_fazenda(valores["valor_principal_corrigido_selic"], valores["valor_consolidado_selic"],
+                             honorarios_percentual),
+    }
+
+
+def calcular_debito_fazenda(valor, data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros, data_final_juros,
+                            honorarios_percentual=0.0):
+    """Versão escalar de :func:`calcular_debitos_fazenda`, usada pela página para um único débito."""
+    resultado = calcular_debitos_fazenda(valor, data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros,
+                                         data_final_juros, honorarios_percentual)
+    return {chave: np.asarray(v).item() for chave, v in resultado.items()}
@@ -0,0 +1,243 @@
+"""Motor de cálculo de débitos judiciais cíveis (TJ-RJ).
+
+Todas as funções aceitam escalares ou arrays NumPy (com broadcasting), de modo
+que o mesmo código atende a um único processo na página e a uma carteira
+inteira em lote.
+"""
+from datetime import date
+
+import numpy as np
+
+from utils.datas import meses_inteiros, para_datetime64
+from utils.indices import carregar_serie, carregar_taxa_legal
+
+SEM_JUROS = "Sem juros (somente correção monetária)"
+JUROS_6 = "Juros Simples 6% a.a."
+JUROS_12 = "Juros Simples 12% a.a."
+JUROS_CODIGO_CIVIL = "Juros do Código Civil (6% ou 12% a.a.)"
+TAXA_LEGAL = "Taxa legal (Lei 14.905/24)"
+
+TIPOS_JUROS = (SEM_JUROS, JUROS_6, JUROS_12, JUROS_CODIGO_CIVIL, TAXA_LEGAL)
+
+CONTRATUAL = "Contratual (12% a.a.)"
+EXTRACONTRATUAL = "Extracontratual (6% a.a.)"
+
+TIPOS_OBRIGACAO = (CONTRATUAL, EXTRACONTRATUAL)
+
+SEM_CORRECAO = "Sem correção monetária"
+
+# Índice exibido na página -> série em utils.indices
+SERIES_CORRECAO = {
+    "INPC": "INPC",
+    "Tabela TJ-RJ (fator de correção)": "TJ-RJ",
+}
+
+INDICES_CORRECAO = (SEM_CORRECAO,) + tuple(SERIES_CORRECAO)
+
+# Valores aceitos em cada opção do cálculo e o nome usado nas mensagens de erro
+OPCOES = {
+    "tipo_juros": ("Tipo de juros", TIPOS_JUROS),
+    "tipo_obrigacao": ("Tipo de obrigação", TIPOS_OBRIGACAO),
+    "indice_correcao": ("Índice de correção", INDICES_CORRECAO),
+}
+
+# Lei 14.905/24: a taxa legal vale a partir da vigência; antes dela, juros de 1% ao mês (art. 406 do CC
+# na redação anterior c/c art. 161, §1º, do CTN)
+DATA_VIGENCIA_TAXA_LEGAL = date(2024, 8, 30)
+TAXA_MENSAL_ANTES_TAXA_LEGAL = 0.01
+
+# Art. 523 §1º CPC: 10% de multa + 10% de honorários
+PERCENTUAL_MULTA_523 = 0.10
+PERCENTUAL_HONORARIOS_523 = 0.10
+
+
+def _fora_de(valores, permitidos):
+    valores = np.asarray(valores)
+    return ~np.logical_or.reduce([valores == permitido for permitido in permitidos])
+
+
+def opcoes_invalidas(tipo_juros=SEM_JUROS, tipo_obrigacao=None, indice_correcao=SEM_CORRECAO):
+    """Máscara dos processos com valor desconhecido em cada opção (``{opção: máscara}``).
+
+    O tipo de obrigação só é exigido nos juros do Código Civil; nos demais pode ficar em branco.
+    """
+    tipo_juros = np.asarray(tipo_juros)
+    obrigacao_em_branco = ~_fora_de(tipo_obrigacao, ("", None))
+    return {
+        "tipo_juros": _fora_de(tipo_juros, TIPOS_JUROS),
+        "tipo_obrigacao": _fora_de(tipo_obrigacao, TIPOS_OBRIGACAO)
+        & ~(obrigacao_em_branco & (tipo_juros != JUROS_CODIGO_CIVIL)),
+        "indice_correcao": _fora_de(indice_correcao, INDICES_CORRECAO),
+    }
+
+
+def validar_opcoes(tipo_juros=SEM_JUROS, tipo_obrigacao=None, indice_correcao=SEM_CORRECAO):
+    """Levanta ``ValueError`` se algum processo tiver tipo de juros, tipo de obrigação ou índice desconhecido.
+
+    Um valor fora das constantes deste módulo (erro de digitação, maiúsculas) não é tratado como
+    ausência de juros ou de correção.
+    """
+    valores = {"tipo_juros": tipo_juros, "tipo_obrigacao": tipo_obrigacao, "indice_correcao": indice_correcao}
+    for opcao, invalidas in opcoes_invalidas(**valores).items():
+        if np.any(invalidas):
+            valor = np.broadcast_to(np.asarray(valores[opcao]), np.shape(invalidas))[invalidas][0]
+            nome, permitidos = OPCOES[opcao]
+            raise ValueError(f"{nome} inválido ou em branco: {valor!r}. Use um de: {'; '.join(permitidos)}.")
+
+
+def taxa_mensal_juros(tipo_juros, tipo_obrigacao=None):
+    """Taxa mensal de juros simples para cada tipo de juros.
+
+    A Taxa Legal (Lei 14.905/24) varia mês a mês e retorna ``NaN`` (ver :func:`fator_juros`).
+    Levanta ``ValueError`` para tipos de juros ou de obrigação desconhecidos.
+    """
+    validar_opcoes(tipo_juros, tipo_obrigacao)
+    tipo_juros, tipo_obrigacao = np.broadcast_arrays(np.asarray(tipo_juros), np.asarray(tipo_obrigacao))
+    return np.select(
+        [
+            tipo_juros == JUROS_6,
+            tipo_juros == JUROS_12,
+            tipo_juros == JUROS_CODIGO_CIVIL,
+            tipo_juros == TAXA_LEGAL,
+            tipo_juros == SEM_JUROS,
+        ],
+        [
+            0.06 / 12,
+            0.12 / 12,
+            np.where(tipo_obrigacao == CONTRATUAL, 0.12 / 12, 0.06 / 12),
+            np.nan,
+            0.0,
+        ],
+    )
+
+
+def fator_correcao_monetaria(indice_correcao, data_inicial, data_final):
+    """Fator de correção monetária de ``data_inicial`` a ``data_final`` pelo índice escolhido.
+
+    Cada série é consultada uma única vez para todas as linhas que a utilizam. Levanta ``ValueError``
+    para índices desconhecidos.
+    """
+    validar_opcoes(indice_correcao=indice_correcao)
+    indice_correcao, data_inicial, data_final = np.broadcast_arrays(
+        np.asarray(indice_correcao), para_datetime64(data_inicial), para_datetime64(data_final)
+    )
+    fator = np.ones(indice_correcao.shape)
+    for nome, serie in SERIES_CORRECAO.items():
+        linhas = indice_correcao == nome
+        if np.any(linhas):
+            fator[linhas] = carregar_serie(serie).fator(data_inicial[linhas], data_final[linhas])
+    return fator
+
+
+def juros_taxa_legal(data_juros, data_final):
+    """Juros simples acumulados (em fração) pela Taxa Legal entre ``data_juros`` e ``data_final``.
+
+    Como nas demais taxas, contam os meses inteiros desde ``data_juros`` (``meses_inteiros``), sem pro
+    rata do mês incompleto. Cada mês inteiro rende conforme a data em que termina: 1% se terminar até o
+    fim do mês da vigência da Lei 14.905/24 (a série da taxa legal começa no mês seguinte, 09/2024) e,
+    depois, a taxa legal do mês civil em que termina, lida da série acumulada (uma subtração por processo).
+    """
+    data_juros = para_datetime64(data_juros)
+    meses = meses_de_juros(data_juros, data_final)
+    fim_mes_vigencia = (np.datetime64(DATA_VIGENCIA_TAXA_LEGAL, "M") + 1).astype("datetime64[D]") - 1
+    meses_antes = np.clip(meses_inteiros(data_juros, fim_mes_vigencia), 0, meses)
+    serie = carregar_taxa_legal()
+    juros_depois = serie.soma_meses(data_juros, meses) - serie.soma_meses(data_juros, meses_antes)
+    return TAXA_MENSAL_ANTES_TAXA_LEGAL * meses_antes + np.maximum(juros_depois, 0.0)
+
+
+def fator_juros(tipo_juros, tipo_obrigacao, data_juros, data_final, meses):
+    """Juros simples acumulados (em fração) de cada processo: taxa mensal × meses ou a Taxa Legal."""
+    tipo_juros = np.asarray(tipo_juros)
+    juros = taxa_mensal_juros(tipo_juros, tipo_obrigacao) * meses
+    taxa_legal = np.broadcast_to(tipo_juros == TAXA_LEGAL, np.shape(juros))
+    if np.any(taxa_legal):
+        juros = np.where(taxa_legal, juros_taxa_legal(data_juros, data_final), juros)
+    return juros
+
+
+def meses_de_juros(data_juros, data_final):
+    """Meses inteiros de juros de cada processo (zero se ``data_final`` for anterior a ``data_juros``)."""
+    return np.maximum(0, meses_inteiros(data_juros, data_final))
+
+
+def juros_tjrj(tipo_juros, tipo_obrigacao, data_juros, data_final, meses):
+    """Taxa mensal e juros acumulados (em fração) de cada processo.
+
+    Na Taxa Legal, a taxa mensal retornada é a média do período (juros acumulados ÷ meses).
+    """
+    juros = fator_juros(tipo_juros, tipo_obrigacao, data_juros, data_final, meses)
+    taxa_mensal = taxa_mensal_juros(tipo_juros, tipo_obrigacao)
+    taxa_mensal = np.where(np.isnan(taxa_mensal), juros / np.maximum(meses, 1), taxa_mensal)
+    return taxa_mensal, juros
+
+
+def fatores_tjrj(data_juros, data_final, tipo_juros, tipo_obrigacao=None, indice_correcao=SEM_CORRECAO,
+                 data_inicial=None):
+    """Meses de juros, taxa mensal, juros acumulados e fator de correção de cada processo (independem do valor)."""
+    if data_inicial is None:
+        data_inicial = data_juros
+    meses = meses_de_juros(data_juros, data_final)
+    taxa_mensal, juros = juros_tjrj(tipo_juros, tipo_obrigacao, data_juros, data_final, meses)
+    fator_correcao = fator_correcao_monetaria(indice_correcao, data_inicial, data_final)
+    return meses, taxa_mensal, juros, fator_correcao
+
+
+def valores_tjrj(valor, fator_correcao, fator_juros):
+    """Correção monetária e juros simples sobre o valor atualizado."""
+    valor = np.asarray(valor, dtype=np.float64)
+    valor_atualizado = valor * fator_correcao
+    valor_juros = valor_atualizado * fator_juros
+    return {
+        "correcao_monetaria": valor_atualizado - valor,
+        "valor_atualizado": valor_atualizado,
+        "valor_juros": valor_juros,
+        "valor_corrigido": valor_atualizado + valor_juros,
+    }
+
+
+def encargos_tjrj(valor_corrigido, honorarios=0.0, aplicar_523=False):
+    """Honorários, multa e honorários do art. 523 §1º sobre o valor corrigido, e o total."""
+    honorarios = np.asarray(honorarios, dtype=np.float64)
+    aplicar_523 = np.asarray(aplicar_523, dtype=bool)
+    valor_honorarios = valor_corrigido * (honorarios / 100)
+    multa_523 = np.where(aplicar_523, valor_corrigido * PERCENTUAL_MULTA_523, 0.0)
+    honorarios_523 = np.where(aplicar_523, valor_corrigido * PERCENTUAL_HONORARIOS_523, 0.0)
+    return {
+        "valor_honorarios": valor_honorarios,
+        "multa_523": multa_523,
+        "honorarios_523": honorarios_523,
+        "total": valor_corrigido + valor_honorarios + multa_523 + honorarios_523,
+    }
+
+
+def calcular_debitos_tjrj(valor, data_juros, data_final, tipo_juros, tipo_obrigacao=None, honorarios=0.0,
+                          aplicar_523=False, indice_correcao=SEM_CORRECAO, data_inicial=None):
+    """Calcula todos os componentes do débito para um ou vários processos de uma vez.
+
+    A correção monetária incide de ``data_inicial`` (ou ``data_juros``, se omitida) até
+    ``data_final`` e os juros simples incidem sobre o valor atualizado.
+
+    Retorna um dicionário de arrays com ``meses``, ``taxa_mensal``, ``fator_juros``, ``fator_correcao``,
+    ``correcao_monetaria``, ``valor_atualizado``, ``valor_juros``, ``valor_corrigido``,
+    ``valor_honorarios``, ``multa_523``, ``honorarios_523`` e ``total``.
+    """
+    meses, taxa_mensal, juros, fator_correcao = fatores_tjrj(data_juros, data_final, tipo_juros, tipo_obrigacao,
+                                                             indice_correcao, data_inicial)
+    valores = valores_tjrj(valor, fator_correcao, juros)
+    return {
+        "meses": meses,
+        "taxa_mensal": taxa_mensal,
+        "fator_juros": juros,
+        "fator_correcao": fator_correcao,
+        **valores,
+        **encargos_tjrj(valores["valor_corrigido"], honorarios, aplicar_523),
+    }
+
+
+def calcular_debito_tjrj(valor, data_juros, data_final, tipo_juros, tipo_obrigacao=None, honorarios=0.0,
+                         aplicar_523=False, indice_correcao=SEM_CORRECAO, data_inicial=None):
+    """Versão escalar de :func:`calcular_debitos_tjrj`, usada pela página para um único processo."""
+    resultado = calcular_debitos_tjrj(valor, data_juros, data_final, tipo_juros, tipo_obrigacao, honorarios,
+                                      aplicar_523, indice_correcao, data_inicial)
+    return {chave: np.asarray(v).item() for chave, v in resultado.items()}
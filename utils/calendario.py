@@ -0,0 +1,71 @@
+"""Calendário de dias úteis bancários (feriados nacionais) para a contagem da Selic."""
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+from utils.datas import para_datetime64
+
+# (mês, dia, primeiro ano de vigência)
+FERIADOS_FIXOS = (
+    (1, 1, None),     # Confraternização Universal
+    (4, 21, None),    # Tiradentes
+    (5, 1, None),     # Dia do Trabalho
+    (9, 7, None),     # Independência
+    (10, 12, None),   # Nossa Senhora Aparecida
+    (11, 2, None),    # Finados
+    (11, 15, None),   # Proclamação da República
+    (11, 20, 2024),   # Consciência Negra (Lei 14.759/2023)
+    (12, 25, None),   # Natal
+)
+
+# Feriados móveis em dias a partir do domingo de Páscoa
+FERIADOS_MOVEIS = (
+    -48,  # Segunda-feira de Carnaval
+    -47,  # Terça-feira de Carnaval
+    -2,   # Sexta-feira Santa
+    60,   # Corpus Christi
+)
+
+ANO_INICIAL = 1994
+ANO_FINAL = 2078
+
+
+def pascoa(ano):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    el = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * el) // 451
+    mes, dia = divmod(h + el - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+def feriados_nacionais(ano_inicial=ANO_INICIAL, ano_final=ANO_FINAL):
+    """Feriados nacionais entre os dois anos (inclusive), como array datetime64[D] ordenado."""
+    feriados = []
+    for ano in range(ano_inicial, ano_final + 1):
+        feriados += [date(ano, mes, dia) for mes, dia, desde in FERIADOS_FIXOS if desde is None or ano >= desde]
+        domingo_pascoa = pascoa(ano)
+        feriados += [domingo_pascoa + timedelta(days=dias) for dias in FERIADOS_MOVEIS]
+    return np.unique(para_datetime64(feriados))
+
+
+@lru_cache(maxsize=None)
+def calendario_bancario():
+    """Calendário NumPy de dias úteis (segunda a sexta, exceto feriados nacionais)."""
+    return np.busdaycalendar(holidays=feriados_nacionais())
+
+
+def eh_dia_util(datas):
+    return np.is_busday(para_datetime64(datas), busdaycal=calendario_bancario())
+
+
+def dias_uteis(inicio, fim):
+    """Quantidade de dias úteis no intervalo [inicio, fim), para escalares ou arrays."""
+    return np.busday_count(para_datetime64(inicio), para_datetime64(fim), busdaycal=calendario_bancario())
@@ -0,0 +1,196 @@
+"""Aritmética monetária exata em centavos (int64), vetorizada, para o processamento em lote.
+
+Os valores são convertidos para centavos inteiros e cada etapa do cálculo
+(correção, juros, multa, honorários) é arredondada ao centavo pela sua regra,
+como no cálculo feito à mão ou com ``Decimal.quantize``, sem laços por linha.
+
+Os fatores (índices, taxas vezes meses, percentuais) são fixados em
+``CASAS_FATOR`` casas decimais, como nas tabelas publicadas, e o produto
+``centavos × fator`` é feito em inteiros, sem erro de ponto flutuante.
+"""
+import numpy as np
+
+from utils.calculo_fazenda import fatores_fazenda
+from utils.calculo_tjrj import PERCENTUAL_HONORARIOS_523, PERCENTUAL_MULTA_523, SEM_CORRECAO, fatores_tjrj
+
+MEIO_PARA_CIMA = "meio_para_cima"  # 0,5 centavo arredonda para cima (ROUND_HALF_UP)
+MEIO_PAR = "meio_par"  # 0,5 centavo arredonda para o par (ROUND_HALF_EVEN, ABNT NBR 5891)
+TRUNCAR = "truncar"  # descarta as frações de centavo (ROUND_DOWN)
+
+REGRAS_PADRAO = {
+    "correcao": MEIO_PARA_CIMA,
+    "juros": MEIO_PARA_CIMA,
+    "multa": MEIO_PARA_CIMA,
+    "honorarios": MEIO_PARA_CIMA,
+}
+
+CASAS_FATOR = 8
+_ESCALA_FATOR = 10 ** CASAS_FATOR
+_ESCALA_PARCIAL = 10 ** (CASAS_FATOR // 2)
+_MAXIMO_INT64 = np.iinfo(np.int64).max
+
+
+def para_centavos(valor):
+    """Converte valores em reais (float ou texto numérico) para centavos int64, arredondando meio para cima."""
+    valor = np.asarray(valor, dtype=np.float64)
+    if np.isnan(valor).any():
+        raise ValueError("Valor ausente: não é possível convertê-lo para centavos.")
+    # A folga absorve o erro de representação (0.285 * 100 = 28.499999999999996), que cresce com o valor:
+    # em R$ 83.033.292,335 ela precisa ser maior que as 6 casas que bastam para valores pequenos
+    centavos = np.abs(valor) * 100
+    folga = np.maximum(5e-7, 8 * np.spacing(centavos))
+    inteiros = np.floor(centavos)
+    return (np.sign(valor) * (inteiros + (centavos - inteiros + folga >= 0.5))).astype(np.int64)
+
+
+def de_centavos(centavos):
+    """Centavos int64 para reais (float), apenas para exibição e gráficos."""
+    return np.asarray(centavos, dtype=np.int64) / 100
+
+
+def formatar_reais(centavos):
+    """Texto no padrão brasileiro (``R$ 1.234,56``) a partir de centavos inteiros."""
+    centavos = int(centavos)
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}R$ {reais:,}".replace(",", ".") + f",{resto:02d}"
+
+
+def _arredondar(quociente, resto, denominador, regra):
+    """Aplica a ``regra`` a ``quociente + resto / denominador`` (todos não negativos)."""
+    if regra == MEIO_PARA_CIMA:
+        return quociente + (2 * resto >= denominador)
+    if regra == MEIO_PAR:
+        return quociente + ((2 * resto > denominador) | ((2 * resto == denominador) & (quociente % 2 == 1)))
+    if regra == TRUNCAR:
+        return quociente
+    raise ValueError(f"Regra de arredondamento desconhecida: {regra}")
+
+
+def dividir(numerador, denominador, regra=MEIO_PARA_CIMA):
+    """Divisão inteira de ``numerador`` (int64) por ``denominador`` (> 0), arredondada pela ``regra``.
+
+    O arredondamento é simétrico: ``-2,5`` vira ``-3`` em ``MEIO_PARA_CIMA``, como no ``Decimal``.
+    """
+    numerador = np.asarray(numerador, dtype=np.int64)
+    quociente, resto = np.divmod(np.abs(numerador), denominador)
+    quociente = _arredondar(quociente, resto, denominador, regra)
+    return np.where(numerador < 0, -quociente, quociente)
+
+
+def fator_fixo(fator):
+    """Fator em inteiros com ``CASAS_FATOR`` casas decimais (ex.: 1,23456789 -> 123456789)."""
+    fator = np.asarray(fator, dtype=np.float64)
+    if np.isnan(fator).any():
+        raise ValueError("Fator indefinido (ex.: data ausente ou taxa sem série disponível).")
+    return np.round(fator * _ESCALA_FATOR).astype(np.int64)
+
+
+def multiplicar(centavos, fator, regra=MEIO_PARA_CIMA):
+    """``centavos × fator`` arredondado ao centavo pela ``regra``, calculado só com inteiros int64.
+
+    O fator é dividido em duas partes para que nenhum produto intermediário estoure o int64:
+    ``c × f = c × (f_alto × 10⁴ + f_baixo)``.
+    """
+    centavos = np.asarray(centavos, dtype=np.int64)
+    fator = fator_fixo(fator)
+    sinal = np.sign(centavos) * np.sign(fator)
+    centavos, fator = np.abs(centavos), np.abs(fator)
+
+    alto, baixo = np.divmod(fator, _ESCALA_PARCIAL)
+    # c × f_alto e sobra × 10⁴ + c × f_baixo (sobra < 10⁴) precisam caber no int64
+    limite = np.minimum(_MAXIMO_INT64 // np.maximum(alto, 1), (_MAXIMO_INT64 - _ESCALA_FATOR) // np.maximum(baixo, 1))
+    if np.any(centavos > limite):
+        raise ValueError("Valor ou fator grande demais para a aritmética em centavos (int64).")
+    produto_alto = centavos * alto
+    inteiros, sobra = np.divmod(produto_alto, _ESCALA_PARCIAL)
+    # c × f / 10⁸ = inteiros + (sobra × 10⁴ + c × f_baixo) / 10⁸, com "inteiros" exato
+    quociente, resto = np.divmod(sobra * _ESCALA_PARCIAL + centavos * baixo, _ESCALA_FATOR)
+    return sinal * _arredondar(inteiros + quociente, resto, _ESCALA_FATOR, regra)
+
+
+def _regras(regras):
+    return {**REGRAS_PADRAO, **(regras or {})}
+
+
+def calcular_debitos_tjrj_centavos(valor, data_juros, data_final, tipo_juros, tipo_obrigacao=None, honorarios=0.0,
+                                   aplicar_523=False, indice_correcao=SEM_CORRECAO, data_inicial=None, regras=None):
+    """Mesmo cálculo de ``calcular_debitos_tjrj``, com os valores em centavos int64 e arredondamento por etapa.
+
+    ``valor`` é informado em reais; os componentes monetários retornam em centavos.
+    ``regras`` substitui as regras de ``REGRAS_PADRAO`` (ex.: ``{"juros": TRUNCAR}``).
+    """
+    regras = _regras(regras)
+    meses, taxa_mensal, juros, fator_correcao = fatores_tjrj(data_juros, data_final, tipo_juros, tipo_obrigacao,
+                                                             indice_correcao, data_inicial)
+    valor = para_centavos(valor)
+    aplicar_523 = np.asarray(aplicar_523, dtype=bool)
+    honorarios = np.asarray(honorarios, dtype=np.float64)
+
+    valor_atualizado = multiplicar(valor, fator_correcao, regras["correcao"])
+    valor_juros = multiplicar(valor_atualizado, juros, regras["juros"])
+    valor_corrigido = valor_atualizado + valor_juros
+    valor_honorarios = multiplicar(valor_corrigido, honorarios / 100, regras["honorarios"])
+    multa_523 = np.where(aplicar_523, multiplicar(valor_corrigido, PERCENTUAL_MULTA_523, regras["multa"]), 0)
+    honorarios_523 = np.where(
+        aplicar_523, multiplicar(valor_corrigido, PERCENTUAL_HONORARIOS_523, regras["honorarios"]), 0)
+
+    return {
+        "meses": meses,
+        "taxa_mensal": taxa_mensal,
+        "fator_juros": juros,
+        "fator_correcao": fator_correcao,
+        "correcao_monetaria": valor_atualizado - valor,
+        "valor_atualizado": valor_atualizado,
+        "valor_juros": valor_juros,
+        "valor_corrigido": valor_corrigido,
+        "valor_honorarios": valor_honorarios,
+        "multa_523": multa_523,
+        "honorarios_523": honorarios_523,
+        "total": valor_corrigido + valor_honorarios + multa_523 + honorarios_523,
+    }
+
+
+def calcular_debitos_fazenda_centavos(valor, data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros,
+                                      data_final_juros, honorarios_percentual=0.0, regras=None):
+    """Mesmo cálculo de ``calcular_debitos_fazenda``, com os valores em centavos int64 e arredondamento por etapa.
+
+    Os juros até o corte e a Selic seguem a regra ``"juros"``; a correção pelo IPCA-e, a regra ``"correcao"``.
+    """
+    regras = _regras(regras)
+    f = fatores_fazenda(data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros, data_final_juros)
+    valor = para_centavos(valor)
+    honorarios_percentual = np.asarray(honorarios_percentual, dtype=np.float64)
+    aplica_selic = f["aplica_selic"]
+
+    valor_corrigido_ipcae = np.where(f["aplica_ipcae"], multiplicar(valor, f["fator_ipcae"], regras["correcao"]),
+                                     valor)
+    valor_juros_ate_corte = np.where(f["aplica_juros"], multiplicar(valor, f["fator_juros"], regras["juros"]), 0)
+
+    # Resultado 1: Selic sobre o principal corrigido
+    juros_selic_sobre_principal = np.where(
+        aplica_selic, multiplicar(valor_corrigido_ipcae, f["fator_selic"], regras["juros"]), 0)
+    valor_principal_corrigido_selic = np.where(aplica_selic, valor_corrigido_ipcae + juros_selic_sobre_principal, 0)
+
+    # Resultado 2: Selic sobre o débito consolidado
+    base_consolidado = valor_corrigido_ipcae + valor_juros_ate_corte
+    juros_selic_sobre_consolidado = np.where(
+        aplica_selic, multiplicar(base_consolidado, f["fator_selic"], regras["juros"]), 0)
+    valor_consolidado_selic = np.where(aplica_selic, base_consolidado + juros_selic_sobre_consolidado, 0)
+
+    honorarios_resultado1 = multiplicar(valor_principal_corrigido_selic, honorarios_percentual / 100,
+                                        regras["honorarios"])
+    honorarios_resultado2 = multiplicar(valor_consolidado_selic, honorarios_percentual / 100, regras["honorarios"])
+
+    return {
+        "valor_corrigido_ipcae": valor_corrigido_ipcae,
+        "valor_juros_ate_corte": valor_juros_ate_corte,
+        "juros_selic_sobre_principal": juros_selic_sobre_principal,
+        "valor_principal_corrigido_selic": valor_principal_corrigido_selic,
+        "juros_selic_sobre_consolidado": juros_selic_sobre_consolidado,
+        "valor_consolidado_selic": valor_consolidado_selic,
+        "honorarios_resultado1": honorarios_resultado1,
+        "honorarios_resultado2": honorarios_resultado2,
+        "total_resultado1": valor_principal_corrigido_selic + honorarios_resultado1,
+        "total_resultado2": valor_consolidado_selic + honorarios_resultado2,
+    }
@@ -0,0 +1,106 @@
+"""Aritmética de datas vetorizada (NumPy datetime64) usada pelas calculadoras.
+
+Todas as contagens aceitam escalares ou arrays (com broadcasting) e devolvem
+arrays; milhões de pares de datas são contados em uma única chamada.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+# Convenções de contagem de prazo
+ANO_COMERCIAL = "30/360"  # meses de 30 dias e ano de 360 dias
+ANO_CIVIL = "act/365"  # dias corridos e ano de 365 dias
+CONVENCOES = (ANO_COMERCIAL, ANO_CIVIL)
+
+
+def para_datetime64(datas):
+    """Converte datas (date, datetime, str, Series ou arrays) para datetime64[D]."""
+    return np.asarray(datas, dtype="datetime64[D]")
+
+
+# Dias de cada mês em ano comum (fevereiro ganha um dia nos bissextos)
+_DIAS_NO_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+# Faixa de datas com componentes tabelados (``_tabela``); fora dela são calculados
+_TABELA_INICIO, _TABELA_FIM = np.datetime64("1900-01-01"), np.datetime64("2200-01-01")
+
+
+def _civil(dias):
+    """Mês (contado desde 01/1970), dia do mês e dias no mês a partir dos dias desde 1970.
+
+    Só aritmética inteira (algoritmo ``civil_from_days``), sem converter para ``datetime64[M]``.
+    """
+    z = dias + 719_468  # dias desde 01/03/0000
+    era = np.floor_divide(z, 146_097)
+    dia_da_era = z - era * 146_097
+    ano_da_era = (dia_da_era - dia_da_era // 1_460 + dia_da_era // 36_524 - dia_da_era // 146_096) // 365
+    dia_do_ano = dia_da_era - (365 * ano_da_era + ano_da_era // 4 - ano_da_era // 100)  # ano começando em março
+    mes_marco = (5 * dia_do_ano + 2) // 153
+    dia = dia_do_ano - (153 * mes_marco + 2) // 5 + 1
+    mes = np.where(mes_marco < 10, mes_marco + 3, mes_marco - 9)
+    ano = ano_da_era + era * 400 + (mes <= 2)
+    bissexto = (ano % 4 == 0) & ((ano % 100 != 0) | (ano % 400 == 0))
+    dias_no_mes = _DIAS_NO_MES[mes - 1] + ((mes == 2) & bissexto)
+    return (ano - 1970) * 12 + mes - 1, dia, dias_no_mes
+
+
+@lru_cache(maxsize=None)
+def _tabela():
+    inicio, fim = _TABELA_INICIO.astype(np.int64), _TABELA_FIM.astype(np.int64)
+    return tuple(componente.astype(np.int32) for componente in _civil(np.arange(inicio, fim)))
+
+
+def _componentes(datas):
+    """Mês (contado desde 01/1970), dia do mês e dias no mês de cada data.
+
+    Datas de 1900 a 2199 são lidas de uma tabela montada uma vez (uma indexação por componente).
+    """
+    dias = datas.astype(np.int64)
+    posicao = dias - _TABELA_INICIO.astype(np.int64)
+    if posicao.size and (posicao.min() < 0 or posicao.max() >= len(_tabela()[0])):
+        return _civil(dias)
+    return tuple(componente[posicao].astype(np.int64) for componente in _tabela())
+
+
+def meses_inteiros(inicio, fim):
+    """Meses completos entre duas datas, equivalente a ``years * 12 + months`` do relativedelta.
+
+    Aceita escalares ou arrays (com broadcasting) e devolve um array int64.
+    Quando ``fim`` é anterior a ``inicio`` o resultado é negativo.
+    """
+    mes_ini, dia_ini, _ = _componentes(para_datetime64(inicio))
+    mes_fim, dia_fim, dias_no_mes_fim = _componentes(para_datetime64(fim))
+    meses = mes_fim - mes_ini
+    # Mesmo critério do relativedelta: o dia inicial é limitado ao último dia do mês final
+    dia_limite = np.minimum(dia_ini, dias_no_mes_fim)
+    return meses - ((meses > 0) & (dia_fim < dia_limite)) + ((meses < 0) & (dia_fim > dia_limite))
+
+
+def dias_corridos(inicio, fim):
+    """Dias corridos de ``inicio`` a ``fim`` (negativo quando ``fim`` é anterior)."""
+    return (para_datetime64(fim) - para_datetime64(inicio)).astype(np.int64)
+
+
+def dias_360(inicio, fim):
+    """Dias de ``inicio`` a ``fim`` no ano comercial (30/360 europeu).
+
+    Todo mês tem 30 dias e o dia 31 conta como dia 30; fevereiro não é ajustado.
+    """
+    mes_ini, dia_ini, _ = _componentes(para_datetime64(inicio))
+    mes_fim, dia_fim, _ = _componentes(para_datetime64(fim))
+    return 30 * (mes_fim - mes_ini) + np.minimum(dia_fim, 30) - np.minimum(dia_ini, 30)
+
+
+def meses_pro_rata(inicio, fim):
+    """Meses no ano comercial com a fração pro rata die (dias 30/360 ÷ 30), em float64."""
+    return dias_360(inicio, fim) / 30
+
+
+def fracao_de_ano(inicio, fim, convencao=ANO_COMERCIAL):
+    """Anos de ``inicio`` a ``fim`` pela ``convencao`` (``ANO_COMERCIAL`` ou ``ANO_CIVIL``), em float64."""
+    if convencao == ANO_COMERCIAL:
+        return dias_360(inicio, fim) / 360
+    if convencao == ANO_CIVIL:
+        return dias_corridos(inicio, fim) / 365
+    raise ValueError(f"Convenção de contagem desconhecida: {convencao}")
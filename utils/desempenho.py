@@ -0,0 +1,109 @@
+"""Medição do tempo (e, opcionalmente, da memória) de cada etapa de uma execução.
+
+Uso nas páginas::
+
+    medidor = Medidor("fazenda", alocacao=painel_ativo)
+    with medidor.etapa("calculo"):
+        ...
+
+Cada etapa medida fica em ``medidor.etapas`` (a execução atual), soma-se aos
+contadores do processo (``contadores()``, ``formato_prometheus()``) e é registrada
+no logger ``utils.desempenho`` como JSON. A memória só é medida com
+``alocacao=True``, pois o ``tracemalloc`` deixa o código mais lento.
+"""
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_contadores = {}
+_trava = threading.Lock()
+
+
+class Medidor:
+    """Mede as etapas de uma execução (um rerun da página ou uma requisição da API)."""
+
+    def __init__(self, pagina, alocacao=False):
+        self.pagina = pagina
+        self.alocacao = alocacao
+        self.etapas = []
+        if alocacao and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def etapa(self, nome):
+        memoria_inicial = 0
+        if self.alocacao:
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            pico = tracemalloc.get_traced_memory()[1] - memoria_inicial if self.alocacao else None
+            self.etapas.append({"etapa": nome, "segundos": segundos, "memoria_pico": pico})
+            _acumular(self.pagina, nome, segundos, pico)
+            logger.info(json.dumps({"pagina": self.pagina, "etapa": nome, "segundos": round(segundos, 6),
+                                    "memoria_pico": pico}))
+
+    @property
+    def total(self):
+        return sum(e["segundos"] for e in self.etapas)
+
+
+def _acumular(pagina, etapa, segundos, pico):
+    with _trava:
+        contador = _contadores.setdefault((pagina, etapa), {"execucoes": 0, "segundos": 0.0, "memoria_pico": 0})
+        contador["execucoes"] += 1
+        contador["segundos"] += segundos
+        if pico is not None:
+            contador["memoria_pico"] = max(contador["memoria_pico"], pico)
+
+
+def contadores():
+    """Cópia dos contadores do processo: ``{(página, etapa): {execucoes, segundos, memoria_pico}}``."""
+    with _trava:
+        return {chave: dict(valor) for chave, valor in _contadores.items()}
+
+
+def formato_prometheus():
+    """Contadores no formato texto de exposição do Prometheus."""
+    linhas = [
+        "# HELP calculadora_etapa_execucoes_total Execuções de cada etapa.",
+        "# TYPE calculadora_etapa_execucoes_total counter",
+        "# HELP calculadora_etapa_segundos_total Tempo total gasto em cada etapa.",
+        "# TYPE calculadora_etapa_segundos_total counter",
+        "# HELP calculadora_etapa_memoria_pico_bytes Maior pico de memória observado na etapa.",
+        "# TYPE calculadora_etapa_memoria_pico_bytes gauge",
+    ]
+    for (pagina, etapa), contador in sorted(contadores().items()):
+        rotulos = f'{{pagina="{pagina}",etapa="{etapa}"}}'
+        linhas.append(f"calculadora_etapa_execucoes_total{rotulos} {contador['execucoes']}")
+        linhas.append(f"calculadora_etapa_segundos_total{rotulos} {contador['segundos']:.6f}")
+        linhas.append(f"calculadora_etapa_memoria_pico_bytes{rotulos} {contador['memoria_pico']}")
+    return "\n".join(linhas) + "\n"
+
+
+def exibir_painel(container, medidor):
+    """Mostra no ``container`` (ex.: a barra lateral) as etapas desta execução e os contadores do processo."""
+    container.subheader("🛠️ Desempenho")
+    container.caption(f"Esta execução: {medidor.total * 1000:,.1f} ms")
+    container.dataframe({
+        "Etapa": [e["etapa"] for e in medidor.etapas],
+        "ms": [round(e["segundos"] * 1000, 1) for e in medidor.etapas],
+        "Pico (KiB)": [None if e["memoria_pico"] is None else round(e["memoria_pico"] / 1024, 1)
+                       for e in medidor.etapas],
+    }, hide_index=True)
+    acumulados = {etapa: c for (pagina, etapa), c in contadores().items() if pagina == medidor.pagina}
+    container.caption("Média por etapa desde o início do servidor")
+    container.dataframe({
+        "Etapa": list(acumulados),
+        "Execuções": [c["execucoes"] for c in acumulados.values()],
+        "ms (média)": [round(c["segundos"] / c["execucoes"] * 1000, 1) for c in acumulados.values()],
+    }, hide_index=True)
+    container.expander("Contadores (Prometheus)").code(formato_prometheus(), language=None)
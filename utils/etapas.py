@@ -0,0 +1,140 @@
+"""Recálculo incremental: o cálculo de cada página dividido em etapas com dependências explícitas.
+
+Cada etapa declara as entradas que usa (parâmetros do formulário ou saídas de
+etapas anteriores) e tem o seu próprio cache (``utils.cache``), com chave apenas
+nessas entradas. Assim, alterar os honorários refaz só a etapa de honorários; os
+períodos, a correção, os juros e a Selic vêm do cache::
+
+    TJ-RJ:    período -> juros ─┬─> valores -> encargos (honorários, art. 523) -> figuras
+              correção ─────────┘
+    Fazenda:  correção, juros, Selic -> valores -> honorários -> figuras
+
+As figuras já são memoizadas pelas suas entradas em ``utils.graficos`` e formam
+o último nível do grafo.
+"""
+import numpy as np
+
+from utils.cache import TAMANHO_MAXIMO_PADRAO, normalizar, obter_cache
+from utils.calculo_fazenda import (fatores_correcao_fazenda, fatores_juros_fazenda, fatores_selic_fazenda,
+                                   honorarios_fazenda, valores_fazenda)
+from utils.calculo_tjrj import (encargos_tjrj, fator_correcao_monetaria, juros_tjrj, meses_de_juros,
+                                valores_tjrj)
+
+
+class Etapa:
+    """Uma etapa do cálculo: ``funcao(*entradas)`` devolve um dicionário com as chaves de ``saidas``."""
+
+    def __init__(self, nome, funcao, entradas, saidas):
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = tuple(entradas)
+        self.saidas = tuple(saidas)
+
+
+class GrafoEtapas:
+    """Etapas em ordem topológica, cada uma memoizada pelas suas entradas."""
+
+    def __init__(self, nome, parametros, etapas, tamanho_maximo=TAMANHO_MAXIMO_PADRAO, ttl=None):
+        self.nome = nome
+        self.parametros = tuple(parametros)
+        self.etapas = tuple(etapas)
+        disponiveis = set(self.parametros)
+        for etapa in self.etapas:
+            faltando = [e for e in etapa.entradas if e not in disponiveis]
+            if faltando:
+                raise ValueError(f"Etapa '{etapa.nome}' depende de {faltando}, ainda não calculado(s).")
+            disponiveis.update(etapa.saidas)
+        self._caches = {etapa.nome: obter_cache(f"{nome}.{etapa.nome}", tamanho_maximo, ttl)
+                        for etapa in self.etapas}
+
+    def dependentes(self, parametro):
+        """Nomes das etapas refeitas quando ``parametro`` (ou a saída de uma etapa) muda."""
+        alterados, refeitas = {parametro}, []
+        for etapa in self.etapas:
+            if alterados.intersection(etapa.entradas):
+                refeitas.append(etapa.nome)
+                alterados.update(etapa.saidas)
+        return refeitas
+
+    def calcular(self, medidor=None, **parametros):
+        """Executa o grafo e devolve parâmetros e saídas (escalares) em um só dicionário.
+
+        Só as etapas cujas entradas mudaram são executadas; com ``medidor``, cada uma é
+        registrada como ``calculo.<etapa>``.
+        """
+        faltando = set(self.parametros) - set(parametros)
+        if faltando:
+            raise TypeError(f"Parâmetros ausentes: {sorted(faltando)}")
+        valores = dict(parametros)
+        for etapa in self.etapas:
+            argumentos = [valores[e] for e in etapa.entradas]
+            cache = self._caches[etapa.nome]
+            chave = normalizar(argumentos)
+            achou, saida = cache.obter(chave)
+            if not achou:
+                if medidor is None:
+                    saida = _executar(etapa, argumentos)
+                else:
+                    with medidor.etapa(f"calculo.{etapa.nome}"):
+                        saida = _executar(etapa, argumentos)
+                cache.guardar(chave, saida)
+            valores.update(saida)
+        return valores
+
+
+def _executar(etapa, argumentos):
+    saida = etapa.funcao(*argumentos)
+    return {chave: np.asarray(saida[chave]).item() for chave in etapa.saidas}
+
+
+def _periodo_tjrj(data_juros, data_final):
+    return {"meses": meses_de_juros(data_juros, data_final)}
+
+
+def _correcao_tjrj(indice_correcao, data_inicial, data_final):
+    return {"fator_correcao": fator_correcao_monetaria(indice_correcao, data_inicial, data_final)}
+
+
+def _juros_tjrj(tipo_juros, tipo_obrigacao, data_juros, data_final, meses):
+    taxa_mensal, fator_juros = juros_tjrj(tipo_juros, tipo_obrigacao, data_juros, data_final, meses)
+    return {"taxa_mensal": taxa_mensal, "fator_juros": fator_juros}
+
+
+GRAFO_TJRJ = GrafoEtapas(
+    "etapas_tjrj",
+    ("valor", "data_juros", "data_final", "tipo_juros", "tipo_obrigacao", "honorarios", "aplicar_523",
+     "indice_correcao", "data_inicial"),
+    (
+        Etapa("periodo", _periodo_tjrj, ("data_juros", "data_final"), ("meses",)),
+        Etapa("correcao", _correcao_tjrj, ("indice_correcao", "data_inicial", "data_final"), ("fator_correcao",)),
+        Etapa("juros", _juros_tjrj, ("tipo_juros", "tipo_obrigacao", "data_juros", "data_final", "meses"),
+              ("taxa_mensal", "fator_juros")),
+        Etapa("valores", valores_tjrj, ("valor", "fator_correcao", "fator_juros"),
+              ("correcao_monetaria", "valor_atualizado", "valor_juros", "valor_corrigido")),
+        Etapa("encargos", encargos_tjrj, ("valor_corrigido", "honorarios", "aplicar_523"),
+              ("valor_honorarios", "multa_523", "honorarios_523", "total")),
+    ),
+    tamanho_maximo=512, ttl=6 * 3600,
+)
+
+GRAFO_FAZENDA = GrafoEtapas(
+    "etapas_fazenda",
+    ("valor", "data_inicial_cor_mon", "data_final_cor_mon", "data_inicial_juros", "data_final_juros",
+     "honorarios_percentual"),
+    (
+        Etapa("correcao", fatores_correcao_fazenda, ("data_inicial_cor_mon", "data_final_cor_mon"),
+              ("aplica_ipcae", "fator_ipcae")),
+        Etapa("juros", fatores_juros_fazenda, ("data_inicial_juros", "data_final_juros"),
+              ("aplica_juros", "fator_juros")),
+        Etapa("selic", fatores_selic_fazenda, ("data_inicial_cor_mon", "data_final_cor_mon"),
+              ("aplica_selic", "fator_selic")),
+        Etapa("valores", valores_fazenda,
+              ("valor", "aplica_ipcae", "fator_ipcae", "aplica_juros", "fator_juros", "aplica_selic", "fator_selic"),
+              ("valor_corrigido_ipcae", "valor_juros_ate_corte", "juros_selic_sobre_principal",
+               "valor_principal_corrigido_selic", "juros_selic_sobre_consolidado", "valor_consolidado_selic")),
+        Etapa("honorarios", honorarios_fazenda,
+              ("valor_principal_corrigido_selic", "valor_consolidado_selic", "honorarios_percentual"),
+              ("honorarios_resultado1", "honorarios_resultado2", "total_resultado1", "total_resultado2")),
+    ),
+    tamanho_maximo=512, ttl=6 * 3600,
+)
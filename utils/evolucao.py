@@ -0,0 +1,79 @@
+"""Séries de evolução do débito para os gráficos, geradas de forma vetorizada.
+
+Os pontos usam os mesmos fatores de índice do cálculo principal e, quando a
+série é longa, são reduzidos com o algoritmo LTTB (Largest-Triangle-Three-Buckets),
+que preserva o formato da curva com poucos pontos.
+"""
+import numpy as np
+
+from utils.calculo_fazenda import DATA_CORTE_IPCA_SELIC
+from utils.datas import para_datetime64
+from utils.indices import carregar_selic, carregar_serie
+
+MENSAL = "Mensal"
+DIARIA = "Diária"
+
+LIMITE_PONTOS = 500
+
+
+def datas_da_serie(inicio, fim, granularidade=MENSAL):
+    """Datas dos pontos: todos os dias ou o primeiro dia de cada mês, sempre incluindo ``inicio`` e ``fim``."""
+    inicio, fim = para_datetime64(inicio), para_datetime64(fim)
+    if granularidade == DIARIA:
+        return np.arange(inicio, fim + 1)
+    primeiros_dias = np.arange(inicio.astype("datetime64[M]"), fim.astype("datetime64[M]") + 1).astype(
+        "datetime64[D]")
+    primeiros_dias = primeiros_dias[(primeiros_dias >= inicio) & (primeiros_dias <= fim)]
+    return np.union1d(primeiros_dias, [inicio, fim])
+
+
+def serie_evolucao_fazenda(valor, data_inicial_cor_mon, data_final_cor_mon, granularidade=MENSAL):
+    """Evolução do principal corrigido (Resultado 1): IPCA-E até o corte e Selic a partir de 01/12/2021.
+
+    Retorna ``(datas, valores, periodo_ipcae)``, onde ``periodo_ipcae`` indica os pontos até o corte.
+    """
+    inicio = para_datetime64(data_inicial_cor_mon)
+    corte = para_datetime64(DATA_CORTE_IPCA_SELIC)
+    datas = datas_da_serie(inicio, data_final_cor_mon, granularidade)
+    periodo_ipcae = datas <= corte
+
+    ipcae = carregar_serie("IPCA-E")
+    valor_no_corte = valor * ipcae.fator(inicio, max(min(datas[-1], corte), inicio)) if inicio <= corte else valor
+    inicio_selic = max(inicio, corte + 1)
+    valores = np.where(
+        periodo_ipcae,
+        valor * ipcae.fator(inicio, datas),
+        valor_no_corte * carregar_selic().fator(inicio_selic, np.maximum(datas, inicio_selic)),
+    )
+    return datas, valores, periodo_ipcae
+
+
+def lttb(x, y, limite=LIMITE_PONTOS):
+    """Índices dos pontos escolhidos pelo LTTB para representar (x, y) com no máximo ``limite`` pontos.
+
+    O primeiro e o último ponto são sempre mantidos. ``x`` pode ser numérico ou datetime64.
+    """
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+    x = np.asarray(x).astype(np.float64) if not np.issubdtype(np.asarray(x).dtype, np.datetime64) \
+        else np.asarray(x).astype("datetime64[D]").astype(np.int64).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Os pontos internos são divididos em (limite - 2) baldes de tamanho igual
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for k in range(limite - 2):
+        ini, fim = bordas[k], bordas[k + 1]
+        # Média do balde seguinte (ou o último ponto, no último balde)
+        prox_ini, prox_fim = fim, bordas[k + 2] if k + 2 < len(bordas) else n
+        media_x, media_y = x[prox_ini:prox_fim].mean(), y[prox_ini:prox_fim].mean()
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[ini:fim] - y[anterior])
+            - (x[anterior] - x[ini:fim]) * (media_y - y[anterior])
+        )
+        anterior = ini + int(np.argmax(areas))
+        escolhidos[k + 1] = anterior
+    return escolhidos
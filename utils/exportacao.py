@@ -0,0 +1,144 @@
+"""Exportação dos resultados: memória de cálculo (XLSX/CSV), resumo e gráficos.
+
+Os arquivos só são gerados quando o usuário clica em baixar (o Streamlit chama
+a função do botão em outra thread), em blocos, dentro de arquivos temporários
+que passam para o disco quando crescem.
+"""
+import io
+import tempfile
+import zipfile
+
+import numpy as np
+
+from utils.calculo_fazenda import calcular_debitos_fazenda
+from utils.calculo_tjrj import SEM_CORRECAO, calcular_debitos_tjrj
+from utils.datas import para_datetime64
+from utils.evolucao import MENSAL, datas_da_serie
+
+TAMANHO_BLOCO = 5_000
+LIMITE_MEMORIA = 8 * 1024 * 1024  # acima disso o arquivo temporário vai para o disco
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def ao_clicar(funcao, *args, **kwargs):
+    """Função sem argumentos para o ``data`` do ``st.download_button``: gera o arquivo só no clique.
+
+    Cada clique gera o arquivo de novo; nada é calculado enquanto o botão não é usado.
+    """
+    def gerar():
+        arquivo = funcao(*args, **kwargs)
+        arquivo.seek(0)
+        return arquivo
+    return gerar
+
+
+def _arquivo_temporario():
+    return tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA)
+
+
+def _blocos_de_datas(datas):
+    for inicio in range(0, len(datas), TAMANHO_BLOCO):
+        yield datas[inicio:inicio + TAMANHO_BLOCO]
+
+
+def memoria_calculo_fazenda(valor, data_inicial_cor_mon, data_final_cor_mon, data_inicial_juros, data_final_juros,
+                            honorarios_percentual=0.0, granularidade=MENSAL):
+    """Gera a memória de cálculo da Fazenda Pública, data a data, em blocos de linhas.
+
+    Cada linha é o cálculo completo com a correção encerrada naquela data.
+    """
+    import pandas as pd
+
+    fim_juros = para_datetime64(data_final_juros)
+    for datas in _blocos_de_datas(datas_da_serie(data_inicial_cor_mon, data_final_cor_mon, granularidade)):
+        r = calcular_debitos_fazenda(valor, data_inicial_cor_mon, datas, data_inicial_juros,
+                                     np.minimum(datas, fim_juros), honorarios_percentual)
+        com_selic = r["valor_principal_corrigido_selic"] > 0
+        yield pd.DataFrame({
+            "Data": datas.astype("datetime64[ns]"),
+            "Regime": np.where(com_selic, "SELIC", "IPCA-e"),
+            "Valor Corrigido IPCA-e": r["valor_corrigido_ipcae"],
+            "Juros até 30/11/2021": r["valor_juros_ate_corte"],
+            "Juros SELIC s/ Principal": r["juros_selic_sobre_principal"],
+            "Resultado 1 (sem honorários)": np.where(com_selic, r["valor_principal_corrigido_selic"],
+                                                     r["valor_corrigido_ipcae"]),
+            "Juros SELIC s/ Consolidado": r["juros_selic_sobre_consolidado"],
+            "Resultado 2 (sem honorários)": np.where(com_selic, r["valor_consolidado_selic"],
+                                                     r["valor_corrigido_ipcae"] + r["valor_juros_ate_corte"]),
+            "Total Resultado 1": r["total_resultado1"],
+            "Total Resultado 2": r["total_resultado2"],
+        })
+
+
+def memoria_calculo_tjrj(valor, data_juros, data_final, tipo_juros, tipo_obrigacao=None, honorarios=0.0,
+                         aplicar_523=False, indice_correcao=SEM_CORRECAO, data_inicial=None, granularidade=MENSAL):
+    """Gera a memória de cálculo do débito cível, mês a mês, em blocos de linhas."""
+    import pandas as pd
+
+    if data_inicial is None:
+        data_inicial = data_juros
+    for datas in _blocos_de_datas(datas_da_serie(data_inicial, data_final, granularidade)):
+        r = calcular_debitos_tjrj(valor, data_juros, datas, tipo_juros, tipo_obrigacao, honorarios, aplicar_523,
+                                  indice_correcao, data_inicial)
+        yield pd.DataFrame({
+            "Data": datas.astype("datetime64[ns]"),
+            "Meses de Juros": r["meses"],
+            "Fator de Correção": r["fator_correcao"],
+            "Correção Monetária": r["correcao_monetaria"],
+            "Juros": r["valor_juros"],
+            "Valor Corrigido": r["valor_corrigido"],
+            "Honorários": r["valor_honorarios"],
+            "Multa Art. 523": r["multa_523"],
+            "Hon. Art. 523": r["honorarios_523"],
+            "Total": r["total"],
+        })
+
+
+def gerar_csv(blocos):
+    """CSV no padrão das planilhas brasileiras (``;`` e vírgula decimal), gravado bloco a bloco."""
+    arquivo = _arquivo_temporario()
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    for n, bloco in enumerate(blocos):
+        bloco.to_csv(texto, sep=";", decimal=",", index=False, header=n == 0, date_format="%d/%m/%Y")
+    texto.flush()
+    return texto.detach()
+
+
+def gerar_xlsx(blocos, aba="Memória de Cálculo"):
+    """Planilha XLSX em modo de escrita sequencial (as linhas não ficam todas em memória)."""
+    from openpyxl import Workbook
+
+    planilha = Workbook(write_only=True)
+    folha = planilha.create_sheet(aba)
+    for n, bloco in enumerate(blocos):
+        if n == 0:
+            folha.append(list(bloco.columns))
+        for linha in bloco.itertuples(index=False):
+            folha.append([v.to_pydatetime().date() if hasattr(v, "to_pydatetime") else v for v in linha])
+    arquivo = _arquivo_temporario()
+    planilha.save(arquivo)
+    return arquivo
+
+
+def gerar_resumo(texto):
+    """Resumo executivo como documento Markdown."""
+    arquivo = _arquivo_temporario()
+    arquivo.write(texto.encode("utf-8"))
+    return arquivo
+
+
+def gerar_graficos(figuras):
+    """Arquivo ZIP com uma imagem PNG por figura (``{nome: figura}``).
+
+    As imagens dependem do pacote ``kaleido`` (e de um Chrome disponível para ele); sem isso as figuras
+    são exportadas como HTML interativo.
+    """
+    arquivo = _arquivo_temporario()
+    with zipfile.ZipFile(arquivo, "w", zipfile.ZIP_DEFLATED) as zip_graficos:
+        for nome, figura in figuras.items():
+            try:
+                zip_graficos.writestr(f"{nome}.png", figura.to_image(format="png", scale=2))
+            except (ImportError, ValueError, RuntimeError):
+                zip_graficos.writestr(f"{nome}.html", figura.to_html(include_plotlyjs="cdn"))
+    return arquivo
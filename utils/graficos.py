@@ -0,0 +1,245 @@
+"""Figuras Plotly das calculadoras, montadas fora das páginas.
+
+Cada função é memoizada (``utils.cache``): reruns e sessões com as mesmas
+entradas reaproveitam a figura já montada. A função original, sem cache, fica
+em ``funcao.__wrapped__`` (usada pelo benchmark). O Plotly só é importado
+quando alguma figura é montada.
+
+O layout e o estilo dos traços de cada figura (``LAYOUTS`` e ``ESTILOS``) são
+validados pelo Plotly uma única vez por processo; cada nova figura só recebe os
+dados dos traços, sem nova validação. O template (``template_calculadoras``) é
+enxuto: vai serializado junto com cada figura, e o ``plotly_white`` completo
+ocupa cerca de 7 KB. Séries longas usam WebGL (``Scattergl``), e o tamanho de
+cada figura serializada é medido no benchmark contra ``LIMITE_BYTES_FIGURA``.
+"""
+import copy
+from functools import lru_cache
+
+import numpy as np
+
+from utils.cache import memoizar
+from utils.evolucao import lttb, serie_evolucao_fazenda
+from utils.projecao import projetar_selic
+from utils.sensibilidade import cenarios_tjrj
+
+LIMITE_PONTOS_SVG = 1_000  # séries com mais pontos são desenhadas em WebGL (Scattergl)
+LIMITE_MARCADORES = 60  # marcadores só em séries curtas (um por ponto)
+LIMITE_BYTES_FIGURA = 200_000  # teto do JSON de cada figura enviado ao navegador
+# Células do mapa de calor que cabem no teto: float32 e int8 em base64 ocupam ~6,7 bytes por célula
+LIMITE_CELULAS_MAPA = 25_000
+
+_GRADE = "#EBF0F8"
+_EIXO = dict(gridcolor=_GRADE, linecolor=_GRADE, zerolinecolor=_GRADE, automargin=True)
+
+# Layout de cada figura (o título e o que depende dos dados são passados na montagem)
+LAYOUTS = {
+    "pizza_tjrj": dict(title="Composição do Débito Judicial", height=400, showlegend=True),
+    "evolucao_tjrj": dict(title="Evolução Temporal do Débito", xaxis_title="Meses", yaxis_title="Valor (R$)",
+                          height=400, showlegend=False),
+    "sensibilidade_tjrj": dict(xaxis_title="Data Final", yaxis_title="Termo Inicial dos Juros", height=500),
+    "parcelas": dict(title="Composição de Cada Parcela", xaxis_title="Vencimento", yaxis_title="Valor (R$)",
+                     barmode="stack", height=400),
+    "evolucao_fazenda": dict(title="Evolução do Débito: IPCA-e vs SELIC", xaxis_title="Período",
+                             yaxis_title="Valor (R$)", legend_title_text="Regime", height=500, showlegend=True,
+                             hovermode="x unified"),
+    "comparacao_fazenda": dict(title="Comparação Detalhada dos Métodos de Cálculo",
+                               xaxis_title="Componentes do Cálculo", yaxis_title="Valor (R$)", barmode="group",
+                               height=500),
+    "pizza_fazenda": dict(height=500),
+    "preview_fazenda": dict(title="Exemplo: Evolução do Débito ao Longo do Tempo", xaxis_title="Período",
+                            yaxis_title="Valor (R$)", legend_title_text="Regime", height=400, showlegend=True),
+}
+
+# Estilo de cada traço: tipo e aparência, sem os dados
+ESTILOS = {
+    "pizza": dict(type="pie", hole=0.4),
+    "evolucao_tjrj": dict(type="scatter", name="Evolução do Débito", line=dict(color="#1f77b4", width=3),
+                          marker=dict(size=6)),
+    "sensibilidade": dict(type="heatmap", colorscale="Blues", colorbar=dict(title="Total (R$)"), hovertemplate=(
+        "Termo inicial: %{y|%d/%m/%Y}<br>Data final: %{x|%d/%m/%Y}<br>"
+        "Meses de juros: %{customdata}<br>Total: R$ %{z:,.0f}<extra></extra>"
+    )),
+    "parcela_valor": dict(type="bar", name="Valor original", marker=dict(color="#1f77b4")),
+    "parcela_acrescimo": dict(type="bar", name="Atualização e encargos", marker=dict(color="#ff7f0e")),
+    "ipcae": dict(type="scatter", name="IPCA-e", line=dict(color="#FF6B6B", width=3)),
+    "selic": dict(type="scatter", name="SELIC", line=dict(color="#4ECDC4", width=3)),
+    "faixa_superior": dict(type="scatter", line=dict(width=0), showlegend=False, hoverinfo="skip"),
+    "faixa_inferior": dict(type="scatter", line=dict(width=0), fill="tonexty"),
+    "projecao_mediana": dict(type="scatter", line=dict(color="#45B7D1", width=3, dash="dash")),
+    "resultado1": dict(type="bar", name="Resultado 1: SELIC sobre Principal", marker=dict(color="#FF6B6B"),
+                       textposition="auto"),
+    "resultado2": dict(type="bar", name="Resultado 2: SELIC sobre Consolidado", marker=dict(color="#4ECDC4"),
+                       textposition="auto"),
+    "preview_ipcae": dict(type="scatter", name="IPCA-e", line=dict(color="#FF6B6B", width=4)),
+    "preview_selic": dict(type="scatter", name="SELIC", line=dict(color="#4ECDC4", width=4)),
+}
+
+
+@lru_cache(maxsize=None)
+def template_calculadoras():
+    """Template enxuto com o visual do ``plotly_white`` (fundo branco, grade clara), montado uma vez."""
+    import plotly.graph_objects as go
+
+    return go.layout.Template(layout=dict(
+        font=dict(size=10), title=dict(font=dict(size=14)), paper_bgcolor="white", plot_bgcolor="white",
+        xaxis=_EIXO, yaxis=_EIXO, hoverlabel=dict(align="left"),
+    ))
+
+
+@lru_cache(maxsize=None)
+def _layout(nome):
+    import plotly.graph_objects as go
+
+    return go.Layout(LAYOUTS[nome], template=template_calculadoras()).to_plotly_json()
+
+
+@lru_cache(maxsize=None)
+def _estilo(nome):
+    import plotly.graph_objects as go
+
+    estilo = dict(ESTILOS[nome])
+    return go.Figure(data=[estilo]).to_plotly_json()["data"][0]
+
+
+def _figura(layout, tracos, **ajustes):
+    """Figura com o layout ``layout`` e os traços ``[(estilo, dados), ...]``, sem validar de novo.
+
+    ``ajustes`` substitui chaves do layout (ex.: o título que depende dos dados).
+    """
+    import plotly.graph_objects as go
+
+    dados = [{**copy.deepcopy(_estilo(estilo)), **valores} for estilo, valores in tracos]
+    return go.Figure(dict(data=dados, layout={**copy.deepcopy(_layout(layout)), **ajustes}), _validate=False)
+
+
+def _linha(estilo, x, y, marcadores=False, **dados):
+    """Traço de linha: ``Scattergl`` acima de ``LIMITE_PONTOS_SVG`` pontos; marcadores só em séries curtas."""
+    modo = "lines+markers" if marcadores and len(y) <= LIMITE_MARCADORES else "lines"
+    tipo = "scattergl" if len(y) > LIMITE_PONTOS_SVG else "scatter"
+    return estilo, dict(x=x, y=y, mode=modo, type=tipo, **dados)
+
+
+def _datas(datas):
+    # "AAAA-MM-DD" ocupa metade do texto gerado pelo Plotly para datetime64 ("AAAA-MM-DDT00:00:00")
+    return np.datetime_as_string(np.asarray(datas, dtype="datetime64[D]"), unit="D")
+
+
+def tamanho_serializado(figura):
+    """Bytes do JSON da figura, como enviado ao navegador pelo ``st.plotly_chart``."""
+    import plotly.io as pio
+
+    return len(pio.to_json(figura, validate=False).encode("utf-8"))
+
+
+# 🔸 Débitos Judiciais TJ-RJ
+@memoizar("figura_pizza_tjrj", tamanho_maximo=64)
+def montar_fig_pizza_tjrj(componentes, valores, cores):
+    return _figura("pizza_tjrj", [("pizza", dict(labels=list(componentes), values=list(valores),
+                                                 marker=dict(colors=list(cores))))])
+
+
+@memoizar("figura_evolucao_tjrj", tamanho_maximo=64)
+def montar_fig_evolucao_tjrj(valor, meses, taxa_mensal):
+    meses_lista = np.arange(meses + 1)
+    valores_evolucao = valor * (1 + taxa_mensal * meses_lista)
+    return _figura("evolucao_tjrj", [_linha("evolucao_tjrj", meses_lista, valores_evolucao, marcadores=True)])
+
+
+@memoizar("figura_sensibilidade_tjrj", tamanho_maximo=64)
+def montar_fig_sensibilidade_tjrj(valor, data_inicial, indice_correcao, honorarios, aplicar_523, faixa_taxa,
+                                  faixa_termo, faixa_final, posicao_taxa):
+    """Mapa de calor termo inicial × data final do total, para a taxa ``posicao_taxa`` da grade de cenários.
+
+    O total vai em float32 (metade do JSON), com o valor exibido em reais inteiros. Grades com mais de
+    ``LIMITE_CELULAS_MAPA`` células são exibidas de ``passo`` em ``passo`` pontos em cada eixo.
+    """
+    grade = cenarios_tjrj(valor, data_inicial, indice_correcao, honorarios, aplicar_523, faixa_taxa, faixa_termo,
+                          faixa_final)
+    taxa = grade["taxas"][posicao_taxa]
+    total, meses = grade["total"][posicao_taxa], grade["meses"]
+    passo = int(np.ceil(np.sqrt(total.size / LIMITE_CELULAS_MAPA)))
+    return _figura("sensibilidade_tjrj", [("sensibilidade", dict(
+        x=_datas(grade["finais"][::passo]), y=_datas(grade["termos"][::passo]),
+        z=total[::passo, ::passo].astype(np.float32), customdata=meses[::passo, ::passo]
+    ))], title=dict(text=f"Cenários com juros de {taxa:.2%} a.a."))
+
+
+def montar_figuras_tjrj(componentes, valores, cores, valor, meses, taxa_mensal):
+    """``(fig_pizza, fig_evolucao)``; cada uma é ``None`` quando não se aplica."""
+    fig_pizza = montar_fig_pizza_tjrj(componentes, valores, cores) if componentes else None
+    fig_evolucao = None
+    if meses > 0 and taxa_mensal and taxa_mensal > 0:
+        fig_evolucao = montar_fig_evolucao_tjrj(valor, meses, taxa_mensal)
+    return fig_pizza, fig_evolucao
+
+
+# 🔸 Débitos parcelados
+@memoizar("figura_parcelas", tamanho_maximo=32)
+def montar_fig_parcelas(vencimentos, valores, totais):
+    valores, totais = np.asarray(valores, dtype=np.float64), np.asarray(totais, dtype=np.float64)
+    vencimentos = _datas(vencimentos)
+    return _figura("parcelas", [
+        ("parcela_valor", dict(x=vencimentos, y=valores)),
+        ("parcela_acrescimo", dict(x=vencimentos, y=totais - valores)),
+    ])
+
+
+# 🔸 Fazenda Pública
+@memoizar("figura_evolucao_fazenda", tamanho_maximo=64)
+def montar_fig_evolucao_fazenda(valor, data_inicial_cor_mon, data_final_cor_mon, granularidade, projecao=None):
+    """Evolução do Resultado 1 e, com ``projecao`` (argumentos de ``projetar_selic``), as faixas da Selic simulada."""
+    # Série gerada de uma só vez com os mesmos fatores do cálculo e reduzida (LTTB) antes de ir ao navegador
+    datas, valores, periodo_ipcae = serie_evolucao_fazenda(valor, data_inicial_cor_mon, data_final_cor_mon,
+                                                           granularidade)
+
+    tracos = []
+    for regime, pontos in (("ipcae", periodo_ipcae), ("selic", ~periodo_ipcae)):
+        if pontos.any():
+            indices = lttb(datas[pontos], valores[pontos])
+            tracos.append(_linha(regime, _datas(datas[pontos][indices]), valores[pontos][indices]))
+
+    if projecao is not None:
+        tracos.extend(_faixas_projecao(valores[-1], projetar_selic(**projecao)))
+    return _figura("evolucao_fazenda", tracos)
+
+
+def _faixas_projecao(valor_inicial, projecao):
+    datas, percentis = _datas(projecao["datas"]), projecao["percentis"]
+    valores = valor_inicial * projecao["fatores"]
+    tracos = []
+    # Faixas simétricas (ex.: P5–P95 e P25–P75), da mais larga para a mais estreita
+    for inferior in range(len(percentis) // 2):
+        superior = len(percentis) - 1 - inferior
+        rotulo = f"Projeção P{percentis[inferior]}–P{percentis[superior]}"
+        tracos.append(_linha("faixa_superior", datas, valores[superior], legendgroup=rotulo))
+        tracos.append(_linha("faixa_inferior", datas, valores[inferior], name=rotulo, legendgroup=rotulo,
+                             fillcolor=f"rgba(69, 183, 209, {0.15 * (inferior + 1)})"))
+    mediana = percentis.index(50) if 50 in percentis else len(percentis) // 2
+    tracos.append(_linha("projecao_mediana", datas, valores[mediana], name=f"Projeção P{percentis[mediana]}"))
+    return tracos
+
+
+@memoizar("figura_comparacao_fazenda", tamanho_maximo=64)
+def montar_fig_comparacao_fazenda(categorias, valores_resultado1, valores_resultado2):
+    return _figura("comparacao_fazenda", [
+        (estilo, dict(x=list(categorias), y=list(valores), text=[f"R$ {v:,.0f}" for v in valores]))
+        for estilo, valores in (("resultado1", valores_resultado1), ("resultado2", valores_resultado2))
+    ])
+
+
+@memoizar("figura_pizza_fazenda", tamanho_maximo=64)
+def montar_fig_pizza_fazenda(labels_pizza, valores_pizza, total_resultado1):
+    return _figura("pizza_fazenda", [("pizza", dict(
+        labels=list(labels_pizza), values=list(valores_pizza),
+        marker=dict(colors=["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4"])
+    ))], title=dict(text=f"Composição do Débito Total: R$ {total_resultado1:,.2f}"))
+
+
+@memoizar("figura_preview_fazenda", tamanho_maximo=1)
+def montar_fig_preview_fazenda():
+    meses = ["Jan/2020", "Jul/2020", "Jan/2021", "Jul/2021", "Jan/2022", "Jul/2022", "Jan/2023", "Jul/2023"]
+    valores = [50000, 52500, 55000, 57500, 62000, 65000, 68500, 72000]
+    return _figura("preview_fazenda", [
+        _linha("preview_ipcae", meses[:4], valores[:4]),
+        _linha("preview_selic", meses[4:], valores[4:]),
+    ])
@@ -0,0 +1,223 @@
+"""Histórico local dos cálculos (SQLite), consultado por número do processo, data e ente.
+
+Cada cálculo é gravado com as entradas, o resultado e a versão das tabelas de
+índices (hash dos arquivos de ``data/``). Resultados e histórico ficam em tabelas
+separadas::
+
+    resultados(chave, calculadora, versao_indices, entradas, resultado)
+    calculos(id, calculadora, processo, ente, criado_em, chave, total)
+
+A ``chave`` é o hash da calculadora, das entradas, da versão dos índices e de
+``VERSAO_MOTOR``: as mesmas entradas com os mesmos índices e as mesmas regras
+de cálculo devolvem o resultado gravado, sem recalcular. As consultas do histórico usam os índices de ``calculos`` e
+``LIMIT``, então não dependem do tamanho do arquivo.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+from utils.indices import DIRETORIO_DADOS
+from utils.recursos import DIRETORIO_PROJETO
+
+ARQUIVO_HISTORICO = DIRETORIO_PROJETO / "historico.sqlite3"
+LIMITE_CONSULTA = 50
+
+# Versão das regras de cálculo: incrementar quando uma correção muda os resultados (2: meses da taxa legal
+# contados a partir do termo dos juros), para que totais antigos não sejam reaproveitados
+VERSAO_MOTOR = 2
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    chave TEXT PRIMARY KEY,
+    calculadora TEXT NOT NULL,
+    versao_indices TEXT NOT NULL,
+    entradas TEXT NOT NULL,
+    resultado TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS calculos (
+    id INTEGER PRIMARY KEY,
+    calculadora TEXT NOT NULL,
+    processo TEXT NOT NULL DEFAULT '',
+    ente TEXT NOT NULL DEFAULT '',
+    criado_em TEXT NOT NULL,
+    chave TEXT NOT NULL REFERENCES resultados (chave),
+    total REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS calculos_processo ON calculos (processo, criado_em, chave);
+CREATE INDEX IF NOT EXISTS calculos_data ON calculos (criado_em);
+CREATE INDEX IF NOT EXISTS calculos_calculadora ON calculos (calculadora, criado_em);
+CREATE INDEX IF NOT EXISTS calculos_ente ON calculos (ente, criado_em);
+"""
+
+# Número único do processo (Res. CNJ 65/2008): NNNNNNN-DD.AAAA.J.TR.OOOO
+_FORMATO_CNJ = re.compile(r"^(\d{7})(\d{2})(\d{4})(\d)(\d{2})(\d{4})$")
+
+
+def normalizar_processo(numero):
+    """Número do processo no formato CNJ, com os dígitos verificadores conferidos (``""`` se vazio).
+
+    Aceita o número com ou sem pontuação; levanta ``ValueError`` se não for um número CNJ válido.
+    """
+    digitos = re.sub(r"\D", "", numero or "")
+    if not digitos:
+        return ""
+    partes = _FORMATO_CNJ.match(digitos)
+    if partes is None:
+        raise ValueError("O número do processo deve ter 20 dígitos (NNNNNNN-DD.AAAA.J.TR.OOOO).")
+    sequencial, verificador, ano, justica, tribunal, origem = partes.groups()
+    if 98 - int(sequencial + ano + justica + tribunal + origem + "00") % 97 != int(verificador):
+        raise ValueError(f"Dígito verificador inválido no processo {numero}.")
+    return f"{sequencial}-{verificador}.{ano}.{justica}.{tribunal}.{origem}"
+
+
+_versao = {}
+
+
+def versao_indices(diretorio=DIRETORIO_DADOS):
+    """Hash (12 caracteres) do conteúdo das tabelas de índices; muda quando algum CSV é atualizado.
+
+    O hash só é recalculado quando o tamanho ou a data de modificação de algum arquivo muda.
+    """
+    arquivos = sorted(Path(diretorio).glob("*.csv"))
+    assinatura = tuple((a.name, a.stat().st_size, a.stat().st_mtime_ns) for a in arquivos)
+    if _versao.get("assinatura") != assinatura:
+        resumo = hashlib.sha256()
+        for arquivo in arquivos:
+            resumo.update(arquivo.name.encode())
+            resumo.update(arquivo.read_bytes())
+        _versao.update(assinatura=assinatura, hash=resumo.hexdigest()[:12])
+    return _versao["hash"]
+
+
+def _serializar(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    raise TypeError(f"Valor não serializável no histórico: {valor!r}")
+
+
+def _json(dados):
+    return json.dumps(dados, sort_keys=True, ensure_ascii=False, default=_serializar)
+
+
+class Historico:
+    """Acesso ao arquivo SQLite do histórico; uma conexão por thread (as sessões do Streamlit são threads)."""
+
+    def __init__(self, caminho=ARQUIVO_HISTORICO):
+        self.caminho = Path(caminho)
+        self._local = threading.local()
+        with self._conexao() as conexao:
+            conexao.executescript(ESQUEMA)
+
+    def _conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30)
+            conexao.row_factory = sqlite3.Row
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def chave(self, calculadora, entradas, versao=None):
+        """Hash das entradas normalizadas (datas em ISO) com a calculadora, a versão dos índices e a do motor."""
+        versao = versao_indices() if versao is None else versao
+        return hashlib.sha256(f"{calculadora}|{versao}|{VERSAO_MOTOR}|{_json(entradas)}".encode()).hexdigest()
+
+    def buscar(self, calculadora, entradas):
+        """Resultado gravado para as mesmas entradas e a mesma versão dos índices, ou ``None``."""
+        linha = self._conexao().execute("SELECT resultado FROM resultados WHERE chave = ?",
+                                        (self.chave(calculadora, entradas),)).fetchone()
+        return None if linha is None else json.loads(linha["resultado"])
+
+    def registrar(self, calculadora, entradas, resultado, processo="", ente="", total=None):
+        """Grava o resultado (se ainda não existir) e uma linha do histórico para o processo."""
+        versao = versao_indices()
+        chave = self.chave(calculadora, entradas, versao)
+        with self._conexao() as conexao:
+            conexao.execute("INSERT OR IGNORE INTO resultados VALUES (?, ?, ?, ?, ?)",
+                            (chave, calculadora, versao, _json(entradas), _json(resultado)))
+            conexao.execute(
+                "INSERT OR IGNORE INTO calculos (calculadora, processo, ente, criado_em, chave, total) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (calculadora, processo, ente.strip(), datetime.now().isoformat(timespec="seconds"), chave, total))
+        return chave
+
+    def calcular(self, calculadora, funcao, entradas, processo="", ente="", campo_total="total"):
+        """``funcao(**entradas)`` com o atalho do histórico; devolve ``(resultado, reaproveitado)``.
+
+        Só os campos que não são entradas são gravados no resultado.
+        """
+        resultado = self.buscar(calculadora, entradas)
+        reaproveitado = resultado is not None
+        if not reaproveitado:
+            resultado = {k: v for k, v in funcao(**entradas).items() if k not in entradas}
+        self.registrar(calculadora, entradas, resultado, processo, ente, resultado.get(campo_total))
+        return resultado, reaproveitado
+
+    def consultar(self, calculadora=None, processo=None, ente=None, limite=LIMITE_CONSULTA):
+        """Cálculos mais recentes (com entradas e resultado), filtrados por calculadora, processo ou ente."""
+        filtros, parametros = [], []
+        for coluna, valor in (("calculadora", calculadora), ("processo", processo), ("ente", ente)):
+            if valor:
+                filtros.append(f"c.{coluna} = ?")
+                parametros.append(valor)
+        onde = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        linhas = self._conexao().execute(
+            "SELECT c.criado_em, c.calculadora, c.processo, c.ente, c.total, r.versao_indices, r.entradas, "
+            f"r.resultado FROM calculos c JOIN resultados r USING (chave) {onde} ORDER BY c.criado_em DESC LIMIT ?",
+            (*parametros, limite)).fetchall()
+        return [{**dict(linha), "entradas": json.loads(linha["entradas"]),
+                 "resultado": json.loads(linha["resultado"])} for linha in linhas]
+
+
+_historicos = {}
+_trava = threading.Lock()
+
+
+def obter_historico(caminho=ARQUIVO_HISTORICO):
+    """Histórico compartilhado por todas as sessões do processo (um por arquivo)."""
+    with _trava:
+        if caminho not in _historicos:
+            _historicos[caminho] = Historico(caminho)
+        return _historicos[caminho]
+
+
+def exibir_historico(container, calculadora, historico=None):
+    """Mostra no ``container`` os últimos cálculos da ``calculadora``, com filtro por processo e ente.
+
+    Filtrando um processo, a coluna ``Variação`` compara cada total com o cálculo anterior.
+    """
+    historico = obter_historico() if historico is None else historico
+    col1, col2 = container.columns(2)
+    filtro_processo = col1.text_input("Processo (CNJ)", key=f"historico_processo_{calculadora}")
+    filtro_ente = col2.text_input("Ente", key=f"historico_ente_{calculadora}")
+    try:
+        processo = normalizar_processo(filtro_processo)
+    except ValueError as erro:
+        container.error(f"❌ {erro}")
+        return
+    linhas = historico.consultar(calculadora, processo, filtro_ente.strip())
+    if not linhas:
+        container.caption("Nenhum cálculo registrado.")
+        return
+    totais = [linha["total"] for linha in linhas]
+    tabela = {
+        "Data": [datetime.fromisoformat(linha["criado_em"]).strftime("%d/%m/%Y %H:%M") for linha in linhas],
+        "Processo": [linha["processo"] for linha in linhas],
+        "Ente": [linha["ente"] for linha in linhas],
+        "Total": [f"R$ {total:,.2f}" if total is not None else "" for total in totais],
+        "Índices": [linha["versao_indices"] for linha in linhas],
+    }
+    if processo:
+        tabela["Variação"] = [f"R$ {atual - anterior:+,.2f}" if None not in (atual, anterior) else ""
+                              for atual, anterior in zip(totais, totais[1:] + [None])]
+    container.dataframe(tabela, hide_index=True, use_container_width=True)
+    container.caption(f"Últimos {len(linhas)} cálculos (mais recentes primeiro).")
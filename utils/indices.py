@@ -0,0 +1,274 @@
+"""Tabelas locais de índices econômicos com fatores acumulados pré-calculados.
+
+Cada série guarda as variações (mensais ou diárias) e o produto acumulado delas,
+de forma que o fator entre duas datas quaisquer é uma única divisão, feita de uma
+vez para arrays inteiros de datas.
+
+As séries são lidas do arquivo binário ``data/indices.bin`` (``utils.arquivo_indices``),
+mapeado em memória e compartilhado por todos os processos do servidor; sem ele, ou
+se algum CSV for mais recente, são lidas dos CSV de ``data/``.
+"""
+import csv
+import struct
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from utils.calendario import eh_dia_util
+from utils.datas import para_datetime64
+
+DIRETORIO_DADOS = Path(__file__).resolve().parent.parent / "data"
+ARQUIVO_BINARIO = DIRETORIO_DADOS / "indices.bin"
+
+VARIACAO = "variacao"            # variação mensal em %
+NUMERO_INDICE = "numero_indice"  # número-índice (fator acumulado) do mês
+
+# Arquivos no formato de exportação CSV do SGS/Banco Central ("data";"valor")
+ARQUIVOS_SERIES = {
+    "IPCA-E": ("ipca_e.csv", VARIACAO),
+    "INPC": ("inpc.csv", VARIACAO),
+    "TJ-RJ": ("fator_tjrj.csv", NUMERO_INDICE),
+}
+
+# Taxa Selic diária (série 11 do SGS), publicada apenas para dias úteis
+SELIC = "Selic"
+ARQUIVO_SELIC = "selic.csv"
+
+# Taxa legal mensal (Lei 14.905/24, série 29543 do SGS): Selic do mês menos o IPCA do mês, nunca negativa
+TAXA_LEGAL = "Taxa legal"
+ARQUIVO_TAXA_LEGAL = "taxa_legal.csv"
+
+
+class SerieMensal:
+    """Série de variações mensais (em fração) a partir de ``mes_inicial``.
+
+    ``acumulado[k]`` é o produto das variações dos ``k`` primeiros meses, com
+    ``acumulado[0] == 1``; ``acumulado[k + 1]`` equivale ao número-índice do mês ``k``.
+    Um ``acumulado`` já calculado (do arquivo binário) é usado sem cópia.
+    """
+
+    def __init__(self, nome, mes_inicial, variacoes, acumulado=None):
+        self.nome = nome
+        self.mes_inicial = np.datetime64(mes_inicial, "M")
+        self.variacoes = np.asarray(variacoes, dtype=np.float64)
+        if acumulado is None:
+            acumulado = np.concatenate(([1.0], np.cumprod(1 + self.variacoes)))
+        self.acumulado = np.asarray(acumulado, dtype=np.float64)
+
+    @classmethod
+    def de_numeros_indice(cls, nome, mes_inicial, numeros_indice):
+        """Cria a série a partir de uma tabela de números-índice (fatores acumulados) mensais."""
+        numeros_indice = np.asarray(numeros_indice, dtype=np.float64)
+        variacoes = np.concatenate(([0.0], numeros_indice[1:] / numeros_indice[:-1] - 1))
+        return cls(nome, mes_inicial, variacoes)
+
+    def __len__(self):
+        return len(self.variacoes)
+
+    @property
+    def mes_final(self):
+        return self.mes_inicial + (len(self) - 1)
+
+    def posicao(self, datas):
+        """Índice em ``acumulado`` do número-índice do mês de cada data.
+
+        Datas anteriores à série usam a base (1,0); posteriores, o último mês disponível.
+        """
+        meses = (para_datetime64(datas).astype("datetime64[M]") - self.mes_inicial).astype(np.int64)
+        return np.clip(meses + 1, 0, len(self))
+
+    def fator(self, inicio, fim):
+        """Fator de correção entre o mês de ``inicio`` e o mês de ``fim`` (razão dos números-índice)."""
+        return self.acumulado[self.posicao(fim)] / self.acumulado[self.posicao(inicio)]
+
+
+class SerieMensalSimples(SerieMensal):
+    """Série de taxas mensais somadas (juros simples), em vez de capitalizadas.
+
+    ``acumulado[k]`` é a soma das taxas dos ``k`` primeiros meses, com ``acumulado[0] == 0``,
+    de modo que os juros de qualquer intervalo são uma única subtração.
+    """
+
+    def __init__(self, nome, mes_inicial, variacoes, acumulado=None):
+        if acumulado is None:
+            acumulado = np.concatenate(([0.0], np.cumsum(np.asarray(variacoes, dtype=np.float64))))
+        super().__init__(nome, mes_inicial, variacoes, acumulado)
+
+    def soma(self, inicio, fim):
+        """Soma das taxas dos meses posteriores ao de ``inicio`` até o mês de ``fim``."""
+        return self.acumulado[self.posicao(fim)] - self.acumulado[self.posicao(inicio)]
+
+    def soma_meses(self, inicio, meses):
+        """Soma das taxas dos ``meses`` meses seguintes ao de ``inicio`` (meses fora da série valem zero)."""
+        primeiro = (para_datetime64(inicio).astype("datetime64[M]") - self.mes_inicial).astype(np.int64) + 1
+        ultimo = primeiro + np.asarray(meses, dtype=np.int64)
+        return self.acumulado[np.clip(ultimo, 0, len(self))] - self.acumulado[np.clip(primeiro, 0, len(self))]
+
+    def fator(self, inicio, fim):
+        return 1 + self.soma(inicio, fim)
+
+
+class SerieDiaria:
+    """Série de taxas diárias (em fração) por dia corrido a partir de ``data_inicial``.
+
+    Dias não úteis têm taxa zero. ``acumulado[k]`` é o produto dos fatores dos
+    ``k`` primeiros dias, com ``acumulado[0] == 1``.
+    """
+
+    def __init__(self, nome, data_inicial, taxas, acumulado=None):
+        self.nome = nome
+        self.data_inicial = np.datetime64(data_inicial, "D")
+        self.taxas = np.asarray(taxas, dtype=np.float64)
+        if acumulado is None:
+            acumulado = np.concatenate(([1.0], np.cumprod(1 + self.taxas)))
+        self.acumulado = np.asarray(acumulado, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.taxas)
+
+    @property
+    def data_final(self):
+        return self.data_inicial + (len(self) - 1)
+
+    def posicao(self, datas):
+        """Índice em ``acumulado`` correspondente a cada data (limitado ao período da série)."""
+        dias = (para_datetime64(datas) - self.data_inicial).astype(np.int64)
+        return np.clip(dias, 0, len(self))
+
+    def fator(self, inicio, fim):
+        """Fator acumulado dos dias no intervalo [inicio, fim)."""
+        return self.acumulado[self.posicao(fim)] / self.acumulado[self.posicao(inicio)]
+
+
+def ler_csv_sgs(caminho):
+    """Lê um CSV mensal do SGS (``"dd/mm/aaaa";"1,23"``) e devolve (mês inicial, valores)."""
+    with open(caminho, encoding="utf-8", newline="") as f:
+        linhas = list(csv.DictReader(f, delimiter=";"))
+    meses = np.array(["{2}-{1}".format(*linha["data"].split("/")) for linha in linhas], dtype="datetime64[M]")
+    if np.any(np.diff(meses).astype(np.int64) != 1):
+        raise ValueError(f"{caminho}: a série mensal deve ter meses consecutivos, sem lacunas")
+    return meses[0], [float(linha["valor"].replace(",", ".")) for linha in linhas]
+
+
+def ler_csv_sgs_diario(caminho):
+    """Lê um CSV diário do SGS e devolve (data inicial, taxas em fração por dia corrido)."""
+    with open(caminho, encoding="utf-8", newline="") as f:
+        linhas = list(csv.DictReader(f, delimiter=";"))
+    datas = np.array(["{2}-{1}-{0}".format(*linha["data"].split("/")) for linha in linhas], dtype="datetime64[D]")
+    if np.any(np.diff(datas).astype(np.int64) <= 0):
+        raise ValueError(f"{caminho}: as datas da série diária devem estar em ordem crescente")
+    if not np.all(eh_dia_util(datas)):
+        raise ValueError(f"{caminho}: a série diária contém datas que não são dias úteis")
+    taxas = np.zeros((datas[-1] - datas[0]).astype(np.int64) + 1)
+    taxas[(datas - datas[0]).astype(np.int64)] = [float(linha["valor"].replace(",", ".")) / 100 for linha in linhas]
+    return datas[0], taxas
+
+
+def gravar_csv_sgs(caminho, mes_inicial, valores, casas=4):
+    """Grava uma série mensal no mesmo formato CSV do SGS lido por :func:`ler_csv_sgs`."""
+    meses = (np.datetime64(mes_inicial, "M") + np.arange(len(valores))).astype("datetime64[D]").astype(object)
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        f.write('"data";"valor"\n')
+        for mes, valor in zip(meses, valores):
+            texto = f"{valor:.{casas}f}".replace(".", ",")
+            f.write(f'"{mes.strftime("%d/%m/%Y")}";"{texto}"\n')
+
+
+def taxa_legal_mensal(selic, ipca, mes_inicial, mes_final):
+    """Taxa legal de cada mês (em %): Selic acumulada no mês menos a variação do IPCA, limitada a zero.
+
+    Usada para gerar ``data/taxa_legal.csv`` a partir da tabela local da Selic; como não há tabela do IPCA
+    (série 433) em ``data/``, a distribuída usou a do IPCA-E no lugar do IPCA.
+    """
+    meses = np.arange(np.datetime64(mes_inicial, "M"), np.datetime64(mes_final, "M") + 1)
+    selic_mes = selic.fator(meses.astype("datetime64[D]"), (meses + 1).astype("datetime64[D]")) - 1
+    ipca_mes = ipca.variacoes[ipca.posicao(meses.astype("datetime64[D]")) - 1]
+    return np.maximum((selic_mes - ipca_mes) * 100, 0.0)
+
+
+def ler_serie(nome, diretorio=DIRETORIO_DADOS):
+    """Lê a série mensal ``nome`` do CSV em ``diretorio``."""
+    arquivo, tipo = ARQUIVOS_SERIES[nome]
+    mes_inicial, valores = ler_csv_sgs(Path(diretorio) / arquivo)
+    if tipo == NUMERO_INDICE:
+        return SerieMensal.de_numeros_indice(nome, mes_inicial, valores)
+    return SerieMensal(nome, mes_inicial, np.asarray(valores) / 100)
+
+
+def ler_selic(diretorio=DIRETORIO_DADOS):
+    """Lê a Selic diária do CSV em ``diretorio``."""
+    data_inicial, taxas = ler_csv_sgs_diario(Path(diretorio) / ARQUIVO_SELIC)
+    return SerieDiaria(SELIC, data_inicial, taxas)
+
+
+def ler_taxa_legal(diretorio=DIRETORIO_DADOS):
+    """Lê a taxa legal mensal do CSV em ``diretorio``, acumulada por soma (juros simples)."""
+    mes_inicial, valores = ler_csv_sgs(Path(diretorio) / ARQUIVO_TAXA_LEGAL)
+    return SerieMensalSimples(TAXA_LEGAL, mes_inicial, np.asarray(valores) / 100)
+
+
+def ler_todas(diretorio=DIRETORIO_DADOS):
+    """Todas as séries lidas dos CSV em ``diretorio``, por nome (usado para gerar o arquivo binário)."""
+    series = {nome: ler_serie(nome, diretorio) for nome in ARQUIVOS_SERIES}
+    return {**series, SELIC: ler_selic(diretorio), TAXA_LEGAL: ler_taxa_legal(diretorio)}
+
+
+@lru_cache(maxsize=None)
+def series_binarias(caminho=ARQUIVO_BINARIO):
+    """Séries do arquivo binário, mapeadas em memória, ou ``None`` se ele não puder ser usado.
+
+    O arquivo é ignorado se não existir, se estiver truncado ou corrompido, se algum CSV de ``data/``
+    for mais recente que ele ou se os CSV não forem os mesmos (nome e tamanho) de quando ele foi gerado.
+    """
+    from utils.arquivo_indices import abrir_arquivo, assinatura_fontes
+
+    caminho = Path(caminho)
+    if not caminho.exists():
+        return None
+    arquivos = list(DIRETORIO_DADOS.glob("*.csv"))
+    if any(arquivo.stat().st_mtime_ns > caminho.stat().st_mtime_ns for arquivo in arquivos):
+        return None
+    classes = {classe.__name__: classe for classe in (SerieMensal, SerieMensalSimples, SerieDiaria)}
+    try:
+        conteudo = abrir_arquivo(caminho)
+        if conteudo["fontes"] != assinatura_fontes(arquivos):
+            return None
+        return {nome: classes[classe](nome, inicio, variacoes, acumulado)
+                for nome, (classe, inicio, variacoes, acumulado) in conteudo["series"].items()}
+    except (OSError, ValueError, struct.error, KeyError):
+        return None
+
+
+def _serie_binaria(nome):
+    series = series_binarias()
+    return None if series is None else series.get(nome)
+
+
+@lru_cache(maxsize=None)
+def carregar_serie(nome):
+    """Carrega (uma única vez por processo) a série mensal ``nome`` do arquivo binário ou do CSV."""
+    serie = _serie_binaria(nome)
+    return ler_serie(nome) if serie is None else serie
+
+
+def ultimo_mes_serie(nome):
+    """Último mês da série mensal ``nome``.
+
+    Datas posteriores usam o número-índice desse mês, ou seja, a correção monetária para nele.
+    """
+    return carregar_serie(nome).mes_final
+
+
+@lru_cache(maxsize=None)
+def carregar_selic():
+    """Carrega (uma única vez por processo) a Selic diária do arquivo binário ou do CSV."""
+    serie = _serie_binaria(SELIC)
+    return ler_selic() if serie is None else serie
+
+
+@lru_cache(maxsize=None)
+def carregar_taxa_legal():
+    """Carrega (uma única vez por processo) a taxa legal mensal do arquivo binário ou do CSV."""
+    serie = _serie_binaria(TAXA_LEGAL)
+    return ler_taxa_legal() if serie is None else serie
@@ -0,0 +1,77 @@
+"""Relatório do custo de importação de cada módulo na inicialização (``python -X importtime``).
+
+Os módulos são importados, na ordem informada, em um interpretador novo; o custo
+de cada um é o tempo incremental, sem contar o que módulos anteriores já carregaram.
+
+Uso::
+
+    python -m utils.inicializacao
+    python -m utils.inicializacao streamlit pandas plotly.express
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from utils.recursos import DIRETORIO_PROJETO, carregar_lottie
+
+# Na ordem em que app.py e as páginas os importam
+MODULOS_PADRAO = (
+    "pandas",
+    "plotly.express",
+    "streamlit",
+    "streamlit_lottie",
+    "numpy",
+    "utils.calculo_tjrj",
+    "utils.calculo_fazenda",
+    "plotly.graph_objects",
+)
+
+
+def medir_importacoes(modulos=MODULOS_PADRAO):
+    """Devolve ``[(módulo, segundos)]`` com o custo incremental de importação de cada módulo."""
+    codigo = "; ".join(f"import {modulo}" for modulo in modulos)
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=DIRETORIO_PROJETO, capture_output=True, text=True, check=True,
+    )
+    custos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, cumulativo, nome = linha.split("|")
+        # Apenas importações de nível superior (sem recuo) são incrementais
+        if nome.startswith(" ") and not nome.startswith("  ") and nome.strip() in modulos:
+            custos[nome.strip()] = int(cumulativo) / 1e6
+    return [(modulo, custos.get(modulo, 0.0)) for modulo in modulos]
+
+
+def medir_lottie(nome_arquivo="cat1.json"):
+    """Segundos para ler a animação Lottie na primeira chamada e nas seguintes (cache do processo)."""
+    carregar_lottie.cache_clear()
+    inicio = time.perf_counter()
+    carregar_lottie(nome_arquivo)
+    primeira = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    carregar_lottie(nome_arquivo)
+    return primeira, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Custo de importação por módulo na inicialização.")
+    parser.add_argument("modulos", nargs="*", default=MODULOS_PADRAO)
+    args = parser.parse_args(argv)
+
+    resultados = medir_importacoes(tuple(args.modulos))
+    largura = max(len(modulo) for modulo, _ in resultados)
+    print(f"{'Módulo':<{largura}}  {'Importação':>12}")
+    for modulo, segundos in resultados:
+        print(f"{modulo:<{largura}}  {segundos * 1000:>9.1f} ms")
+    print(f"{'Total':<{largura}}  {sum(s for _, s in resultados) * 1000:>9.1f} ms")
+
+    primeira, seguintes = medir_lottie()
+    print(f"\nLottie cat1.json: {primeira * 1000:.1f} ms na primeira leitura, {seguintes * 1e6:.1f} µs em cache")
+
+
+if __name__ == "__main__":
+    main()
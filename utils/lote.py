@@ -0,0 +1,409 @@
+"""Processamento em lote de carteiras de processos (CSV ou Parquet).
+
+O arquivo de entrada é lido em blocos de tamanho fixo; cada bloco passa pelo
+motor de cálculo vetorizado e é gravado no arquivo de saída antes do próximo
+ser lido, de modo que o uso de memória não depende do número de linhas.
+
+Com ``--processos``, os blocos viram fragmentos calculados em paralelo por um
+pool de processos; cada fragmento pronto é gravado em disco, o que permite
+retomar uma execução interrompida, e ao final os fragmentos são reunidos na
+ordem da entrada.
+
+Uso pela linha de comando::
+
+    python -m utils.lote carteira.csv resultados.csv --calculadora tjrj
+    python -m utils.lote carteira.csv resultados.csv --calculadora tjrj --processos 8
+"""
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.calculo_fazenda import calcular_debitos_fazenda
+from utils.calculo_tjrj import SEM_CORRECAO, SEM_JUROS, calcular_debitos_tjrj, opcoes_invalidas
+from utils.centavos import calcular_debitos_fazenda_centavos, calcular_debitos_tjrj_centavos
+
+TAMANHO_LOTE_PADRAO = 50_000
+
+COLUNAS_OBRIGATORIAS_TJRJ = ("valor", "data_juros", "data_final", "tipo_juros")
+COLUNAS_OPCIONAIS_TJRJ = {
+    "tipo_obrigacao": "",
+    "honorarios": 0.0,
+    "aplicar_523": False,
+    "indice_correcao": SEM_CORRECAO,
+    "data_inicial": None,
+}
+
+COLUNAS_OBRIGATORIAS_FAZENDA = (
+    "valor", "data_inicial_cor_mon", "data_final_cor_mon", "data_inicial_juros", "data_final_juros"
+)
+COLUNAS_OPCIONAIS_FAZENDA = {
+    "honorarios_percentual": 0.0,
+}
+
+# calculadora -> (motor, colunas obrigatórias, colunas opcionais com valor padrão)
+CALCULADORAS = {
+    "tjrj": (calcular_debitos_tjrj, COLUNAS_OBRIGATORIAS_TJRJ, COLUNAS_OPCIONAIS_TJRJ),
+    "fazenda": (calcular_debitos_fazenda, COLUNAS_OBRIGATORIAS_FAZENDA, COLUNAS_OPCIONAIS_FAZENDA),
+}
+
+# Motores equivalentes com aritmética exata em centavos (int64)
+MOTORES_CENTAVOS = {
+    "tjrj": calcular_debitos_tjrj_centavos,
+    "fazenda": calcular_debitos_fazenda_centavos,
+}
+
+COLUNAS_NUMERICAS = {"valor", "honorarios", "honorarios_percentual"}
+COLUNAS_BOOLEANAS = {"aplicar_523"}
+
+VALORES_VERDADEIROS = {"1", "true", "verdadeiro", "sim", "s", "x"}
+
+
+def _formato(caminho, formato=None):
+    if formato:
+        return formato
+    return "parquet" if Path(str(getattr(caminho, "name", caminho))).suffix.lower() == ".parquet" else "csv"
+
+
+def ler_blocos(entrada, tamanho_lote=TAMANHO_LOTE_PADRAO, formato=None, separador=","):
+    """Gera DataFrames de até ``tamanho_lote`` linhas a partir de um CSV ou Parquet (caminho ou arquivo).
+
+    As colunas do CSV são lidas como texto (ex.: números de processo mantêm os zeros à esquerda) e
+    convertidas por ``argumentos_do_bloco``. O índice de cada bloco continua o do anterior.
+    """
+    if _formato(entrada, formato) == "parquet":
+        import pyarrow.parquet as pq
+
+        inicio = 0
+        for bloco in pq.ParquetFile(entrada).iter_batches(batch_size=tamanho_lote):
+            yield bloco.to_pandas().set_axis(pd.RangeIndex(inicio, inicio + bloco.num_rows))
+            inicio += bloco.num_rows
+    else:
+        yield from pd.read_csv(entrada, chunksize=tamanho_lote, sep=separador, dtype=str)
+
+
+def _datas(coluna):
+    """Datas em ``datetime64[D]``; datas em branco ou inválidas ficam como ``NaT``."""
+    if not pd.api.types.is_datetime64_any_dtype(coluna):
+        # Formatos fixos são convertidos de forma vetorizada; "mixed" analisa linha a linha
+        for formato in ("ISO8601", "%d/%m/%Y"):
+            try:
+                coluna = pd.to_datetime(coluna, format=formato)
+                break
+            except (ValueError, TypeError):
+                continue
+        else:
+            coluna = pd.to_datetime(coluna, format="mixed", dayfirst=True, errors="coerce")
+    return coluna.to_numpy(dtype="datetime64[D]")
+
+
+def _booleanos(coluna):
+    if pd.api.types.is_bool_dtype(coluna):
+        return coluna.to_numpy()
+    return coluna.astype(str).str.strip().str.lower().isin(VALORES_VERDADEIROS).to_numpy()
+
+
+def argumentos_do_bloco(bloco, calculadora):
+    """Converte as colunas de um bloco nos argumentos (arrays) do motor da ``calculadora``.
+
+    Levanta ``ValueError`` com a linha da carteira (contada a partir de 1, sem o cabeçalho) quando
+    uma data está em branco ou é inválida, ou quando ``tipo_juros``, ``tipo_obrigacao`` ou
+    ``indice_correcao`` não é uma das opções da calculadora. ``data_inicial`` e ``indice_correcao`` em
+    branco são a exceção: valem como quando a coluna não é enviada.
+    """
+    _, obrigatorias, opcionais = CALCULADORAS[calculadora]
+    faltando = [coluna for coluna in obrigatorias if coluna not in bloco.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes para '{calculadora}': {', '.join(faltando)}")
+
+    argumentos = {}
+    for coluna in obrigatorias + tuple(opcionais):
+        if coluna not in bloco.columns:
+            argumentos[coluna] = opcionais[coluna]
+        elif coluna.startswith("data_"):
+            datas = _datas(bloco[coluna])
+            vazias = np.isnat(datas)
+            if coluna == "data_inicial":
+                datas = np.where(vazias, argumentos["data_juros"], datas)
+            elif vazias.any():
+                linha = bloco.index[vazias.argmax()] + 1
+                raise ValueError(f"Data em branco ou inválida na coluna '{coluna}', linha {linha} da carteira.")
+            argumentos[coluna] = datas
+        elif coluna in COLUNAS_NUMERICAS:
+            argumentos[coluna] = pd.to_numeric(bloco[coluna]).fillna(opcionais.get(coluna, 0.0)).to_numpy(
+                dtype=np.float64)
+        elif coluna in COLUNAS_BOOLEANAS:
+            argumentos[coluna] = _booleanos(bloco[coluna])
+        else:
+            argumentos[coluna] = bloco[coluna].fillna(opcionais.get(coluna, "")).astype(str).to_numpy()
+
+    if calculadora == "tjrj":
+        opcoes = {coluna: argumentos[coluna] for coluna in ("tipo_juros", "tipo_obrigacao", "indice_correcao")}
+        for coluna, invalidas in opcoes_invalidas(**opcoes).items():
+            invalidas = np.broadcast_to(invalidas, len(bloco))
+            if invalidas.any():
+                posicao = invalidas.argmax()
+                valor = np.broadcast_to(opcoes[coluna], len(bloco))[posicao]
+                raise ValueError(f"Valor inválido ou em branco na coluna '{coluna}', linha {bloco.index[posicao] + 1} "
+                                 f"da carteira: {valor!r}.")
+    return argumentos
+
+
+def _calcular(bloco, calculadora, centavos=False):
+    argumentos = argumentos_do_bloco(bloco, calculadora)
+    motor = MOTORES_CENTAVOS[calculadora] if centavos else CALCULADORAS[calculadora][0]
+    return argumentos, motor(**argumentos)
+
+
+def calcular_bloco(bloco, calculadora, centavos=False):
+    """Roda o motor da ``calculadora`` sobre um bloco e devolve as colunas de entrada com os resultados.
+
+    Com ``centavos=True`` os valores monetários saem em centavos inteiros, arredondados por etapa.
+    """
+    _, resultado = _calcular(bloco, calculadora, centavos)
+    saida = bloco.copy()
+    for chave, valores in resultado.items():
+        saida[chave] = np.broadcast_to(valores, len(bloco))
+    return saida
+
+
+@lru_cache(maxsize=None)
+def _campos_resultado(calculadora, centavos=False):
+    """Nome e tipo de cada resultado do motor, obtidos de um processo fictício."""
+    import pyarrow as pa
+
+    _, obrigatorias, _ = CALCULADORAS[calculadora]
+    exemplo = pd.DataFrame({coluna: ["2020-01-01" if coluna.startswith("data_") else "1"] for coluna in obrigatorias})
+    if "tipo_juros" in exemplo:
+        exemplo["tipo_juros"] = SEM_JUROS
+    _, resultado = _calcular(exemplo, calculadora, centavos)
+    return tuple((chave, pa.from_numpy_dtype(np.asarray(valores).dtype)) for chave, valores in resultado.items())
+
+
+def esquema_saida(colunas, calculadora, centavos=False):
+    """Esquema fixo do arquivo de resultados: as colunas de entrada seguidas dos resultados do motor.
+
+    Os tipos são declarados, e não inferidos dos dados: datas em ``date32``, valores em ``float64``,
+    ``aplicar_523`` booleano e as demais colunas (inclusive as que não são argumentos) em texto.
+    Todas as colunas aceitam valores nulos.
+    """
+    import pyarrow as pa
+
+    resultados = dict(_campos_resultado(calculadora, centavos))
+    campos = []
+    for coluna in colunas:
+        if coluna in resultados:
+            continue
+        if coluna.startswith("data_"):
+            tipo = pa.date32()
+        elif coluna in COLUNAS_NUMERICAS:
+            tipo = pa.float64()
+        elif coluna in COLUNAS_BOOLEANAS:
+            tipo = pa.bool_()
+        else:
+            tipo = pa.string()
+        campos.append(pa.field(coluna, tipo))
+    return pa.schema(campos + [pa.field(chave, tipo) for chave, tipo in resultados.items()])
+
+
+def tabela_resultados(bloco, calculadora, centavos=False):
+    """Como ``calcular_bloco``, mas devolve uma tabela pyarrow no esquema de ``esquema_saida``.
+
+    As colunas de argumentos saem já convertidas (datas, números, booleanos); as demais, como texto.
+    """
+    import pyarrow as pa
+
+    argumentos, resultado = _calcular(bloco, calculadora, centavos)
+    esquema = esquema_saida(tuple(bloco.columns), calculadora, centavos)
+    colunas = []
+    for campo in esquema:
+        if campo.name in resultado:
+            valores = np.broadcast_to(resultado[campo.name], len(bloco))
+        elif campo.name in argumentos:
+            valores = np.broadcast_to(argumentos[campo.name], len(bloco))
+        else:
+            valores = bloco[campo.name].astype("string")
+        colunas.append(pa.array(valores, type=campo.type, from_pandas=True))
+    return pa.Table.from_arrays(colunas, schema=esquema)
+
+
+class EscritorResultados:
+    """Grava tabelas de resultados em CSV ou Parquet (via pyarrow) à medida que ficam prontas.
+
+    O arquivo é aberto com o ``esquema`` declarado (``esquema_saida``); toda tabela gravada é
+    convertida para ele.
+    """
+
+    def __init__(self, saida, esquema, formato=None):
+        self.saida = saida
+        self.esquema = esquema
+        self.formato = _formato(saida, formato)
+        self._escritor = None
+
+    def __enter__(self):
+        if self.formato == "parquet":
+            import pyarrow.parquet as pq
+
+            self._escritor = pq.ParquetWriter(self.saida, self.esquema)
+        else:
+            import pyarrow.csv as pcsv
+
+            self._escritor = pcsv.CSVWriter(self.saida, self.esquema)
+        return self
+
+    def gravar(self, tabela):
+        """Grava uma tabela pyarrow no arquivo de saída."""
+        self._escritor.write_table(tabela.cast(self.esquema))
+
+    def __exit__(self, *exc):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+def processar_arquivo(entrada, saida, calculadora, tamanho_lote=TAMANHO_LOTE_PADRAO, progresso=None, separador=",",
+                      centavos=False):
+    """Lê ``entrada`` em blocos, calcula e grava cada bloco em ``saida``. Retorna o total de linhas."""
+    total = 0
+    blocos = ler_blocos(entrada, tamanho_lote, separador=separador)
+    primeiro = next(blocos, None)
+    if primeiro is None:
+        return total
+    with EscritorResultados(saida, esquema_saida(tuple(primeiro.columns), calculadora, centavos)) as escritor:
+        for bloco in itertools.chain([primeiro], blocos):
+            escritor.gravar(tabela_resultados(bloco, calculadora, centavos))
+            total += len(bloco)
+            if progresso:
+                progresso(total)
+    return total
+
+
+def _calcular_fragmento(bloco, calculadora, caminho, centavos=False):
+    """Executado nos processos do pool: calcula um bloco e o grava como fragmento Parquet."""
+    import pyarrow.parquet as pq
+
+    tabela = tabela_resultados(bloco, calculadora, centavos)
+    # Grava com outro nome e renomeia: um fragmento existente está sempre completo
+    temporario = caminho.with_suffix(".tmp")
+    pq.write_table(tabela, temporario)
+    os.replace(temporario, caminho)
+    return len(bloco)
+
+
+def _preparar_fragmentos(diretorio, parametros):
+    diretorio.mkdir(parents=True, exist_ok=True)
+    arquivo_parametros = diretorio / "parametros.json"
+    if arquivo_parametros.exists():
+        anteriores = json.loads(arquivo_parametros.read_text(encoding="utf-8"))
+        if anteriores != parametros:
+            raise ValueError(f"Os fragmentos em {diretorio} são de outra execução ({anteriores}); "
+                             "apague o diretório ou use os mesmos parâmetros.")
+    else:
+        arquivo_parametros.write_text(json.dumps(parametros), encoding="utf-8")
+
+
+def processar_em_paralelo(entrada, saida, calculadora, processos=None, tamanho_lote=TAMANHO_LOTE_PADRAO,
+                          progresso=None, separador=",", diretorio_fragmentos=None, centavos=False):
+    """Como ``processar_arquivo``, mas calcula os blocos em um pool de ``processos`` (padrão: todos os núcleos).
+
+    Os fragmentos ficam em ``diretorio_fragmentos`` (padrão: ``<saida>.fragmentos``); se a execução for
+    interrompida, rodar de novo com os mesmos parâmetros e a mesma carteira (caminho, tamanho e data de
+    modificação) reaproveita os fragmentos já prontos. Ao final eles são reunidos em ``saida``, na ordem
+    da entrada, e o diretório é apagado.
+    """
+    processos = processos or os.cpu_count() or 1
+    saida = Path(saida)
+    diretorio = Path(diretorio_fragmentos or f"{saida}.fragmentos")
+    estado = Path(entrada).stat()  # uma carteira editada depois da interrupção não reaproveita os fragmentos
+    _preparar_fragmentos(diretorio, {
+        "entrada": str(Path(entrada).resolve()), "tamanho": estado.st_size, "modificado": estado.st_mtime_ns,
+        "calculadora": calculadora, "tamanho_lote": tamanho_lote,
+        "centavos": centavos,
+    })
+
+    total = 0
+    fragmentos = []
+    pendentes = set()
+    colunas = None
+
+    def concluir(concluidos):
+        nonlocal total
+        for futuro in concluidos:
+            total += futuro.result()
+            if progresso:
+                progresso(total)
+
+    with ProcessPoolExecutor(processos) as pool:
+        for n, bloco in enumerate(ler_blocos(entrada, tamanho_lote, separador=separador)):
+            caminho = diretorio / f"fragmento_{n:06d}.parquet"
+            fragmentos.append(caminho)
+            colunas = colunas or tuple(bloco.columns)
+            if caminho.exists():  # retomada: fragmento de uma execução anterior
+                total += len(bloco)
+                continue
+            # Limita os blocos em memória a dois por processo
+            if len(pendentes) >= 2 * processos:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                concluir(concluidos)
+            pendentes.add(pool.submit(_calcular_fragmento, bloco, calculadora, caminho, centavos))
+        concluir(wait(pendentes).done)
+
+    if not fragmentos:
+        shutil.rmtree(diretorio)
+        return total
+
+    import pyarrow.parquet as pq
+
+    with EscritorResultados(saida, esquema_saida(colunas, calculadora, centavos)) as escritor:
+        for caminho in fragmentos:
+            escritor.gravar(pq.read_table(caminho))
+    shutil.rmtree(diretorio)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cálculo em lote de carteiras de processos (CSV ou Parquet).")
+    parser.add_argument("entrada", help="arquivo .csv ou .parquet com um processo por linha")
+    parser.add_argument("saida", help="arquivo .csv ou .parquet de resultados")
+    parser.add_argument("--calculadora", choices=sorted(CALCULADORAS), default="tjrj")
+    parser.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE_PADRAO)
+    parser.add_argument("--separador", default=",", help="separador de colunas do CSV de entrada")
+    parser.add_argument("--processos", type=int, nargs="?", const=0, default=None,
+                        help="calcula em paralelo com N processos (sem N: todos os núcleos); "
+                             "rodar de novo após uma interrupção retoma do último fragmento gravado")
+    parser.add_argument("--centavos", action="store_true",
+                        help="valores monetários em centavos inteiros, com arredondamento exato por etapa")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+
+    def progresso(n):
+        decorrido = time.perf_counter() - inicio
+        print(f"\r{n:,} processos calculados ({n / max(decorrido, 1e-9):,.0f} processos/s)", end="",
+              file=sys.stderr)
+
+    try:
+        if args.processos is None:
+            total = processar_arquivo(args.entrada, args.saida, args.calculadora, args.tamanho_lote,
+                                      separador=args.separador, progresso=progresso, centavos=args.centavos)
+        else:
+            total = processar_em_paralelo(args.entrada, args.saida, args.calculadora, args.processos or None,
+                                          args.tamanho_lote, separador=args.separador, progresso=progresso,
+                                          centavos=args.centavos)
+    except ValueError as erro:
+        parser.exit(1, f"\n❌ {erro}\n")
+    duracao = time.perf_counter() - inicio
+    print(f"\n✅ {total:,} processos em {duracao:.1f}s ({total / max(duracao, 1e-9):,.0f} processos/s)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
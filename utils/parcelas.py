@@ -0,0 +1,126 @@
+"""Débitos em parcelas (alimentos, diferenças salariais, benefícios): cada parcela atualizada desde o seu vencimento.
+
+As parcelas de um caso são calculadas de uma só vez pelo motor vetorizado da
+calculadora, com o vencimento de cada uma como termo inicial da correção e dos
+juros; o débito é a soma das parcelas. Honorários e multa incidem
+proporcionalmente, então somá-los por parcela equivale a calculá-los sobre o total.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from utils.calculo_fazenda import calcular_debitos_fazenda
+from utils.calculo_tjrj import calcular_debitos_tjrj
+from utils.datas import para_datetime64
+
+MAXIMO_PARCELAS = 100_000
+
+# Início dos nomes aceitos no cabeçalho da tabela de parcelas (sem diferenciar maiúsculas)
+CABECALHO_VENCIMENTO = ("venc", "data")
+CABECALHO_VALOR = ("valor",)
+
+# Número no formato brasileiro: milhares separados por ponto (grupos de 3 dígitos) e vírgula decimal opcional
+NUMERO_BRASILEIRO = r"-?(?:[1-9]\d{0,2}(?:\.\d{3})+|\d+)(?:,\d+)?"
+
+# Colunas de resultado que são valores em reais (somadas no total do débito)
+COLUNAS_MONETARIAS = {
+    "tjrj": ("valor", "correcao_monetaria", "valor_atualizado", "valor_juros", "valor_corrigido", "valor_honorarios",
+             "multa_523", "honorarios_523", "total"),
+    "fazenda": ("valor", "valor_corrigido_ipcae", "valor_juros_ate_corte", "juros_selic_sobre_principal",
+                "valor_principal_corrigido_selic", "juros_selic_sobre_consolidado", "valor_consolidado_selic",
+                "honorarios_resultado1", "honorarios_resultado2", "total_resultado1", "total_resultado2"),
+}
+
+
+def gerar_parcelas(data_inicial, data_final, valor_mensal):
+    """Parcelas mensais de ``valor_mensal`` de ``data_inicial`` a ``data_final``, no mesmo dia de cada mês.
+
+    Em meses mais curtos o vencimento passa para o último dia do mês (ex.: 31/01 -> 28/02).
+    """
+    inicio, fim = para_datetime64(data_inicial), para_datetime64(data_final)
+    meses = np.arange(inicio.astype("datetime64[M]"), fim.astype("datetime64[M]") + 1)
+    if len(meses) > MAXIMO_PARCELAS:
+        raise ValueError(f"O período gera mais de {MAXIMO_PARCELAS:,} parcelas.")
+    dia = (inicio - inicio.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64)
+    ultimo_dia = (meses + 1).astype("datetime64[D]") - 1
+    vencimentos = np.minimum(meses.astype("datetime64[D]") + dia, ultimo_dia)
+    vencimentos = vencimentos[vencimentos <= fim]
+    return pd.DataFrame({"vencimento": vencimentos, "valor": np.full(len(vencimentos), float(valor_mensal))})
+
+
+def _numeros(coluna):
+    """Valores em reais no formato brasileiro (``1.234,56``) ou com ponto decimal (``1234.56``).
+
+    O ponto é separador de milhares quando há vírgula decimal ou quando separa grupos de exatamente
+    3 dígitos (``1.500`` é mil e quinhentos); nos demais casos é o ponto decimal (``1.5``, ``1500.00``).
+    Valores em que os dois sinais não seguem o formato brasileiro (``1,234.56``) são rejeitados.
+    """
+    if pd.api.types.is_numeric_dtype(coluna):
+        return coluna.to_numpy(dtype=np.float64)
+    texto = coluna.astype(str).str.strip().str.replace("R$", "", regex=False).str.strip()
+    brasileiro = texto.str.fullmatch(NUMERO_BRASILEIRO)
+    texto = texto.where(~brasileiro, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto, errors="raise").to_numpy(dtype=np.float64)
+
+
+def ler_parcelas(origem):
+    """Tabela de parcelas colada (texto) ou enviada (CSV), com vencimento e valor nas duas primeiras colunas.
+
+    O separador (``;``, tabulação ou ``,``) é detectado e o cabeçalho é opcional: a primeira linha é
+    cabeçalho se as colunas se chamarem vencimento (ou data) e valor. Datas em DD/MM/AAAA ou
+    AAAA-MM-DD. Devolve um DataFrame com ``vencimento`` e ``valor``.
+    """
+    if isinstance(origem, str):
+        origem = io.StringIO(origem.strip())
+    tabela = pd.read_csv(origem, sep=None, engine="python", header=None, dtype=str, skip_blank_lines=True)
+    if tabela.shape[1] < 2:
+        raise ValueError("Informe duas colunas por parcela: vencimento e valor.")
+    tabela = tabela.iloc[:, :2].set_axis(["vencimento", "valor"], axis=1)
+    nomes = tabela.iloc[0].fillna("").str.strip().str.lower()
+    if nomes["vencimento"].startswith(CABECALHO_VENCIMENTO) and nomes["valor"].startswith(CABECALHO_VALOR):
+        tabela = tabela.iloc[1:]
+
+    vencimentos = pd.to_datetime(tabela["vencimento"].str.strip(), format="%d/%m/%Y", errors="coerce")
+    vencimentos = vencimentos.fillna(pd.to_datetime(tabela["vencimento"].str.strip(), format="ISO8601",
+                                                    errors="coerce"))
+    if tabela.empty:
+        raise ValueError("Nenhuma parcela com vencimento válido (DD/MM/AAAA) foi informada.")
+    if vencimentos.isna().any():
+        linha = int(vencimentos.isna().to_numpy().argmax()) + 1
+        raise ValueError(f"Vencimento inválido na parcela {linha}: use DD/MM/AAAA.")
+    if len(tabela) > MAXIMO_PARCELAS:
+        raise ValueError(f"A tabela tem mais de {MAXIMO_PARCELAS:,} parcelas.")
+    try:
+        valores = _numeros(tabela["valor"])
+    except ValueError:
+        raise ValueError("Há valores de parcela que não são números (ex.: 1.234,56).") from None
+    return pd.DataFrame({"vencimento": vencimentos.to_numpy(dtype="datetime64[D]"), "valor": valores})
+
+
+def calcular_parcelas(parcelas, calculadora, **parametros):
+    """Calcula todas as parcelas de uma vez e devolve a tabela com os componentes de cada uma.
+
+    ``parametros`` são os argumentos comuns do motor: para ``"tjrj"``, ``data_final``, ``tipo_juros``,
+    ``tipo_obrigacao``, ``honorarios``, ``aplicar_523`` e ``indice_correcao``; para ``"fazenda"``,
+    ``data_final_cor_mon``, ``data_final_juros`` e ``honorarios_percentual``. O vencimento de cada
+    parcela é o termo inicial da correção e dos juros.
+    """
+    vencimentos = para_datetime64(parcelas["vencimento"])
+    valores = np.asarray(parcelas["valor"], dtype=np.float64)
+    if calculadora == "tjrj":
+        resultado = calcular_debitos_tjrj(valores, vencimentos, data_inicial=vencimentos, **parametros)
+    elif calculadora == "fazenda":
+        resultado = calcular_debitos_fazenda(valores, vencimentos, data_inicial_juros=vencimentos, **parametros)
+    else:
+        raise ValueError(f"Calculadora desconhecida: {calculadora}")
+
+    tabela = pd.DataFrame({"vencimento": vencimentos, "valor": valores})
+    for chave, coluna in resultado.items():
+        tabela[chave] = np.broadcast_to(coluna, len(tabela))
+    return tabela
+
+
+def totais(tabela, calculadora):
+    """Soma dos valores em reais de todas as parcelas (o débito total)."""
+    return {coluna: float(tabela[coluna].sum()) for coluna in COLUNAS_MONETARIAS[calculadora]}
@@ -0,0 +1,119 @@
+"""Projeção da Selic até a data prevista de pagamento (precatórios) por simulação de Monte Carlo.
+
+A Selic anual segue um modelo com reversão à média (Vasicek discreto, passo
+mensal, sem taxas negativas), calibrado na série histórica de ``data/selic.csv``::
+
+    r[t+1] = max(r[t] + reversao × (media − r[t]) + volatilidade × ε, 0),   ε ~ N(0, 1)
+
+Os caminhos são simulados juntos (um passo NumPy por mês, não um laço por
+caminho), em blocos de ``CAMINHOS_POR_BLOCO`` com sementes independentes
+(``SeedSequence.spawn``), que podem ser distribuídos em um pool de processos sem
+alterar o resultado. A Selic de cada mês rende por dias úteis (base 252), como
+na tabela local.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from utils.cache import memoizar
+from utils.calendario import dias_uteis
+from utils.datas import para_datetime64
+from utils.indices import carregar_selic
+
+PERCENTIS = (5, 25, 50, 75, 95)
+CAMINHOS_POR_BLOCO = 10_000
+DIAS_UTEIS_ANO = 252
+
+# Limites da calibração: séries curtas podem sugerir reversão nula ou explosiva
+REVERSAO_MINIMA = 0.01
+REVERSAO_MAXIMA = 1.0
+
+
+def selic_mensal_historica(serie=None):
+    """Meses completos da Selic diária e a taxa anual equivalente (base 252) de cada um."""
+    if serie is None:
+        serie = carregar_selic()
+    inicio = serie.data_inicial.astype("datetime64[M]")
+    if serie.data_inicial != inicio.astype("datetime64[D]"):
+        inicio += 1
+    meses = np.arange(inicio, (serie.data_final + 1).astype("datetime64[M]"))
+    primeiros_dias, seguintes = meses.astype("datetime64[D]"), (meses + 1).astype("datetime64[D]")
+    fatores = serie.fator(primeiros_dias, seguintes)
+    return meses, fatores ** (DIAS_UTEIS_ANO / dias_uteis(primeiros_dias, seguintes)) - 1
+
+
+@lru_cache(maxsize=None)
+def calibrar_modelo():
+    """Parâmetros do modelo estimados por mínimos quadrados na Selic mensal histórica.
+
+    ``taxa_inicial`` é a Selic do último mês da série; taxas e volatilidade estão em fração ao ano.
+    """
+    _, taxas = selic_mensal_historica()
+    atual, seguinte = taxas[:-1], taxas[1:]
+    inclinacao, intercepto = np.polyfit(atual, seguinte - atual, 1)
+    reversao = float(np.clip(-inclinacao, REVERSAO_MINIMA, REVERSAO_MAXIMA))
+    media = intercepto / reversao if -inclinacao >= REVERSAO_MINIMA else taxas.mean()
+    residuos = seguinte - atual - (intercepto + inclinacao * atual)
+    return {"taxa_inicial": float(taxas[-1]), "media": float(np.clip(media, 0.0, 1.0)), "reversao": reversao,
+            "volatilidade": float(residuos.std(ddof=2))}
+
+
+def simular_taxas(meses, caminhos, gerador, taxa_inicial, media, reversao, volatilidade):
+    """Selic anual de cada mês em cada caminho: matriz ``(caminhos, meses)``."""
+    taxas = np.empty((caminhos, meses))
+    atual = np.full(caminhos, float(taxa_inicial))
+    choques = gerador.standard_normal((meses, caminhos))
+    for mes in range(meses):
+        atual = np.maximum(atual + reversao * (media - atual) + volatilidade * choques[mes], 0.0)
+        taxas[:, mes] = atual
+    return taxas
+
+
+def pontos_da_projecao(inicio, fim):
+    """Datas dos pontos da projeção: ``inicio``, o primeiro dia de cada mês seguinte e ``fim``."""
+    inicio, fim = para_datetime64(inicio), para_datetime64(fim)
+    meses = np.arange(inicio.astype("datetime64[M]") + 1, fim.astype("datetime64[M]") + 1).astype("datetime64[D]")
+    return np.union1d(meses[meses < fim], [inicio, fim])
+
+
+def _simular_bloco(caminhos, semente, mes_do_trecho, dias_uteis_trecho, modelo):
+    """Executado no pool (ou localmente): fatores acumulados ``(caminhos, pontos)`` de um bloco."""
+    gerador = np.random.default_rng(semente)
+    taxas = simular_taxas(int(mes_do_trecho[-1]) + 1, caminhos, gerador, **modelo)
+    log_fatores = np.log1p(taxas[:, mes_do_trecho]) * (dias_uteis_trecho / DIAS_UTEIS_ANO)
+    acumulado = np.cumsum(log_fatores, axis=1)
+    return np.exp(np.concatenate((np.zeros((caminhos, 1)), acumulado), axis=1))
+
+
+@memoizar("projecao_selic", tamanho_maximo=16)
+def projetar_selic(inicio, fim, caminhos, semente=0, processos=1, percentis=PERCENTIS, **modelo):
+    """Percentis do fator Selic acumulado de ``inicio`` até cada ponto, em ``caminhos`` simulações.
+
+    ``modelo`` traz ``taxa_inicial``, ``media``, ``reversao`` e ``volatilidade`` (padrão: :func:`calibrar_modelo`).
+    Retorna ``{"datas", "percentis", "fatores"}``, com ``fatores`` no formato ``(percentis, datas)``.
+    """
+    modelo = {**calibrar_modelo(), **modelo}
+    datas = pontos_da_projecao(inicio, fim)
+    if len(datas) < 2:
+        raise ValueError("A data de pagamento deve ser posterior ao início da projeção.")
+    mes_do_trecho = (datas[:-1].astype("datetime64[M]") - datas[0].astype("datetime64[M]")).astype(np.int64)
+    dias_uteis_trecho = dias_uteis(datas[:-1], datas[1:])
+
+    tamanhos = [min(CAMINHOS_POR_BLOCO, caminhos - i) for i in range(0, caminhos, CAMINHOS_POR_BLOCO)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    argumentos = (tamanhos, sementes, [mes_do_trecho] * len(tamanhos), [dias_uteis_trecho] * len(tamanhos),
+                  [modelo] * len(tamanhos))
+    if processos and processos > 1 and len(tamanhos) > 1:
+        with ProcessPoolExecutor(processos) as pool:
+            blocos = list(pool.map(_simular_bloco, *argumentos))
+    else:
+        blocos = list(map(_simular_bloco, *argumentos))
+
+    fatores = np.concatenate(blocos)
+    return {"datas": datas, "percentis": tuple(percentis), "fatores": np.percentile(fatores, percentis, axis=0)}
+
+
+def inicio_da_projecao(data_final):
+    """A projeção começa na data final do cálculo ou no dia seguinte ao fim da tabela local da Selic."""
+    return min(para_datetime64(data_final), carregar_selic().data_final + 1).astype(object)
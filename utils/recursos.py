@@ -0,0 +1,13 @@
+"""Recursos estáticos (animações Lottie) carregados uma única vez por processo."""
+import json
+from functools import lru_cache
+from pathlib import Path
+
+DIRETORIO_PROJETO = Path(__file__).resolve().parent.parent
+
+
+@lru_cache(maxsize=None)
+def carregar_lottie(nome_arquivo):
+    """Animação Lottie já convertida de JSON, compartilhada por todos os reruns e sessões."""
+    with open(DIRETORIO_PROJETO / nome_arquivo, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,67 @@
+"""Grade de cenários (taxa × termo inicial dos juros × data final) do débito cível, calculada de uma só vez.
+
+Os meses de juros são calculados para a grade de datas (termos × finais) e a
+correção monetária para cada data final; o total de todos os cenários sai de um
+único broadcasting NumPy com as mesmas etapas do cálculo principal
+(``valores_tjrj`` e ``encargos_tjrj``), sem laços por cenário.
+"""
+import numpy as np
+
+from utils.cache import memoizar
+from utils.calculo_tjrj import encargos_tjrj, fator_correcao_monetaria, meses_de_juros, valores_tjrj
+from utils.datas import para_datetime64
+
+MAXIMO_PONTOS_EIXO = 200
+
+
+def faixa_taxas(minima, maxima, quantidade):
+    """``quantidade`` taxas anuais igualmente espaçadas de ``minima`` a ``maxima`` (em fração)."""
+    return np.linspace(minima, maxima, _quantidade(quantidade))
+
+
+def faixa_datas(inicio, fim, quantidade):
+    """``quantidade`` datas igualmente espaçadas (arredondadas ao dia) de ``inicio`` a ``fim``."""
+    inicio, fim = para_datetime64(inicio), para_datetime64(fim)
+    dias = np.rint(np.linspace(0, (fim - inicio).astype(np.int64), _quantidade(quantidade))).astype(np.int64)
+    return np.unique(inicio + dias.astype("timedelta64[D]"))
+
+
+def _quantidade(quantidade):
+    quantidade = int(quantidade)
+    if not 1 <= quantidade <= MAXIMO_PONTOS_EIXO:
+        raise ValueError(f"Cada eixo da grade deve ter de 1 a {MAXIMO_PONTOS_EIXO} pontos.")
+    return quantidade
+
+
+def grade_tjrj(valor, taxas_anuais, termos_iniciais, datas_finais, data_inicial, indice_correcao, honorarios=0.0,
+               aplicar_523=False):
+    """Total do débito em cada cenário, com forma ``(taxas, termos, finais)``.
+
+    Os juros são simples à taxa anual ÷ 12 desde cada termo inicial; a correção monetária
+    corre de ``data_inicial`` até cada data final. Cenários com data final anterior ao
+    termo inicial ficam como ``NaN``. Retorna também os ``meses`` de juros ``(termos, finais)``.
+    """
+    taxas_anuais = np.asarray(taxas_anuais, dtype=np.float64)
+    termos_iniciais, datas_finais = para_datetime64(termos_iniciais), para_datetime64(datas_finais)
+
+    meses = meses_de_juros(termos_iniciais[:, None], datas_finais[None, :])
+    fator_correcao = fator_correcao_monetaria(indice_correcao, data_inicial, datas_finais)
+    fator_juros = (taxas_anuais / 12)[:, None, None] * meses[None, :, :]
+
+    valores = valores_tjrj(valor, fator_correcao[None, None, :], fator_juros)
+    total = encargos_tjrj(valores["valor_corrigido"], honorarios, aplicar_523)["total"]
+    validos = termos_iniciais[:, None] <= datas_finais[None, :]
+    return {"meses": meses, "total": np.where(validos[None, :, :], total, np.nan)}
+
+
+@memoizar("grade_sensibilidade_tjrj", tamanho_maximo=8)
+def cenarios_tjrj(valor, data_inicial, indice_correcao, honorarios, aplicar_523, faixa_taxa, faixa_termo, faixa_final):
+    """Grade memoizada a partir das faixas da página: ``(mínimo, máximo, quantidade)`` de cada eixo.
+
+    Retorna os eixos (``taxas``, ``termos``, ``finais``) junto com ``meses`` e ``total``.
+    """
+    taxas = faixa_taxas(*faixa_taxa)
+    termos = faixa_datas(*faixa_termo)
+    finais = faixa_datas(*faixa_final)
+    grade = grade_tjrj(valor, taxas, termos, finais, data_inicial, indice_correcao, honorarios, aplicar_523)
+    return {"taxas": taxas, "termos": termos, "finais": finais, **grade}